@@ -0,0 +1,62 @@
+"""
+Benchmark of the chat stream event encoding.
+
+Compares the generic ChatResponseEvent + jsonable_encoder path with the fast path of
+encode_chat_event for text generation events, in tokens per second on a single core.
+
+Usage (from the repository root):
+    PYTHONPATH=src poetry run python helper_scripts/benchmark_chat_events.py
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.chat.event_encoder import encode_chat_event
+from backend.schemas.chat import ChatResponseEvent, StreamTextGeneration
+
+
+def encode_legacy(stream_event) -> str:
+    return json.dumps(
+        jsonable_encoder(
+            ChatResponseEvent(
+                event=stream_event.event_type.value,
+                data=stream_event,
+            )
+        )
+    )
+
+
+def run(encoder, events) -> float:
+    start = time.perf_counter()
+    for event in events:
+        encoder(event)
+    return len(events) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=100_000)
+    args = parser.parse_args()
+
+    words = ["The", " quick", " brown", " fox", " jumps", " über", " the", " dog."]
+    events = [
+        StreamTextGeneration(text=words[i % len(words)]) for i in range(args.tokens)
+    ]
+
+    # The fast path must produce the exact same payloads
+    for event in events[: len(words)]:
+        assert encode_chat_event(event) == encode_legacy(event)
+
+    legacy = run(encode_legacy, events)
+    fast = run(encode_chat_event, events)
+
+    print(f"jsonable_encoder:  {legacy:,.0f} tokens/s")
+    print(f"encode_chat_event: {fast:,.0f} tokens/s")
+    print(f"speedup:           {fast / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
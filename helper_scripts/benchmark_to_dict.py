@@ -0,0 +1,104 @@
+"""
+Microbenchmark of backend.chat.collate.to_dict over cohere chat stream events.
+
+Compares the previous JSON round-trip implementation with the direct converter and
+checks that both produce the same output.
+
+Usage (from the repository root):
+    PYTHONPATH=src poetry run python helper_scripts/benchmark_to_dict.py
+"""
+
+import argparse
+import json
+import time
+
+from cohere.types import (
+    ApiMeta,
+    ApiMetaBilledUnits,
+    ChatCitation,
+    Message_Chatbot,
+    Message_User,
+    NonStreamedChatResponse,
+    StreamedChatResponse_CitationGeneration,
+    StreamedChatResponse_StreamEnd,
+    StreamedChatResponse_StreamStart,
+    StreamedChatResponse_TextGeneration,
+)
+
+# Imported before collate, which is imported by the deployments it depends on
+import backend.model_deployments  # noqa: F401
+from backend.chat.collate import to_dict
+
+
+def to_dict_json_round_trip(obj):
+    return json.loads(
+        json.dumps(
+            obj, default=lambda o: o.__dict__ if hasattr(o, "__dict__") else str(o)
+        )
+    )
+
+
+def get_stream(num_tokens: int) -> list:
+    text = "".join(f" token{i}" for i in range(num_tokens))
+    events = [StreamedChatResponse_StreamStart(generation_id="generation-id")]
+    events += [
+        StreamedChatResponse_TextGeneration(text=f" token{i}")
+        for i in range(num_tokens)
+    ]
+    events.append(
+        StreamedChatResponse_CitationGeneration(
+            citations=[
+                ChatCitation(start=0, end=6, text="token0", document_ids=["doc_0"])
+            ]
+        )
+    )
+    events.append(
+        StreamedChatResponse_StreamEnd(
+            finish_reason="COMPLETE",
+            response=NonStreamedChatResponse(
+                text=text,
+                generation_id="generation-id",
+                chat_history=[
+                    Message_User(message="Hello"),
+                    Message_Chatbot(message=text),
+                ],
+                finish_reason="COMPLETE",
+                meta=ApiMeta(
+                    billed_units=ApiMetaBilledUnits(
+                        input_tokens=10, output_tokens=num_tokens
+                    )
+                ),
+            ),
+        )
+    )
+    return events
+
+
+def run(converter, events, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for event in events:
+            converter(event)
+    return repeat * len(events) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    events = get_stream(args.tokens)
+    for event in events:
+        assert to_dict(event) == to_dict_json_round_trip(event)
+
+    before = run(to_dict_json_round_trip, events, args.repeat)
+    after = run(to_dict, events, args.repeat)
+
+    print(f"json round trip: {before:,.0f} events/s")
+    print(f"to_dict:         {after:,.0f} events/s")
+    print(f"speedup:         {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from typing import Any
+
+from backend.database_models.citation import Citation
+from backend.database_models.document import Document
+from backend.schemas.search_query import SearchQuery
+from backend.schemas.tool import ToolCall
+
+
+class StreamAccumulator:
+    """
+    Collects the data of a chat stream that is needed once the stream ends.
+
+    Text is buffered as a list of chunks and documents are indexed by their ID, so
+    each event is handled in constant time. The final values are only built when
+    the stream ends.
+    """
+
+    def __init__(self, conversation_id: str, response_id: str):
+        self.conversation_id = conversation_id
+        self.response_id = response_id
+        self.generation_id = None
+        self.text_chunks: list[str] = []
+        self.citations: list[Citation] = []
+        # Map the user facing document_ids field returned from model to storage ID for document model
+        self.document_ids_to_document: dict[str, Document] = {}
+        self.search_results: list[dict[str, Any]] = []
+        self.search_queries: list[SearchQuery] = []
+        self.tool_calls: list[ToolCall] = []
+        self.tool_results: list[dict[str, Any]] = []
+        self.chat_history: list[dict[str, Any]] | None = None
+
+    @property
+    def text(self) -> str:
+        # Join and collapse the chunks so repeated reads stay cheap
+        if len(self.text_chunks) > 1:
+            self.text_chunks = ["".join(self.text_chunks)]
+        return self.text_chunks[0] if self.text_chunks else ""
+
+    @property
+    def documents(self) -> list[Document]:
+        return list(self.document_ids_to_document.values())
+
+    def add_text(self, text: str) -> None:
+        self.text_chunks.append(text)
+
+    def add_document(self, document_id: str, document: Document) -> None:
+        self.document_ids_to_document[document_id] = document
+
+    def get_document(self, document_id: str) -> Document | None:
+        return self.document_ids_to_document.get(document_id, None)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Materialize the accumulated data as the stream end payload.
+
+        Returns:
+            dict[str, Any]: Stream end data.
+        """
+        stream_end_data = {
+            "conversation_id": self.conversation_id,
+            "response_id": self.response_id,
+            "text": self.text,
+            "citations": self.citations,
+            "documents": self.documents,
+            "search_results": self.search_results,
+            "search_queries": self.search_queries,
+            "tool_calls": self.tool_calls,
+            "tool_results": self.tool_results,
+        }
+        if self.generation_id is not None:
+            stream_end_data["generation_id"] = self.generation_id
+        if self.chat_history is not None:
+            stream_end_data["chat_history"] = self.chat_history
+        return stream_end_data
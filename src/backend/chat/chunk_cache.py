@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from backend.config.settings import Settings
+from backend.services.cache import cache_get, cache_put
+from backend.services.logger.utils import LoggerFactory
+
+# Maximum number of chunked documents kept in memory
+MAX_CACHED_CHUNKED_DOCUMENTS = 1024
+# Lifetime of the chunks stored in Redis, in seconds
+REDIS_CHUNKS_EXPIRE = 24 * 60 * 60
+REDIS_KEY_PREFIX = "chunks"
+
+logger = LoggerFactory().get_logger()
+
+chunk_cache = None
+
+
+def get_chunk_cache():
+    global chunk_cache
+    if chunk_cache is None:
+        chunk_cache = ChunkCache(use_redis=bool(Settings().redis.url))
+    return chunk_cache
+
+
+class ChunkCache:
+    """
+    Cache of chunk spans keyed by the content hash and the chunk parameters.
+
+    The same documents (e.g. uploaded files read by a tool) come back on every turn and
+    every step, only the spans are stored so the chunks are sliced from the content again.
+    Spans are kept in a process wide LRU cache and, when Redis is configured, shared
+    between workers through Redis.
+    """
+
+    def __init__(
+        self, max_size: int = MAX_CACHED_CHUNKED_DOCUMENTS, use_redis: bool = False
+    ):
+        self.max_size = max_size
+        self.use_redis = use_redis
+        self._spans: OrderedDict[str, list[tuple[int, int]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(content: str, soft_word_cut_off: int, hard_word_cut_off: int) -> str:
+        content_hash = hashlib.sha256(content.encode("utf-8", "surrogatepass"))
+        return f"{REDIS_KEY_PREFIX}:{content_hash.hexdigest()}:{soft_word_cut_off}:{hard_word_cut_off}"
+
+    def get(self, key: str) -> list[tuple[int, int]] | None:
+        with self._lock:
+            spans = self._spans.get(key)
+            if spans is not None:
+                self._spans.move_to_end(key)
+                return spans
+
+        if not self.use_redis:
+            return None
+
+        try:
+            value = cache_get(key)
+        except Exception as e:
+            logger.warning(event=f"[Chunk Cache] Error reading chunks from Redis: {e}")
+            return None
+
+        if value is None:
+            return None
+
+        spans = [tuple(span) for span in json.loads(value)]
+        self._put_local(key, spans)
+        return spans
+
+    def put(self, key: str, spans: list[tuple[int, int]]) -> None:
+        self._put_local(key, spans)
+
+        if not self.use_redis:
+            return
+
+        try:
+            cache_put(key, json.dumps(spans), expire=REDIS_CHUNKS_EXPIRE)
+        except Exception as e:
+            logger.warning(event=f"[Chunk Cache] Error writing chunks to Redis: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def _put_local(self, key: str, spans: list[tuple[int, int]]) -> None:
+        with self._lock:
+            self._spans[key] = spans
+            self._spans.move_to_end(key)
+            while len(self._spans) > self.max_size:
+                self._spans.popitem(last=False)
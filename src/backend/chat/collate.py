@@ -1,20 +1,30 @@
-import json
-from typing import Any, Dict, List
+import asyncio
+import math
+import re
+from typing import Any, Callable, Dict, List
 
 from fastapi import Depends
 
+from backend.chat.chunk_cache import get_chunk_cache
+from backend.chat.dedup import NearDuplicateFilter
+from backend.chat.rerank_cache import get_rerank_cache
 from backend.model_deployments.base import BaseDeployment
 from backend.schemas.context import Context
 from backend.services.context import get_context
 
 RELEVANCE_THRESHOLD = 0.1
+# Maximum number of documents sent in a single rerank request
+MAX_RERANK_BATCH_SIZE = 100
+# Maximum number of rerank requests running at the same time for a chat step
+MAX_CONCURRENT_RERANKS = 8
+WORD_PATTERN = re.compile(r"\S+")
 
 
 async def rerank_and_chunk(
     tool_results: List[Dict[str, Any]],
     model: BaseDeployment,
     ctx: Context,
-    **kwargs: Any
+    **kwargs: Any,
 ) -> List[Dict[str, Any]]:
     """
     Takes a list of tool_results and internally reranks the documents for each query, if there's one e.g:
@@ -50,8 +60,11 @@ async def rerank_and_chunk(
             tool_result["outputs"]
         )
 
-    # Rerank the documents for each query
+    # Chunk the documents of each tool call and group the tool calls by query
     reranked_results = {}
+    chunked_outputs_by_call = {}
+    tool_calls_by_query = {}
+    duplicate_filters = {}
     for tool_call_hashable, tool_result in unified_tool_results.items():
         tool_call = tool_result["call"]
         query = tool_call.get("parameters").get("query") or tool_call.get(
@@ -63,87 +76,336 @@ async def rerank_and_chunk(
             reranked_results[tool_call_hashable] = tool_result
             continue
 
+        # Overlapping passages of the documents of a query are only reranked once
+        duplicate_filter = duplicate_filters.setdefault(query, NearDuplicateFilter())
         chunked_outputs = []
         for output in tool_result["outputs"]:
             text = output.get("text")
 
             if not text:
-                chunked_outputs.append([output])
+                chunked_outputs.append(output)
                 continue
 
-            chunks = chunk(text)
-            chunked_outputs.extend([dict(output, text=chunk) for chunk in chunks])
+            chunks = chunk(text, use_cache=True)
+            chunked_outputs.extend(
+                [
+                    dict(output, text=chunk)
+                    for chunk in chunks
+                    if not duplicate_filter.is_duplicate(chunk)
+                ]
+            )
 
-        # If no documents to rerank, continue to the next query
+        # If no documents to rerank, e.g. all were duplicates, keep the tool call
+        # without outputs so it still has a result
         if not chunked_outputs:
+            reranked_results[tool_call_hashable] = {"call": tool_call, "outputs": []}
             continue
 
-        res = await model.invoke_rerank(
-            query=query,
-            documents=chunked_outputs,
-            ctx=ctx,
+        # Keep the position of the tool call in the results
+        reranked_results[tool_call_hashable] = None
+        chunked_outputs_by_call[tool_call_hashable] = chunked_outputs
+        tool_calls_by_query.setdefault(query, []).append(tool_call_hashable)
+
+    # Tool calls with the same query share one rerank, distinct queries are reranked concurrently
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_RERANKS)
+    queries = list(tool_calls_by_query.keys())
+    query_results = await asyncio.gather(
+        *[
+            rerank_documents(
+                query,
+                [
+                    chunked_output
+                    for tool_call_hashable in tool_calls_by_query[query]
+                    for chunked_output in chunked_outputs_by_call[tool_call_hashable]
+                ],
+                model,
+                semaphore,
+                ctx,
+            )
+            for query in queries
+        ]
+    )
+
+    # Map the results back to the documents of each tool call
+    for query, results in zip(queries, query_results):
+        offset = 0
+        for tool_call_hashable in tool_calls_by_query[query]:
+            tool_result = unified_tool_results[tool_call_hashable]
+            chunked_outputs = chunked_outputs_by_call[tool_call_hashable]
+            end = offset + len(chunked_outputs)
+
+            if results is None:
+                reranked_results[tool_call_hashable] = tool_result
+            else:
+                reranked_results[tool_call_hashable] = {
+                    "call": tool_result["call"],
+                    "outputs": [
+                        chunked_outputs[r["index"] - offset]
+                        for r in results
+                        if offset <= r["index"] < end
+                        and r["relevance_score"] > RELEVANCE_THRESHOLD
+                    ],
+                }
+            offset = end
+
+    return list(reranked_results.values())
+
+
+async def rerank_documents(
+    query: str,
+    documents: List[Dict[str, Any]],
+    model: BaseDeployment,
+    semaphore: asyncio.Semaphore,
+    ctx: Context,
+) -> List[Dict[str, Any]] | None:
+    """
+    Rerank documents for a query, splitting them in batches reranked concurrently.
+
+    Relevance scores are looked up in the rerank cache first, only the documents
+    without a cached score are sent to the deployment. Scores are cached per rerank
+    model id of the deployment, and not cached for deployments without one.
+
+    Args:
+        query (str): Query.
+        documents (List[Dict[str, Any]]): Documents to rerank.
+        model (BaseDeployment): Model deployment.
+        semaphore (asyncio.Semaphore): Limits the number of concurrent rerank requests.
+        ctx (Context): Context object.
+
+    Returns:
+        List[Dict[str, Any]] | None: Results with the index of the document and its relevance score,
+            sorted by relevance score. None if the deployment did not rerank the documents.
+    """
+    # Imported here, the metrics service depends on this module
+    from backend.services.metrics import RerankMetricsHelper
+
+    cache = get_rerank_cache()
+    rerank_model = model.rerank_model_id
+    keys = [
+        cache.get_key(rerank_model or "", query, document) for document in documents
+    ]
+    scores = {}
+    if rerank_model is not None:
+        scores = cache.get_many(keys)
+        RerankMetricsHelper.report_rerank_cache_metrics(
+            sum(key in scores for key in keys), len(keys), ctx
         )
 
+    # Send each uncached document once, even if it appears several times
+    first_indexes = {}
+    for index, key in enumerate(keys):
+        if key not in scores:
+            first_indexes.setdefault(key, index)
+    uncached_indexes = list(first_indexes.values())
+    uncached_documents = [documents[index] for index in uncached_indexes]
+
+    async def rerank_batch(start: int) -> List[Dict[str, Any]] | None:
+        async with semaphore:
+            res = await model.invoke_rerank(
+                query=query,
+                documents=uncached_documents[start : start + MAX_RERANK_BATCH_SIZE],
+                ctx=ctx,
+            )
+
         if not res:
-            reranked_results[tool_call_hashable] = tool_result
-            continue
+            return None
 
-        # Sort the results by relevance score
-        res["results"].sort(key=lambda x: x["relevance_score"], reverse=True)
+        return to_dict(res)["results"]
 
-        # Map the results back to the original documents
-        reranked_results[tool_call_hashable] = {
-            "call": tool_call,
-            "outputs": [
-                chunked_outputs[r["index"]]
-                for r in res["results"]
-                if r["relevance_score"] > RELEVANCE_THRESHOLD
-            ],
-        }
+    starts = range(0, len(uncached_documents), MAX_RERANK_BATCH_SIZE)
+    batch_results = await asyncio.gather(*[rerank_batch(start) for start in starts])
+    if any(results is None for results in batch_results):
+        return None
 
-    return list(reranked_results.values())
+    new_scores = {}
+    for start, results in zip(starts, batch_results):
+        for r in results:
+            index = uncached_indexes[start + r["index"]]
+            new_scores[keys[index]] = r["relevance_score"]
+    if rerank_model is not None:
+        cache.put_many(new_scores)
+    scores.update(new_scores)
+
+    # Merge the cached and reranked scores by relevance score
+    results = [
+        {"index": index, "relevance_score": scores[key]}
+        for index, key in enumerate(keys)
+        if key in scores
+    ]
+    results.sort(key=lambda x: x["relevance_score"], reverse=True)
+    return results
 
 
-def chunk(content, compact_mode=False, soft_word_cut_off=100, hard_word_cut_off=300):
+def chunk(
+    content: str,
+    compact_mode: bool = False,
+    soft_word_cut_off: int = 100,
+    hard_word_cut_off: int = 300,
+    use_cache: bool = False,
+) -> List[str]:
+    """
+    Split a text in chunks of words.
+
+    A chunk ends at the first word ending with a period once it has more than
+    soft_word_cut_off words, and is cut at hard_word_cut_off words otherwise.
+
+    Args:
+        content (str): Text to split.
+        compact_mode (bool): Whether to replace new lines with spaces in the chunks.
+        soft_word_cut_off (int): Number of words after which a chunk ends with the next sentence.
+        hard_word_cut_off (int): Maximum number of words of a chunk.
+        use_cache (bool): Whether to reuse the chunks of previously seen contents.
+
+    Returns:
+        List[str]: List of chunks.
+    """
+    if use_cache:
+        cache = get_chunk_cache()
+        key = cache.get_key(content, soft_word_cut_off, hard_word_cut_off)
+        spans = cache.get(key)
+        if spans is None:
+            spans = chunk_spans(content, soft_word_cut_off, hard_word_cut_off)
+            cache.put(key, spans)
+    else:
+        spans = chunk_spans(content, soft_word_cut_off, hard_word_cut_off)
+
+    chunks = [content[start:end] for start, end in spans]
     if compact_mode:
-        content = content.replace("\n", " ")
+        chunks = [chunk.replace("\n", " ") for chunk in chunks]
+    return chunks
+
 
-    chunks = []
-    current_chunk = ""
-    words = content.split()
+def chunk_spans(
+    content: str, soft_word_cut_off: int = 100, hard_word_cut_off: int = 300
+) -> List[tuple[int, int]]:
+    """
+    Find the chunks of a text in a single pass over its words.
+
+    Args:
+        content (str): Text to split.
+        soft_word_cut_off (int): Number of words after which a chunk ends with the next sentence.
+        hard_word_cut_off (int): Maximum number of words of a chunk.
+
+    Returns:
+        List[tuple[int, int]]: Start and end offsets of each chunk in the text.
+    """
+    spans = []
+    chunk_start = None
+    chunk_end = 0
     word_count = 0
 
-    for word in words:
-        if word_count + len(word.split()) > hard_word_cut_off:
+    for word in WORD_PATTERN.finditer(content):
+        word_start, word_end = word.span()
+
+        if word_count and word_count + 1 > hard_word_cut_off:
             # If adding the next word exceeds the hard limit, finalize the current chunk
-            chunks.append(current_chunk)
-            current_chunk = ""
+            spans.append((chunk_start, chunk_end))
+            chunk_start = None
             word_count = 0
 
-        if word_count + len(word.split()) > soft_word_cut_off and word.endswith("."):
+        if word_count + 1 > soft_word_cut_off and content[word_end - 1] == ".":
             # If adding the next word exceeds the soft limit and the word ends with a period, finalize the current chunk
-            current_chunk += " " + word
-            chunks.append(current_chunk.strip())
-            current_chunk = ""
+            spans.append((word_start if chunk_start is None else chunk_start, word_end))
+            chunk_start = None
             word_count = 0
         else:
             # Add the word to the current chunk
-            if current_chunk == "":
-                current_chunk = word
-            else:
-                current_chunk += " " + word
-            word_count += len(word.split())
+            if chunk_start is None:
+                chunk_start = word_start
+            chunk_end = word_end
+            word_count += 1
 
     # Add any remaining content as the last chunk
-    if current_chunk != "":
-        chunks.append(current_chunk.strip())
+    if chunk_start is not None:
+        spans.append((chunk_start, chunk_end))
 
-    return chunks
+    return spans
 
 
-def to_dict(obj):
-    return json.loads(
-        json.dumps(
-            obj, default=lambda o: o.__dict__ if hasattr(o, "__dict__") else str(o)
-        )
+def to_dict(obj: Any) -> Any:
+    """
+    Convert an object to JSON compatible primitives (dicts, lists, strings, numbers, booleans and None).
+
+    The output is the same as json.loads(json.dumps(obj, default=...)), where objects are
+    converted through their __dict__ or str(), but without building the intermediate JSON string.
+
+    Args:
+        obj (Any): Object to convert, e.g. a cohere StreamedChatResponse.
+
+    Returns:
+        Any: Converted object.
+    """
+    return _get_converter(type(obj))(obj)
+
+
+def _get_converter(obj_type: type) -> Callable[[Any], Any]:
+    converter = _converters.get(obj_type)
+    if converter is None:
+        converter = _converters[obj_type] = _find_converter(obj_type)
+    return converter
+
+
+def _find_converter(obj_type: type) -> Callable[[Any], Any]:
+    # Same type checks, in the same order, as the json encoder
+    if issubclass(obj_type, str):
+        return _identity if obj_type is str else str.__str__
+    if obj_type is type(None) or obj_type is bool:
+        return _identity
+    if issubclass(obj_type, int):
+        return _identity if obj_type is int else int
+    if issubclass(obj_type, float):
+        return _identity if obj_type is float else float
+    if issubclass(obj_type, (list, tuple)):
+        return _convert_list
+    if issubclass(obj_type, dict):
+        return _convert_dict
+    return _convert_object
+
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+
+def _convert_list(obj: list | tuple) -> list:
+    return [_get_converter(type(item))(item) for item in obj]
+
+
+def _convert_dict(obj: dict) -> dict:
+    return {
+        _convert_key(key): _get_converter(type(value))(value)
+        for key, value in obj.items()
+    }
+
+
+def _convert_object(obj: Any) -> Any:
+    converted = obj.__dict__ if hasattr(obj, "__dict__") else str(obj)
+    return _get_converter(type(converted))(converted)
+
+
+def _convert_key(key: Any) -> str:
+    # JSON object keys are always strings, convert them like the json encoder does
+    if isinstance(key, str):
+        return str.__str__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        if key != key:
+            return "NaN"
+        if key == math.inf:
+            return "Infinity"
+        if key == -math.inf:
+            return "-Infinity"
+        return float.__repr__(key)
+    raise TypeError(
+        f"keys must be str, int, float, bool or None, not {type(key).__name__}"
     )
+
+
+# Converter per object type, resolved once per type
+_converters: Dict[type, Callable[[Any], Any]] = {}
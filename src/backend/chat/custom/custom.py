@@ -1,10 +1,15 @@
-from typing import Any, AsyncGenerator, Dict, List
+import asyncio
+from contextlib import nullcontext
+from typing import Any, AsyncGenerator, ContextManager, Dict, List
 
+import anyio
 from fastapi import HTTPException
+from sqlalchemy.orm import Session
 
 from backend.chat.base import BaseChat
 from backend.chat.collate import rerank_and_chunk, to_dict
 from backend.chat.custom.utils import get_deployment
+from backend.chat.dedup import deduplicate_tool_results
 from backend.chat.enums import StreamEvent
 from backend.config.tools import AVAILABLE_TOOLS, ToolName
 from backend.database_models.file import File
@@ -13,9 +18,12 @@ from backend.schemas.chat import ChatMessage, ChatRole
 from backend.schemas.cohere_chat import CohereChatRequest
 from backend.schemas.context import Context
 from backend.schemas.tool import Tool
-from backend.services.file import get_file_service
+from backend.services.file import get_file_metadata, get_file_service
+from backend.services.file_store import get_file_text
 
 MAX_STEPS = 15
+MAX_CONCURRENT_TOOL_CALLS = 8
+TOOL_CALL_TIMEOUT = 60  # seconds
 
 
 class CustomChat(BaseChat):
@@ -138,7 +146,6 @@ class CustomChat(BaseChat):
     ):
         logger = ctx.get_logger()
         managed_tools = self.get_managed_tools(chat_request)
-        session = kwargs.get("session")
         user_id = ctx.get_user_id()
         agent_id = ctx.get_agent_id()
 
@@ -150,21 +157,22 @@ class CustomChat(BaseChat):
         # Add files to chat history if the tool requires it and files are provided
         if chat_request.file_ids or chat_request.agent_id:
             if ToolName.Read_File in tool_names or ToolName.Search_File in tool_names:
-                files = get_file_service().get_files_by_conversation_id(
-                    session, user_id, ctx.get_conversation_id()
-                )
-
-                agent_files = []
-                if agent_id:
-                    agent_files = get_file_service().get_files_by_agent_id(
-                        session, user_id, agent_id
+                with self.open_session(**kwargs) as session:
+                    files = get_file_service().get_files_by_conversation_id(
+                        session, user_id, ctx.get_conversation_id()
                     )
 
-                chat_request.chat_history = self.add_files_to_chat_history(
-                    chat_request.chat_history,
-                    session,
-                    files + agent_files,
-                )
+                    agent_files = []
+                    if agent_id:
+                        agent_files = get_file_service().get_files_by_agent_id(
+                            session, user_id, agent_id
+                        )
+
+                    chat_request.chat_history = await self.add_files_to_chat_history(
+                        chat_request.chat_history,
+                        session,
+                        files + agent_files,
+                    )
         else:
             # TODO: remove this workaround
             # For now we're removing the Read_File and Search_File tools if no files are provided
@@ -246,29 +254,22 @@ class CustomChat(BaseChat):
             tool_plan=to_dict(tool_plan),
         )
 
-        # TODO: Call tools in parallel
-        for tool_call in tool_calls:
-            tool = AVAILABLE_TOOLS.get(tool_call["name"])
-            if not tool:
-                continue
-
-            outputs = await tool.implementation().call(
-                parameters=tool_call.get("parameters"),
-                ctx=ctx,
-                session=kwargs.get("session"),
-                model_deployment=deployment_model,
-                user_id=ctx.get_user_id(),
-                trace_id=ctx.get_trace_id(),
-                agent_id=ctx.get_agent_id(),
-                agent_tool_metadata=ctx.get_agent_tool_metadata(),
-            )
+        # Call the tools concurrently, gather keeps the results in the tool call order
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOL_CALLS)
+        tool_outputs = await asyncio.gather(
+            *[
+                self.call_tool(tool_call, semaphore, deployment_model, ctx, **kwargs)
+                for tool_call in tool_calls
+            ]
+        )
 
-            # If the tool returns a list of outputs, append each output to the tool_results list
-            # Otherwise, append the single output to the tool_results list
-            outputs = outputs if isinstance(outputs, list) else [outputs]
+        # Append each output of each tool call to the tool_results list
+        for tool_call, outputs in zip(tool_calls, tool_outputs):
             for output in outputs:
                 tool_results.append({"call": tool_call, "outputs": [output]})
 
+        # The same passages often come back from several tools or queries
+        tool_results = deduplicate_tool_results(tool_results)
         tool_results = await rerank_and_chunk(
             tool_results, deployment_model, ctx, **kwargs
         )
@@ -279,6 +280,69 @@ class CustomChat(BaseChat):
 
         return tool_results
 
+    async def call_tool(
+        self,
+        tool_call: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        deployment_model: BaseDeployment,
+        ctx: Context,
+        **kwargs: Any,
+    ) -> List[Dict[str, Any]]:
+        logger = ctx.get_logger()
+
+        tool = AVAILABLE_TOOLS.get(tool_call["name"])
+        if not tool:
+            return []
+
+        # Each tool call gets its own session, concurrent calls can't share one
+        async with semaphore:
+            try:
+                with self.open_session(**kwargs) as session:
+                    outputs = await asyncio.wait_for(
+                        tool.implementation().call(
+                            parameters=tool_call.get("parameters"),
+                            ctx=ctx,
+                            session=session,
+                            model_deployment=deployment_model,
+                            user_id=ctx.get_user_id(),
+                            trace_id=ctx.get_trace_id(),
+                            agent_id=ctx.get_agent_id(),
+                            agent_tool_metadata=ctx.get_agent_tool_metadata(),
+                        ),
+                        timeout=TOOL_CALL_TIMEOUT,
+                    )
+            except HTTPException:
+                # e.g. tool authentication errors, these have to reach the user
+                raise
+            except asyncio.TimeoutError:
+                logger.error(
+                    event=f"[Custom Chat] Tool {tool_call['name']} timed out after {TOOL_CALL_TIMEOUT}s",
+                )
+                return [{"text": f"Tool {tool_call['name']} timed out."}]
+            except Exception as e:
+                # A failing tool should not fail the other tool calls of the step
+                logger.error(
+                    event=f"[Custom Chat] Error calling tool {tool_call['name']}: {e}",
+                )
+                return [{"text": f"Error calling tool {tool_call['name']}: {e}"}]
+
+        # If the tool returns a list of outputs, return each output
+        # Otherwise, return the single output as a list
+        return outputs if isinstance(outputs, list) else [outputs]
+
+    def open_session(self, **kwargs: Any) -> ContextManager[Session | None]:
+        """
+        Open a short-lived session from the session factory passed to chat, so the
+        database connection is only held while it is used.
+
+        Returns:
+            ContextManager[Session | None]: Session, None without a session factory.
+        """
+        session_factory = kwargs.get("session_factory")
+        if session_factory is None:
+            return nullcontext()
+        return session_factory()
+
     def get_managed_tools(self, chat_request: CohereChatRequest):
         return [
             Tool(**AVAILABLE_TOOLS.get(tool.name).model_dump())
@@ -286,7 +350,7 @@ class CustomChat(BaseChat):
             if AVAILABLE_TOOLS.get(tool.name)
         ]
 
-    def add_files_to_chat_history(
+    async def add_files_to_chat_history(
         self,
         chat_history: List[Dict[str, str]],
         session: Any,
@@ -298,11 +362,15 @@ class CustomChat(BaseChat):
         files_message = "The user uploaded the following attachments:\n"
 
         for file in files:
-            word_count = len(file.file_content.split())
-
-            # Use the first 25 words as the document preview in the preamble
-            num_words = min(25, word_count)
-            preview = " ".join(file.file_content.split()[:num_words])
+            # The word count and preview are computed at upload, except for older files
+            word_count = file.word_count
+            preview = file.preview
+            if word_count is None or preview is None:
+                # Read and computed off the event loop, the text may come from S3
+                content = await anyio.to_thread.run_sync(get_file_text, file)
+                metadata = await anyio.to_thread.run_sync(get_file_metadata, content)
+                word_count = metadata["word_count"]
+                preview = metadata["preview"]
 
             files_message += f"Filename: {file.file_name}\nWord Count: {word_count} Preview: {preview}\n\n"
 
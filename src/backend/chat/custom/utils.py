@@ -2,15 +2,19 @@ from typing import Any
 
 from backend.config.deployments import (
     AVAILABLE_MODEL_DEPLOYMENTS,
-    get_default_deployment,
+    get_default_deployment_config,
 )
 from backend.model_deployments.base import BaseDeployment
+from backend.model_deployments.registry import get_deployment_registry
 from backend.schemas.context import Context
 
 
 def get_deployment(name: str, ctx: Context, **kwargs: Any) -> BaseDeployment:
     """Get the deployment implementation.
 
+    Instances are reused across requests through the deployment registry, so upstream
+    connections are kept alive between chats.
+
     Args:
         deployment (str): Deployment name.
 
@@ -25,12 +29,12 @@ def get_deployment(name: str, ctx: Context, **kwargs: Any) -> BaseDeployment:
 
     # Check provided deployment against config const
     if deployment is not None:
-        return deployment.deployment_class(**kwargs, **deployment.kwargs)
+        return get_deployment_registry().get(deployment, ctx, **kwargs)
 
     # Fallback to first available deployment
-    default = get_default_deployment(**kwargs)
+    default = get_default_deployment_config()
     if default is not None:
-        return default
+        return get_deployment_registry().get(default, ctx, **kwargs)
 
     raise ValueError(
         f"Deployment {name} is not supported, and no available deployments were found."
@@ -0,0 +1,136 @@
+import hashlib
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Number of words per shingle
+SHINGLE_SIZE = 2
+# Texts with fewer words are only compared exactly, their signatures are not reliable
+MIN_NEAR_DUPLICATE_WORDS = 8
+# Minimum estimated Jaccard similarity of the shingles of near duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.7
+# MinHash signatures are split in bands, candidate near duplicates share at least one band
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 32
+
+# Random hash functions h(x) = a * x + b (mod 2^64) with odd multipliers
+_rng = np.random.default_rng(0)
+_multipliers = (
+    _rng.integers(0, 2**62, NUM_PERMUTATIONS, dtype=np.uint64) * np.uint64(2)
+) | np.uint64(1)
+_increments = _rng.integers(0, 2**62, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def minhash(tokens: List[str]) -> np.ndarray:
+    """
+    Compute the MinHash signature of a text from its word shingles.
+
+    Args:
+        tokens (List[str]): Words of the text.
+
+    Returns:
+        np.ndarray: Minimum of each hash function over the shingles.
+    """
+    shingles = [
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1))
+    ]
+    # Signatures are only compared within a process, so the builtin hash is enough
+    hashes = np.array([hash(shingle) for shingle in shingles], dtype=np.int64)
+    hashes = hashes.view(np.uint64)[:, np.newaxis]
+    return (hashes * _multipliers + _increments).min(axis=0)
+
+
+class NearDuplicateFilter:
+    """
+    Detects texts that are identical or nearly identical to a previously seen text.
+
+    Exact duplicates are found by the hash of the normalized text. Near duplicates are
+    found by comparing MinHash signatures, indexed by bands so a text is only compared
+    with the texts sharing a band with it.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._digests: set[bytes] = set()
+        self._signatures: List[np.ndarray] = []
+        self._bands: Dict[tuple[int, bytes], List[int]] = {}
+
+    def is_duplicate(self, text: str) -> bool:
+        """
+        Check whether a text duplicates a seen text, and remember it otherwise.
+
+        Args:
+            text (str): Text to check.
+
+        Returns:
+            bool: Whether the text is a duplicate.
+        """
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        digest = hashlib.blake2b(
+            " ".join(tokens).encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        if digest in self._digests:
+            return True
+        self._digests.add(digest)
+
+        if len(tokens) < MIN_NEAR_DUPLICATE_WORDS:
+            return False
+
+        signature = minhash(tokens)
+        bands = [
+            (band, rows.tobytes())
+            for band, rows in enumerate(np.split(signature, NUM_BANDS))
+        ]
+        candidates = {
+            candidate for band in bands for candidate in self._bands.get(band, [])
+        }
+        for candidate in candidates:
+            similarity = np.mean(self._signatures[candidate] == signature)
+            if similarity >= self.threshold:
+                return True
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band in bands:
+            self._bands.setdefault(band, []).append(index)
+        return False
+
+
+def deduplicate_tool_results(
+    tool_results: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Drop the retrieved documents whose text duplicates the text of an earlier one.
+
+    Only the outputs of retrieval tool calls, the calls with a query like the ones
+    reranked, are deduplicated. The outputs of other tools, e.g. two calculator
+    results, are answers of their own and are always kept. Tool results left without
+    outputs are kept with an empty list of outputs, so every tool call still has a
+    result. Outputs without text are kept.
+
+    Args:
+        tool_results (List[Dict[str, Any]]): Tool results, each with a call and a list of outputs.
+
+    Returns:
+        List[Dict[str, Any]]: Deduplicated tool results.
+    """
+    duplicate_filter = NearDuplicateFilter()
+    deduplicated_results = []
+    for tool_result in tool_results:
+        parameters = tool_result["call"].get("parameters") or {}
+        if not (parameters.get("query") or parameters.get("search_query")):
+            deduplicated_results.append(tool_result)
+            continue
+
+        outputs = [
+            output
+            for output in tool_result["outputs"]
+            if not isinstance(output.get("text"), str)
+            or not output["text"]
+            or not duplicate_filter.is_duplicate(output["text"])
+        ]
+        deduplicated_results.append(dict(tool_result, outputs=outputs))
+    return deduplicated_results
@@ -0,0 +1,68 @@
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.chat.enums import StreamEvent
+from backend.schemas.chat import (
+    ChatResponseEvent,
+    StreamEventType,
+    StreamTextGeneration,
+    StreamToolCallsChunk,
+)
+
+# Pre-rendered envelope of text generation events, only the text changes per token
+TEXT_GENERATION_PREFIX = (
+    '{"event": "' + StreamEvent.TEXT_GENERATION.value + '", "data": {"text": '
+)
+TEXT_GENERATION_SUFFIX = "}}"
+
+
+def encode_chat_event(stream_event: StreamEventType) -> str:
+    """
+    Encode a stream event as the JSON payload of a server-sent event.
+
+    Text generation and tool calls chunk events are emitted once per token, so they are
+    rendered directly instead of going through ChatResponseEvent and jsonable_encoder.
+    The output is identical to the generic path.
+
+    Args:
+        stream_event (StreamEventType): Stream event.
+
+    Returns:
+        str: JSON encoded ChatResponseEvent.
+    """
+    if isinstance(stream_event, StreamTextGeneration):
+        return (
+            TEXT_GENERATION_PREFIX
+            + json.dumps(stream_event.text)
+            + TEXT_GENERATION_SUFFIX
+        )
+
+    if isinstance(stream_event, StreamToolCallsChunk):
+        tool_call_delta = stream_event.tool_call_delta
+        return json.dumps(
+            {
+                "event": StreamEvent.TOOL_CALLS_CHUNK.value,
+                "data": {
+                    "tool_call_delta": (
+                        {
+                            "name": tool_call_delta.name,
+                            "index": tool_call_delta.index,
+                            "parameters": tool_call_delta.parameters,
+                        }
+                        if tool_call_delta is not None
+                        else None
+                    ),
+                    "text": stream_event.text,
+                },
+            }
+        )
+
+    return json.dumps(
+        jsonable_encoder(
+            ChatResponseEvent(
+                event=stream_event.event_type.value,
+                data=stream_event,
+            )
+        )
+    )
@@ -0,0 +1,135 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from backend.config.settings import Settings
+from backend.services.cache import cache_get_many, cache_put_many
+from backend.services.logger.utils import LoggerFactory
+
+# Maximum number of relevance scores kept in memory
+MAX_CACHED_RERANK_SCORES = 50_000
+# Lifetime of the relevance scores stored in Redis, in seconds
+REDIS_RERANK_SCORES_EXPIRE = 24 * 60 * 60
+REDIS_KEY_PREFIX = "rerank"
+
+logger = LoggerFactory().get_logger()
+
+rerank_cache = None
+
+
+def get_rerank_cache():
+    global rerank_cache
+    if rerank_cache is None:
+        rerank_cache = RerankCache(use_redis=bool(Settings().redis.url))
+    return rerank_cache
+
+
+class RerankCache:
+    """
+    Cache of rerank relevance scores per rerank model, query and document.
+
+    The same chunks are reranked against the same queries across the steps of a chat
+    and across chats on the same files. Scores are kept in a process wide LRU cache
+    and, when Redis is configured, shared between workers through Redis.
+    """
+
+    def __init__(
+        self, max_size: int = MAX_CACHED_RERANK_SCORES, use_redis: bool = False
+    ):
+        self.max_size = max_size
+        self.use_redis = use_redis
+        self.hits = 0
+        self.misses = 0
+        self._scores: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(rerank_model: str, query: str, document: Dict[str, Any]) -> str:
+        # Normalize the query whitespace, the rerank models ignore it
+        normalized_query = " ".join(query.split())
+        text = document.get("text")
+        content = text if isinstance(text, str) else str(document)
+        digest = hashlib.sha256()
+        for part in (rerank_model, normalized_query, content):
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        return f"{REDIS_KEY_PREFIX}:{digest.hexdigest()}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, float]:
+        """
+        Get the cached relevance scores of documents.
+
+        Args:
+            keys (List[str]): Cache keys, see get_key.
+
+        Returns:
+            Dict[str, float]: Relevance score of each cached key.
+        """
+        scores = {}
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                    scores[key] = score
+
+        missing_keys = [key for key in dict.fromkeys(keys) if key not in scores]
+        if self.use_redis and missing_keys:
+            try:
+                values = cache_get_many(missing_keys)
+            except Exception as e:
+                logger.warning(
+                    event=f"[Rerank Cache] Error reading scores from Redis: {e}"
+                )
+                values = []
+
+            redis_scores = {
+                key: float(value)
+                for key, value in zip(missing_keys, values)
+                if value is not None
+            }
+            self._put_local(redis_scores)
+            scores.update(redis_scores)
+
+        hits = sum(key in scores for key in keys)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return scores
+
+    def put_many(self, scores: Dict[str, float]) -> None:
+        if not scores:
+            return
+
+        self._put_local(scores)
+
+        if not self.use_redis:
+            return
+
+        try:
+            cache_put_many(scores, expire=REDIS_RERANK_SCORES_EXPIRE)
+        except Exception as e:
+            logger.warning(event=f"[Rerank Cache] Error writing scores to Redis: {e}")
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _put_local(self, scores: Dict[str, float]) -> None:
+        with self._lock:
+            for key, score in scores.items():
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
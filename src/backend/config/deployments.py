@@ -101,26 +101,33 @@ def get_available_deployments() -> dict[ModelDeploymentName, Deployment]:
     return ALL_MODEL_DEPLOYMENTS
 
 
-def get_default_deployment(**kwargs) -> BaseDeployment:
+def get_default_deployment_config() -> Deployment | None:
     # Fallback to the first available deployment
-    fallback = None
-    for deployment in AVAILABLE_MODEL_DEPLOYMENTS.values():
-        if deployment.is_available:
-            fallback = deployment.deployment_class(**kwargs)
-            break
+    fallback = next(
+        (
+            deployment
+            for deployment in AVAILABLE_MODEL_DEPLOYMENTS.values()
+            if deployment.is_available
+        ),
+        None,
+    )
 
     default = Settings().deployments.default_deployment
     if default:
         return next(
-            (
-                v.deployment_class(**kwargs)
-                for k, v in AVAILABLE_MODEL_DEPLOYMENTS.items()
-                if v.id == default
-            ),
+            (v for v in AVAILABLE_MODEL_DEPLOYMENTS.values() if v.id == default),
             fallback,
         )
     else:
         return fallback
 
 
+def get_default_deployment(**kwargs) -> BaseDeployment:
+    deployment = get_default_deployment_config()
+    if deployment is None:
+        return None
+
+    return deployment.deployment_class(**kwargs)
+
+
 AVAILABLE_MODEL_DEPLOYMENTS = get_available_deployments()
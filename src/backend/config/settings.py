@@ -1,5 +1,5 @@
 import sys
-from typing import List, Optional, Tuple, Type
+from typing import Dict, List, Optional, Tuple, Type
 
 from pydantic import AliasChoices, BaseModel, Field
 from pydantic_settings import (
@@ -171,6 +171,18 @@ class DatabaseSettings(BaseSettings, BaseModel):
     migrate_token: Optional[str] = Field(
         default=None, validation_alias=AliasChoices("MIGRATE_TOKEN", "migrate_token")
     )
+    pool_size: int = Field(
+        default=5, validation_alias=AliasChoices("DATABASE_POOL_SIZE", "pool_size")
+    )
+    max_overflow: int = Field(
+        default=10,
+        validation_alias=AliasChoices("DATABASE_MAX_OVERFLOW", "max_overflow"),
+    )
+    # Seconds to wait for a connection when the pool is exhausted
+    pool_timeout: int = Field(
+        default=30,
+        validation_alias=AliasChoices("DATABASE_POOL_TIMEOUT", "pool_timeout"),
+    )
 
 
 class RedisSettings(BaseSettings, BaseModel):
@@ -254,6 +266,11 @@ class DeploymentSettings(BaseSettings, BaseModel):
     model_config = setting_config
     default_deployment: Optional[str] = None
     enabled_deployments: Optional[List[str]] = None
+    # Rerank with a local BM25 ranker on deployments without a rerank endpoint, opt-in
+    use_lexical_rerank: Optional[bool] = Field(
+        default=False,
+        validation_alias=AliasChoices("USE_LEXICAL_RERANK", "use_lexical_rerank"),
+    )
 
     sagemaker: Optional[SageMakerSettings] = Field(default=SageMakerSettings())
     azure: Optional[AzureSettings] = Field(default=AzureSettings())
@@ -266,6 +283,58 @@ class DeploymentSettings(BaseSettings, BaseModel):
     bedrock: Optional[BedrockSettings] = Field(default=BedrockSettings())
 
 
+class ChatSettings(BaseSettings, BaseModel):
+    model_config = setting_config
+    history_token_budget: Optional[int] = Field(
+        default=8000,
+        validation_alias=AliasChoices(
+            "CHAT_HISTORY_TOKEN_BUDGET", "history_token_budget"
+        ),
+    )
+    # Per model overrides of history_token_budget
+    history_token_budgets_by_model: Optional[Dict[str, int]] = Field(
+        default=None,
+        validation_alias=AliasChoices(
+            "CHAT_HISTORY_TOKEN_BUDGETS_BY_MODEL", "history_token_budgets_by_model"
+        ),
+    )
+    summarize_dropped_history: Optional[bool] = Field(
+        default=False,
+        validation_alias=AliasChoices(
+            "CHAT_SUMMARIZE_DROPPED_HISTORY", "summarize_dropped_history"
+        ),
+    )
+
+
+class FileSettings(BaseSettings, BaseModel):
+    model_config = setting_config
+    # Maximum number of processes parsing uploaded files, 0 parses them in threads
+    parse_workers: Optional[int] = Field(
+        default=2,
+        validation_alias=AliasChoices("FILE_PARSE_WORKERS", "parse_workers"),
+    )
+    # Maximum time to parse one file, in seconds
+    parse_timeout: Optional[float] = Field(
+        default=60,
+        validation_alias=AliasChoices("FILE_PARSE_TIMEOUT", "parse_timeout"),
+    )
+    # Backend of the extracted file contents, local or s3
+    content_store: Optional[str] = Field(
+        default="local",
+        validation_alias=AliasChoices("FILE_CONTENT_STORE", "content_store"),
+    )
+    content_store_path: Optional[str] = Field(
+        default="src/backend/data/file_contents",
+        validation_alias=AliasChoices("FILE_CONTENT_STORE_PATH", "content_store_path"),
+    )
+    content_store_bucket: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices(
+            "FILE_CONTENT_STORE_BUCKET", "content_store_bucket"
+        ),
+    )
+
+
 class LoggerSettings(BaseSettings, BaseModel):
     model_config = setting_config
     level: Optional[str] = Field(
@@ -304,6 +373,8 @@ class Settings(BaseSettings, case_sensitive=False):
     database: Optional[DatabaseSettings] = Field(default=DatabaseSettings())
     redis: Optional[RedisSettings] = Field(default=RedisSettings())
     deployments: Optional[DeploymentSettings] = Field(default=DeploymentSettings())
+    chat: Optional[ChatSettings] = Field(default=ChatSettings())
+    files: Optional[FileSettings] = Field(default=FileSettings())
     logger: Optional[LoggerSettings] = Field(default=LoggerSettings())
 
     @classmethod
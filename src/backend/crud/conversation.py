@@ -4,6 +4,7 @@ from backend.database_models.conversation import (
     Conversation,
     ConversationFileAssociation,
 )
+from backend.database_models.message import Message
 from backend.schemas.conversation import UpdateConversationRequest
 from backend.services.transaction import validate_transaction
 
@@ -104,6 +105,32 @@ def update_conversation(
     return conversation
 
 
+@validate_transaction
+def save_conversation_turn(
+    db: Session,
+    conversation_id: str,
+    user_id: str,
+    messages: list[Message],
+    description: str | None = None,
+) -> None:
+    """
+    Store the messages of a chat turn and update the conversation description in a single transaction.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+        messages (list[Message]): Messages of the turn, with their tool calls, documents and citations.
+        description (str): New conversation description.
+    """
+    db.add_all(messages)
+    if description is not None:
+        db.query(Conversation).filter(
+            Conversation.id == conversation_id, Conversation.user_id == user_id
+        ).update({"description": description}, synchronize_session=False)
+    db.commit()
+
+
 @validate_transaction
 def delete_conversation(db: Session, conversation_id: str, user_id: str) -> None:
     """
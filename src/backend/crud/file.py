@@ -1,6 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, undefer_group
 
-from backend.database_models.file import File
+from backend.database_models.file import FILE_CONTENT_GROUP, File
 from backend.schemas.file import UpdateFileRequest
 from backend.services.transaction import validate_transaction
 
@@ -70,7 +71,9 @@ def get_files(db: Session, user_id: str, offset: int = 0, limit: int = 100):
     )
 
 
-def get_files_by_ids(db: Session, file_ids: list[str], user_id: str) -> list[File]:
+def get_files_by_ids(
+    db: Session, file_ids: list[str], user_id: str, load_content: bool = False
+) -> list[File]:
     """
     Get files by IDs.
 
@@ -78,16 +81,20 @@ def get_files_by_ids(db: Session, file_ids: list[str], user_id: str) -> list[Fil
         db (Session): Database session.
         file_ids (list[str]): File IDs.
         user_id (str): User ID.
+        load_content (bool): Whether to load the file contents, loaded on access otherwise.
 
     Returns:
         list[File]: List of files with the given IDs.
     """
-    return db.query(File).filter(File.id.in_(file_ids), File.user_id == user_id).all()
+    query = db.query(File).filter(File.id.in_(file_ids), File.user_id == user_id)
+    if load_content:
+        query = query.options(undefer_group(FILE_CONTENT_GROUP))
+    return query.all()
 
 
 @validate_transaction
 def get_files_by_file_names(
-    db: Session, file_names: list[str], user_id: str
+    db: Session, file_names: list[str], user_id: str, load_content: bool = False
 ) -> list[File]:
     """
     Get files by file names.
@@ -96,15 +103,17 @@ def get_files_by_file_names(
         db (Session): Database session.
         file_names (list[str]): File names.
         user_id (str): User ID.
+        load_content (bool): Whether to load the file contents, loaded on access otherwise.
 
     Returns:
         list[File]: List of files with the given file names.
     """
-    return (
-        db.query(File)
-        .filter(File.file_name.in_(file_names), File.user_id == user_id)
-        .all()
+    query = db.query(File).filter(
+        File.file_name.in_(file_names), File.user_id == user_id
     )
+    if load_content:
+        query = query.options(undefer_group(FILE_CONTENT_GROUP))
+    return query.all()
 
 
 @validate_transaction
@@ -122,6 +131,55 @@ def get_files_by_user_id(db: Session, user_id: str) -> list[File]:
     return db.query(File).filter(File.user_id == user_id).all()
 
 
+@validate_transaction
+def get_total_file_size(db: Session, user_id: str) -> int:
+    """
+    Get the total size of the files of a user, summed by the database.
+
+    Args:
+        db (Session): Database session.
+        user_id (str): User ID.
+
+    Returns:
+        int: Total file size in bytes.
+    """
+    return (
+        db.query(func.coalesce(func.sum(File.file_size), 0))
+        .filter(File.user_id == user_id)
+        .scalar()
+    )
+
+
+@validate_transaction
+def count_files_by_content_hash(db: Session, content_hash: str) -> int:
+    """
+    Count the files of all users referencing a stored content.
+
+    Args:
+        db (Session): Database session.
+        content_hash (str): Content hash.
+
+    Returns:
+        int: Number of files with the given content hash.
+    """
+    return db.query(File).filter(File.content_hash == content_hash).count()
+
+
+@validate_transaction
+def lock_content_hashes(db: Session, content_hashes: list[str]) -> None:
+    """
+    Lock stored contents until the end of the transaction, so a content isn't collected
+    while files referencing it are created.
+
+    Args:
+        db (Session): Database session.
+        content_hashes (list[str]): Content hashes.
+    """
+    # Locks are taken in the same order by every transaction, to avoid deadlocks
+    for content_hash in sorted(set(content_hashes)):
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(content_hash))))
+
+
 @validate_transaction
 def update_file(db: Session, file: File, new_file: UpdateFileRequest) -> File:
     """
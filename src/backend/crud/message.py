@@ -1,3 +1,4 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from backend.database_models.message import Message, MessageFileAssociation
@@ -90,6 +91,101 @@ def get_messages_by_conversation_id(
     )
 
 
+@validate_transaction
+def get_max_message_position(
+    db: Session, conversation_id: str, user_id: str
+) -> int | None:
+    """
+    Get the highest position of the active messages of a conversation.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+
+    Returns:
+        int | None: Highest message position, None if the conversation has no active messages.
+    """
+    return (
+        db.query(func.max(Message.position))
+        .filter(
+            Message.conversation_id == conversation_id,
+            Message.user_id == user_id,
+            Message.is_active.is_(True),
+        )
+        .scalar()
+    )
+
+
+@validate_transaction
+def get_last_active_messages(
+    db: Session,
+    conversation_id: str,
+    user_id: str,
+    before_position: int,
+    limit: int,
+) -> list[Message]:
+    """
+    List the last active messages of a conversation before a position, in conversation order.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+        before_position (int): Only messages with a lower position are listed.
+        limit (int): Maximum number of messages to list.
+
+    Returns:
+        list[Message]: List of messages, oldest first.
+    """
+    messages = (
+        db.query(Message)
+        .filter(
+            Message.conversation_id == conversation_id,
+            Message.user_id == user_id,
+            Message.is_active.is_(True),
+            Message.position < before_position,
+        )
+        .order_by(Message.position.desc(), Message.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    messages.reverse()
+    return messages
+
+
+@validate_transaction
+def get_messages_version(
+    db: Session, conversation_id: str, user_id: str, before_position: int
+) -> tuple:
+    """
+    Get a version of the messages of a conversation before a position, changing when
+    a message is added, edited, deactivated or deleted.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+        before_position (int): Only messages with a lower position are considered.
+
+    Returns:
+        tuple: Last update time of the messages and number of active messages.
+    """
+    last_updated_at, num_active_messages = (
+        db.query(
+            func.max(Message.updated_at),
+            func.count(Message.id).filter(Message.is_active.is_(True)),
+        )
+        .filter(
+            Message.conversation_id == conversation_id,
+            Message.user_id == user_id,
+            Message.position < before_position,
+        )
+        .one()
+    )
+    return last_updated_at, num_active_messages
+
+
 @validate_transaction
 def update_message(
     db: Session, message: Message, new_message: UpdateMessage
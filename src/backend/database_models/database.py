@@ -1,5 +1,7 @@
-from typing import Annotated, Any, Generator
+import functools
+from typing import Annotated, Any, Callable, Generator, TypeVar
 
+import anyio
 from dotenv import load_dotenv
 from fastapi import Depends
 from sqlalchemy import create_engine
@@ -9,9 +11,13 @@ from backend.config.settings import Settings
 
 load_dotenv()
 
-SQLALCHEMY_DATABASE_URL = Settings().database.url
+database_settings = Settings().database
+SQLALCHEMY_DATABASE_URL = database_settings.url
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, pool_size=5, max_overflow=10, pool_timeout=30
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=database_settings.pool_size,
+    max_overflow=database_settings.max_overflow,
+    pool_timeout=database_settings.pool_timeout,
 )
 
 
@@ -21,3 +27,68 @@ def get_session() -> Generator[Session, Any, None]:
 
 
 DBSessionDep = Annotated[Session, Depends(get_session)]
+
+SessionFactory = Callable[[], Session]
+
+
+def get_session_factory(session: DBSessionDep) -> SessionFactory:
+    """
+    Factory of short-lived sessions, for the database work done while a response streams.
+
+    Each session holds a pooled connection only until it is closed, instead of for the
+    whole stream. The sessions share the bind of the request session, so they use the
+    same database as the overrides of get_session.
+    """
+    return functools.partial(Session, session.get_bind(), expire_on_commit=False)
+
+
+SessionFactoryDep = Annotated[SessionFactory, Depends(get_session_factory)]
+
+
+T = TypeVar("T")
+
+
+class AsyncDBSession:
+    """
+    Awaitable access to a database session for async routes.
+
+    Queries run in a worker thread so they don't block the event loop, one at a time
+    since a Session must not be used concurrently. The sync session stays available
+    for the code not migrated yet.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+        self._lock = anyio.Lock()
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a function taking the session as first argument, e.g. a crud function.
+
+        Args:
+            func (Callable[..., T]): Function to run.
+            args (Any): Arguments passed after the session.
+            kwargs (Any): Keyword arguments.
+
+        Returns:
+            T: Result of the function.
+        """
+        async with self._lock:
+            return await anyio.to_thread.run_sync(
+                functools.partial(func, self.sync_session, *args, **kwargs)
+            )
+
+    async def commit(self) -> None:
+        """
+        Commit the transaction of the session, which returns its connection to the pool.
+
+        The session can still be used, it checks out a connection again when needed.
+        """
+        await self.run(Session.commit)
+
+
+def get_async_session(session: DBSessionDep) -> AsyncDBSession:
+    return AsyncDBSession(session)
+
+
+AsyncDBSessionDep = Annotated[AsyncDBSession, Depends(get_async_session)]
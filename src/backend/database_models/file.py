@@ -1,8 +1,12 @@
-from sqlalchemy import ForeignKey, ForeignKeyConstraint, Index, String
+from typing import Optional
+
+from sqlalchemy import JSON, ForeignKey, ForeignKeyConstraint, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.database_models.base import Base
 
+FILE_CONTENT_GROUP = "content"
+
 
 class File(Base):
     __tablename__ = "files"
@@ -11,6 +15,29 @@ class File(Base):
     file_name: Mapped[str]
     file_path: Mapped[str]
     file_size: Mapped[int] = mapped_column(default=0)
-    file_content: Mapped[str] = mapped_column(default="")
+    # SHA-256 of the uploaded bytes, key of the text in the file content store.
+    # Files uploaded before the content store keep their text in file_content.
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # The content and the fields as large as the content are only loaded on access,
+    # or with undefer_group(FILE_CONTENT_GROUP) in the queries
+    file_content: Mapped[str] = mapped_column(
+        default="", deferred=True, deferred_group=FILE_CONTENT_GROUP
+    )
+
+    # Derived from file_content at upload, so chats don't need to load the content
+    word_count: Mapped[Optional[int]] = mapped_column(nullable=True)
+    preview: Mapped[Optional[str]] = mapped_column(nullable=True)
+    token_count: Mapped[Optional[int]] = mapped_column(nullable=True)
+    chunk_spans: Mapped[Optional[list]] = mapped_column(
+        JSON, nullable=True, deferred=True, deferred_group=FILE_CONTENT_GROUP
+    )
+    # Inverted index of the chunks, see services/file_index.py
+    search_index: Mapped[Optional[dict]] = mapped_column(
+        JSON, nullable=True, deferred=True, deferred_group=FILE_CONTENT_GROUP
+    )
 
-    __table_args__ = ()
+    __table_args__ = (
+        Index("file_content_hash", content_hash),
+        # Covers the sum of the file sizes of a user for the storage quota
+        Index("file_user_id_file_size", user_id, file_size),
+    )
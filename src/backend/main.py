@@ -25,6 +25,7 @@ from backend.routers.snapshot import router as snapshot_router
 from backend.routers.tool import router as tool_router
 from backend.routers.user import router as user_router
 from backend.services.context import ContextMiddleware, get_context
+from backend.services.file_parser import stop_parse_processes
 from backend.services.logger.middleware import LoggingMiddleware
 from backend.services.metrics import MetricsMiddleware
 
@@ -118,6 +119,14 @@ async def startup_event():
         await get_auth_strategy_endpoints()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stops the file parsing processes.
+    """
+    stop_parse_processes()
+
+
 @app.get("/health")
 async def health():
     """
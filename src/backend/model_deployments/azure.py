@@ -5,6 +5,12 @@ import cohere
 from backend.chat.collate import to_dict
 from backend.config.settings import Settings
 from backend.model_deployments.base import BaseDeployment
+from backend.model_deployments.lexical_rerank import (
+    LEXICAL_RERANK_MODEL_ID,
+    LEXICAL_RERANK_TOP_N,
+    is_lexical_rerank_enabled,
+    lexical_rerank,
+)
 from backend.model_deployments.utils import get_model_config_var
 from backend.schemas.cohere_chat import CohereChatRequest
 from backend.schemas.context import Context
@@ -41,13 +47,17 @@ class AzureDeployment(BaseDeployment):
 
         if not self.chat_endpoint_url.endswith("/v1"):
             self.chat_endpoint_url = self.chat_endpoint_url + "/v1"
-        self.client = cohere.Client(
+        self.client = cohere.AsyncClient(
             base_url=self.chat_endpoint_url, api_key=self.api_key
         )
 
     @property
     def rerank_enabled(self) -> bool:
-        return False
+        return is_lexical_rerank_enabled()
+
+    @property
+    def rerank_model_id(self) -> str:
+        return LEXICAL_RERANK_MODEL_ID
 
     @classmethod
     def list_models(cls) -> List[str]:
@@ -64,7 +74,7 @@ class AzureDeployment(BaseDeployment):
         )
 
     async def invoke_chat(self, chat_request: CohereChatRequest) -> Any:
-        response = self.client.chat(
+        response = await self.client.chat(
             **chat_request.model_dump(exclude={"stream", "file_ids", "agent_id"}),
         )
         yield to_dict(response)
@@ -77,11 +87,11 @@ class AzureDeployment(BaseDeployment):
             **chat_request.model_dump(exclude={"stream", "file_ids", "agent_id"}),
         )
 
-        for event in stream:
+        async for event in stream:
             yield to_dict(event)
 
     @collect_metrics_rerank
     async def invoke_rerank(
         self, query: str, documents: List[Dict[str, Any]], ctx: Context
     ) -> Any:
-        return None
+        return lexical_rerank(query, documents, top_n=LEXICAL_RERANK_TOP_N)
@@ -11,16 +11,25 @@ class BaseDeployment:
     """Base for all model deployment options.
 
     rerank_enabled: bool: Whether the deployment supports reranking.
+    rerank_model_id: str | None: Rerank model and endpoint the relevance scores are
+        cached for, None to not cache them.
     invoke_chat_stream: Generator[StreamedChatResponse, None, None]: Invoke the chat stream.
     invoke_rerank: Any: Invoke the rerank.
     list_models: List[str]: List all models.
     is_available: bool: Check if the deployment is available.
+
+    The invoke methods run on the event loop, so implementations must use an async client
+    or offload blocking SDK calls with the helpers in backend.model_deployments.utils.
     """
 
     @property
     @abstractmethod
     def rerank_enabled(self) -> bool: ...
 
+    @property
+    def rerank_model_id(self) -> str | None:
+        return None
+
     @staticmethod
     def list_models() -> List[str]: ...
 
@@ -5,7 +5,17 @@ import cohere
 from backend.chat.collate import to_dict
 from backend.config.settings import Settings
 from backend.model_deployments.base import BaseDeployment
-from backend.model_deployments.utils import get_model_config_var
+from backend.model_deployments.lexical_rerank import (
+    LEXICAL_RERANK_MODEL_ID,
+    LEXICAL_RERANK_TOP_N,
+    is_lexical_rerank_enabled,
+    lexical_rerank,
+)
+from backend.model_deployments.utils import (
+    get_model_config_var,
+    iterate_sdk_stream,
+    run_sdk_call,
+)
 from backend.schemas.cohere_chat import CohereChatRequest
 from backend.schemas.context import Context
 from backend.services.metrics import collect_metrics_chat_stream, collect_metrics_rerank
@@ -55,7 +65,11 @@ class BedrockDeployment(BaseDeployment):
 
     @property
     def rerank_enabled(self) -> bool:
-        return False
+        return is_lexical_rerank_enabled()
+
+    @property
+    def rerank_model_id(self) -> str:
+        return LEXICAL_RERANK_MODEL_ID
 
     @classmethod
     def list_models(cls) -> List[str]:
@@ -79,9 +93,8 @@ class BedrockDeployment(BaseDeployment):
             exclude={"tools", "conversation_id", "model", "stream"}, exclude_none=True
         )
 
-        response = self.client.chat(
-            **bedrock_chat_req,
-        )
+        # The Bedrock client is synchronous, run it off the event loop
+        response = await run_sdk_call(self.client.chat, **bedrock_chat_req)
         yield to_dict(response)
 
     @collect_metrics_chat_stream
@@ -96,11 +109,11 @@ class BedrockDeployment(BaseDeployment):
         stream = self.client.chat_stream(
             **bedrock_chat_req,
         )
-        for event in stream:
+        async for event in iterate_sdk_stream(stream):
             yield to_dict(event)
 
     @collect_metrics_rerank
     async def invoke_rerank(
         self, query: str, documents: List[Dict[str, Any]], ctx: Context
     ) -> Any:
-        return None
+        return lexical_rerank(query, documents, top_n=LEXICAL_RERANK_TOP_N)
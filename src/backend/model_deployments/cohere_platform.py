@@ -28,12 +28,16 @@ class CohereDeployment(BaseDeployment):
         api_key = get_model_config_var(
             COHERE_API_KEY_ENV_VAR, CohereDeployment.api_key, **kwargs
         )
-        self.client = cohere.Client(api_key, client_name=self.client_name)
+        self.client = cohere.AsyncClient(api_key, client_name=self.client_name)
 
     @property
     def rerank_enabled(self) -> bool:
         return True
 
+    @property
+    def rerank_model_id(self) -> str:
+        return f"cohere_platform:{DEFAULT_RERANK_MODEL}"
+
     @classmethod
     def list_models(cls) -> List[str]:
         logger = LoggerFactory().get_logger()
@@ -68,7 +72,7 @@ class CohereDeployment(BaseDeployment):
     async def invoke_chat(
         self, chat_request: CohereChatRequest, ctx: Context, **kwargs: Any
     ) -> Any:
-        response = self.client.chat(
+        response = await self.client.chat(
             **chat_request.model_dump(exclude={"stream", "file_ids", "agent_id"}),
         )
         yield to_dict(response)
@@ -83,7 +87,7 @@ class CohereDeployment(BaseDeployment):
             **chat_request.model_dump(exclude={"stream", "file_ids", "agent_id"}),
         )
 
-        for event in stream:
+        async for event in stream:
             event_dict = to_dict(event)
 
             event_dict_log = event_dict.copy()
@@ -100,7 +104,7 @@ class CohereDeployment(BaseDeployment):
     async def invoke_rerank(
         self, query: str, documents: List[Dict[str, Any]], ctx: Context, **kwargs: Any
     ) -> Any:
-        response = self.client.rerank(
+        response = await self.client.rerank(
             query=query, documents=documents, model=DEFAULT_RERANK_MODEL
         )
         return to_dict(response)
@@ -0,0 +1,147 @@
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+
+from backend.config.settings import Settings
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOKEN_PATTERN = re.compile(r"\w+")
+# Document length the term frequencies are normalized against, in tokens, about the
+# length of the chunks of tool outputs
+REFERENCE_DOCUMENT_LENGTH = 100
+# Rerank model id of the deployments reranking lexically, they all score alike
+LEXICAL_RERANK_MODEL_ID = "lexical-bm25"
+# Maximum number of results of a lexical rerank request
+LEXICAL_RERANK_TOP_N = 20
+# Query terms too common to tell documents apart, in place of an IDF computed over a
+# collection
+STOPWORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because been
+    before being below between both but by can could did do does doing down during
+    each few for from further had has have having he her here hers herself him
+    himself his how i if in into is it its itself just me more most my myself no nor
+    not now of off on once only or other our ours ourselves out over own same she
+    should so some such than that the their theirs them themselves then there these
+    they this those through to too under until up very was we were what when where
+    which while who whom why will with would you your yours yourself yourselves
+    """.split()
+)
+
+lexical_rerank_enabled = None
+
+
+def is_lexical_rerank_enabled() -> bool:
+    global lexical_rerank_enabled
+    if lexical_rerank_enabled is None:
+        lexical_rerank_enabled = bool(Settings().deployments.use_lexical_rerank)
+    return lexical_rerank_enabled
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def get_query_terms(query: str) -> List[str]:
+    """
+    Get the distinct terms of a query, without the stopwords unless the query only has
+    stopwords.
+
+    Args:
+        query (str): Query.
+
+    Returns:
+        List[str]: Query terms, in the order of the query.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    return [term for term in terms if term not in STOPWORDS] or terms
+
+
+def bm25_scores(query: str, documents: List[str]) -> np.ndarray:
+    """
+    Score documents against a query with the BM25 term frequency saturation and
+    document length normalization.
+
+    Each score only depends on the query and the document, not on the documents scored
+    with it, so the scores of separate calls (rerank batches, cached rerank results)
+    can be compared and thresholded. Without collection statistics there is no IDF,
+    stopwords are left out of the query terms instead, and the score is the average
+    saturated frequency of the query terms, between 0 and 1.
+
+    Only the query terms contribute to the scores, so the term frequencies are counted
+    for the query terms only, in a single (documents x query terms) matrix.
+
+    Args:
+        query (str): Query.
+        documents (List[str]): Document texts.
+
+    Returns:
+        np.ndarray: Score of each document.
+    """
+    num_documents = len(documents)
+    query_terms = {term: index for index, term in enumerate(get_query_terms(query))}
+    if not num_documents or not query_terms:
+        return np.zeros(num_documents)
+
+    document_tokens = [tokenize(document) for document in documents]
+    document_lengths = np.array([len(tokens) for tokens in document_tokens])
+
+    # Query term index of every token of every document, -1 for other tokens
+    term_ids = np.fromiter(
+        (query_terms.get(token, -1) for tokens in document_tokens for token in tokens),
+        dtype=np.int64,
+        count=int(document_lengths.sum()),
+    )
+    document_ids = np.repeat(np.arange(num_documents), document_lengths)
+    matches = term_ids >= 0
+
+    num_terms = len(query_terms)
+    term_frequencies = np.bincount(
+        document_ids[matches] * num_terms + term_ids[matches],
+        minlength=num_documents * num_terms,
+    ).reshape(num_documents, num_terms)
+
+    length_norm = BM25_K1 * (
+        1 - BM25_B + BM25_B * document_lengths / REFERENCE_DOCUMENT_LENGTH
+    )
+    saturated = term_frequencies / (term_frequencies + length_norm[:, np.newaxis])
+    # BM25 term frequency saturation divided by (BM25_K1 + 1), so it stays below 1
+    return saturated.mean(axis=1)
+
+
+def lexical_rerank(
+    query: str, documents: List[Dict[str, Any] | str], top_n: int | None = None
+) -> Dict[str, Any]:
+    """
+    Rerank documents locally with BM25, in the same format as the Cohere rerank response.
+
+    Relevance scores fall between 0 and 1, like the scores of the rerank models the
+    relevance thresholds are tuned for, and don't depend on the other documents.
+
+    Args:
+        query (str): Query.
+        documents (List[Dict[str, Any] | str]): Documents, either texts or dicts with a text field.
+        top_n (int | None): Maximum number of results.
+
+    Returns:
+        Dict[str, Any]: Rerank results, sorted by relevance score.
+    """
+    texts = [
+        document if isinstance(document, str) else str(document.get("text") or "")
+        for document in documents
+    ]
+    scores = bm25_scores(query, texts)
+    ranking = np.argsort(-scores, kind="stable")
+    if top_n is not None:
+        ranking = ranking[:top_n]
+
+    return {
+        "results": [
+            {"index": int(index), "relevance_score": float(scores[index])}
+            for index in ranking
+        ],
+        "meta": {"billed_units": {"search_units": 0}},
+    }
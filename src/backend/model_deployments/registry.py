@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from backend.model_deployments.base import BaseDeployment
+from backend.schemas.context import Context
+from backend.schemas.deployment import Deployment
+
+# Maximum number of deployment instances (and their upstream clients) kept alive
+MAX_CACHED_DEPLOYMENTS = 32
+
+deployment_registry = None
+
+
+def get_deployment_registry():
+    global deployment_registry
+    if deployment_registry is None:
+        deployment_registry = DeploymentRegistry()
+    return deployment_registry
+
+
+class DeploymentRegistry:
+    """
+    Process wide LRU cache of deployment instances.
+
+    Deployments create their SDK client (cohere.AsyncClient, boto3 client...) when they are
+    instantiated. Reusing instances keeps the client's HTTP connection pool alive across chats,
+    so requests don't pay for a new pool and TLS handshake each time.
+
+    Instances are keyed by the deployment ID, the deployment class and the deployment config
+    values sent with the request, so different credentials never share a client.
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_DEPLOYMENTS):
+        self.max_size = max_size
+        self._deployments: OrderedDict[tuple, BaseDeployment] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, deployment: Deployment, ctx: Context, **kwargs: Any
+    ) -> BaseDeployment:
+        """
+        Get a cached deployment instance, creating it if needed.
+
+        Args:
+            deployment (Deployment): Deployment config.
+            ctx (Context): Context object.
+            **kwargs (Any): Keyword arguments passed to the deployment constructor.
+
+        Returns:
+            BaseDeployment: Deployment instance.
+        """
+        key = self._get_key(deployment, ctx)
+
+        with self._lock:
+            instance = self._deployments.get(key)
+            if instance is not None:
+                self._deployments.move_to_end(key)
+                return instance
+
+        instance = deployment.deployment_class(**kwargs, **deployment.kwargs)
+
+        with self._lock:
+            # Another request may have created the same deployment in the meantime
+            existing = self._deployments.get(key)
+            if existing is not None:
+                self._deployments.move_to_end(key)
+                return existing
+
+            self._deployments[key] = instance
+            while len(self._deployments) > self.max_size:
+                self._deployments.popitem(last=False)
+
+        return instance
+
+    def clear(self) -> None:
+        with self._lock:
+            self._deployments.clear()
+
+    def __len__(self) -> int:
+        return len(self._deployments)
+
+    @staticmethod
+    def _get_key(deployment: Deployment, ctx: Context) -> tuple:
+        deployment_config = (ctx.deployment_config if ctx else None) or {}
+        config_values = tuple(
+            sorted(
+                (name, value)
+                for name, value in deployment_config.items()
+                if name in deployment.env_vars
+            )
+        )
+        return (deployment.id, deployment.deployment_class, config_values)
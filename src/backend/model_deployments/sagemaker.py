@@ -6,7 +6,17 @@ import boto3
 
 from backend.config.settings import Settings
 from backend.model_deployments.base import BaseDeployment
-from backend.model_deployments.utils import get_model_config_var
+from backend.model_deployments.lexical_rerank import (
+    LEXICAL_RERANK_MODEL_ID,
+    LEXICAL_RERANK_TOP_N,
+    is_lexical_rerank_enabled,
+    lexical_rerank,
+)
+from backend.model_deployments.utils import (
+    get_model_config_var,
+    iterate_sdk_stream,
+    run_sdk_call,
+)
 from backend.schemas.cohere_chat import CohereChatRequest
 from backend.schemas.context import Context
 from backend.services.metrics import collect_metrics_chat_stream, collect_metrics_rerank
@@ -75,7 +85,11 @@ class SageMakerDeployment(BaseDeployment):
 
     @property
     def rerank_enabled(self) -> bool:
-        return False
+        return is_lexical_rerank_enabled()
+
+    @property
+    def rerank_model_id(self) -> str:
+        return LEXICAL_RERANK_MODEL_ID
 
     @classmethod
     def list_models(cls) -> List[str]:
@@ -105,21 +119,29 @@ class SageMakerDeployment(BaseDeployment):
             "chat_history": [x.to_dict() for x in chat_request.chat_history],
             "documents": chat_request.documents,
         }
-        self.params["Body"] = json.dumps(json_params)
+        # Deployment instances are shared between requests, don't mutate self.params
+        params = self.params | {"Body": json.dumps(json_params)}
 
         # Invoke the model and print the response
-        result = self.client.invoke_endpoint_with_response_stream(**self.params)
+        result = await run_sdk_call(
+            self.client.invoke_endpoint_with_response_stream, **params
+        )
         event_stream = result["Body"]
-        for index, line in enumerate(SageMakerDeployment.LineIterator(event_stream)):
+        # boto3 event streams block on socket reads, consume them in a worker thread
+        index = 0
+        async for line in iterate_sdk_stream(
+            SageMakerDeployment.LineIterator(event_stream)
+        ):
             stream_event = json.loads(line.decode())
             stream_event["index"] = index
+            index += 1
             yield stream_event
 
     @collect_metrics_rerank
     async def invoke_rerank(
         self, query: str, documents: List[Dict[str, Any]], ctx: Context
     ) -> Any:
-        return None
+        return lexical_rerank(query, documents, top_n=LEXICAL_RERANK_TOP_N)
 
     # This class iterates through each line of Sagemaker's response
     # https://aws.amazon.com/blogs/machine-learning/elevating-the-generative-ai-experience-introducing-streaming-support-in-amazon-sagemaker-hosting/
@@ -32,7 +32,7 @@ class SingleContainerDeployment(BaseDeployment):
         self.model = get_model_config_var(
             SC_MODEL_ENV_VAR, SingleContainerDeployment.default_model, **kwargs
         )
-        self.client = cohere.Client(
+        self.client = cohere.AsyncClient(
             base_url=self.url, client_name=self.client_name, api_key="none"
         )
 
@@ -40,6 +40,11 @@ class SingleContainerDeployment(BaseDeployment):
     def rerank_enabled(self) -> bool:
         return SingleContainerDeployment.default_model.startswith("rerank")
 
+    @property
+    def rerank_model_id(self) -> str:
+        # Each container serves its own model
+        return f"single_container:{self.url}:{self.model}"
+
     @classmethod
     def list_models(cls) -> List[str]:
         if not SingleContainerDeployment.is_available():
@@ -55,7 +60,7 @@ class SingleContainerDeployment(BaseDeployment):
         )
 
     async def invoke_chat(self, chat_request: CohereChatRequest) -> Any:
-        response = self.client.chat(
+        response = await self.client.chat(
             **chat_request.model_dump(
                 exclude={"stream", "file_ids", "model", "agent_id"}
             ),
@@ -72,13 +77,13 @@ class SingleContainerDeployment(BaseDeployment):
             ),
         )
 
-        for event in stream:
+        async for event in stream:
             yield to_dict(event)
 
     @collect_metrics_rerank
     async def invoke_rerank(
         self, query: str, documents: List[Dict[str, Any]], ctx: Context
     ) -> Any:
-        return self.client.rerank(
+        return await self.client.rerank(
             query=query, documents=documents, model=DEFAULT_RERANK_MODEL
         )
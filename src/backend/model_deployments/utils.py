@@ -1,4 +1,14 @@
-from typing import Any
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterator, TypeVar
+
+import anyio
+
+T = TypeVar("T")
+
+# Maximum number of worker threads that blocking SDK calls may occupy at once
+MAX_SDK_THREADS = 40
+
+_sdk_thread_limiter = None
 
 
 def get_model_config_var(var_name: str, default: str, **kwargs: Any) -> str:
@@ -22,3 +32,52 @@ def get_model_config_var(var_name: str, default: str, **kwargs: Any) -> str:
     if not config:
         raise ValueError(f"Missing model config variable: {var_name}")
     return config
+
+
+def get_sdk_thread_limiter() -> anyio.CapacityLimiter:
+    """Get the process wide limiter for blocking SDK calls.
+
+    The limiter is created lazily because it has to be bound to a running event loop.
+
+    Returns:
+        anyio.CapacityLimiter: Limiter shared by all deployments.
+    """
+    global _sdk_thread_limiter
+    if _sdk_thread_limiter is None:
+        _sdk_thread_limiter = anyio.CapacityLimiter(MAX_SDK_THREADS)
+    return _sdk_thread_limiter
+
+
+async def run_sdk_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking SDK call in a worker thread so the event loop stays free.
+
+    Args:
+        func (Callable): Blocking function to call.
+        *args (Any): Positional arguments for the function.
+        **kwargs (Any): Keyword arguments for the function.
+
+    Returns:
+        T: The function's return value.
+    """
+    return await anyio.to_thread.run_sync(
+        partial(func, *args, **kwargs), limiter=get_sdk_thread_limiter()
+    )
+
+
+async def iterate_sdk_stream(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Consume a blocking SDK stream one item at a time in a worker thread.
+
+    Args:
+        iterator (Iterator): Blocking iterator, e.g. a boto3 event stream.
+
+    Yields:
+        T: Items from the iterator.
+    """
+    iterator = iter(iterator)
+    sentinel = object()
+
+    while True:
+        item = await run_sdk_call(next, iterator, sentinel)
+        if item is sentinel:
+            break
+        yield item
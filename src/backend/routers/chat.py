@@ -9,7 +9,7 @@ from backend.config.routers import RouterName
 from backend.config.settings import Settings
 from backend.crud import agent as agent_crud
 from backend.crud import agent_tool_metadata as agent_tool_metadata_crud
-from backend.database_models.database import DBSessionDep
+from backend.database_models.database import AsyncDBSessionDep, SessionFactoryDep
 from backend.schemas.agent import Agent, AgentToolMetadata
 from backend.schemas.chat import ChatResponseEvent, NonStreamedChatResponse
 from backend.schemas.cohere_chat import CohereChatRequest
@@ -33,7 +33,8 @@ router.name = RouterName.CHAT
 
 @router.post("/chat-stream", dependencies=[Depends(validate_deployment_header)])
 async def chat_stream(
-    session: DBSessionDep,
+    session: AsyncDBSessionDep,
+    session_factory: SessionFactoryDep,
     chat_request: CohereChatRequest,
     request: Request,
     ctx: Context = Depends(get_context),
@@ -42,7 +43,8 @@ async def chat_stream(
     Stream chat endpoint to handle user messages and return chatbot responses.
 
     Args:
-        session (DBSessionDep): Database session.
+        session (AsyncDBSessionDep): Database session.
+        session_factory (SessionFactoryDep): Factory of the sessions used while streaming.
         chat_request (CohereChatRequest): Chat request data.
         request (Request): Request object.
         ctx (Context): Context object.
@@ -55,13 +57,11 @@ async def chat_stream(
     ctx.with_agent_id(agent_id)
 
     if agent_id:
-        agent = agent_crud.get_agent_by_id(session, agent_id)
+        agent = await session.run(agent_crud.get_agent_by_id, agent_id)
         agent_schema = Agent.model_validate(agent)
         ctx.with_agent(agent_schema)
-        agent_tool_metadata = (
-            agent_tool_metadata_crud.get_all_agent_tool_metadata_by_agent_id(
-                session, agent_id
-            )
+        agent_tool_metadata = await session.run(
+            agent_tool_metadata_crud.get_all_agent_tool_metadata_by_agent_id, agent_id
         )
         agent_tool_metadata_schema = [
             AgentToolMetadata.model_validate(x) for x in agent_tool_metadata
@@ -81,17 +81,17 @@ async def chat_stream(
         managed_tools,
         next_message_position,
         ctx,
-    ) = process_chat(session, chat_request, request, ctx)
+    ) = await process_chat(session, chat_request, request, ctx)
 
     return EventSourceResponse(
         generate_chat_stream(
-            session,
+            session_factory,
             CustomChat().chat(
                 chat_request,
                 stream=True,
                 file_paths=file_paths,
                 managed_tools=managed_tools,
-                session=session,
+                session_factory=session_factory,
                 ctx=ctx,
             ),
             response_message,
@@ -108,7 +108,8 @@ async def chat_stream(
 
 @router.post("/chat", dependencies=[Depends(validate_deployment_header)])
 async def chat(
-    session: DBSessionDep,
+    session: AsyncDBSessionDep,
+    session_factory: SessionFactoryDep,
     chat_request: CohereChatRequest,
     request: Request,
     ctx: Context = Depends(get_context),
@@ -118,7 +119,8 @@ async def chat(
 
     Args:
         chat_request (CohereChatRequest): Chat request data.
-        session (DBSessionDep): Database session.
+        session (AsyncDBSessionDep): Database session.
+        session_factory (SessionFactoryDep): Factory of the sessions used during the chat.
         request (Request): Request object.
         ctx (Context): Context object.
 
@@ -130,13 +132,11 @@ async def chat(
     ctx.with_agent_id(agent_id)
 
     if agent_id:
-        agent = agent_crud.get_agent_by_id(session, agent_id)
+        agent = await session.run(agent_crud.get_agent_by_id, agent_id)
         agent_schema = Agent.model_validate(agent)
         ctx.with_agent(agent_schema)
-        agent_tool_metadata = (
-            agent_tool_metadata_crud.get_all_agent_tool_metadata_by_agent_id(
-                session, agent_id
-            )
+        agent_tool_metadata = await session.run(
+            agent_tool_metadata_crud.get_all_agent_tool_metadata_by_agent_id, agent_id
         )
         agent_tool_metadata_schema = [
             AgentToolMetadata.model_validate(x) for x in agent_tool_metadata
@@ -155,15 +155,16 @@ async def chat(
         managed_tools,
         next_message_position,
         ctx,
-    ) = process_chat(session, chat_request, request, ctx)
+    ) = await process_chat(session, chat_request, request, ctx)
 
     response = await generate_chat_response(
-        session,
+        session_factory,
         CustomChat().chat(
             chat_request,
             stream=False,
             file_paths=file_paths,
             managed_tools=managed_tools,
+            session_factory=session_factory,
             ctx=ctx,
         ),
         response_message,
@@ -175,8 +176,8 @@ async def chat(
 
 
 @router.post("/langchain-chat")
-def langchain_chat_stream(
-    session: DBSessionDep,
+async def langchain_chat_stream(
+    session: AsyncDBSessionDep,
     chat_request: LangchainChatRequest,
     request: Request,
     ctx: Context = Depends(get_context),
@@ -185,7 +186,7 @@ def langchain_chat_stream(
     Stream chat endpoint to handle user messages and return chatbot responses using langchain.
 
     Args:
-        session (DBSessionDep): Database session.
+        session (AsyncDBSessionDep): Database session.
         chat_request (LangchainChatRequest): Chat request data.
         request (Request): Request object.
         ctx (Context): Context object.
@@ -212,7 +213,7 @@ def langchain_chat_stream(
         managed_tools,
         _,
         _,  # ctx
-    ) = process_chat(session, chat_request, request, ctx)
+    ) = await process_chat(session, chat_request, request, ctx)
 
     return EventSourceResponse(
         generate_langchain_chat_stream(
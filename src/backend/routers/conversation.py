@@ -384,6 +384,8 @@ async def upload_file(
         upload_file = await get_file_service().create_conversation_files(
             session, [file], user_id, conversation.id
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error while uploading file {file.filename}: {e}."
@@ -455,6 +457,8 @@ async def batch_upload_file(
         uploaded_files = await get_file_service().create_conversation_files(
             session, files, user_id, conversation.id
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error while uploading file(s): {e}."
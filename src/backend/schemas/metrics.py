@@ -28,6 +28,10 @@ class MetricsMessageType(str, Enum):
     RERANK_API_SUCCESS = "rerank_api_call_success"
     # implemented, needs tests
     RERANK_API_FAIL = "rerank_api_call_failure"
+    # implemented, has tests
+    RERANK_CACHE_LOOKUP = "rerank_cache_lookup"
+    # implemented, has tests
+    CHAT_HISTORY_TRUNCATED = "chat_history_truncated"
     # pending implementation
     ENV_LIVENESS = "env_liveness"
     COMPASS_NEW_INDEX = "compass_new_index"
@@ -21,13 +21,15 @@ def get_client() -> Redis:
     return client
 
 
-def cache_put(key: str, value: Any) -> None:
+def cache_put(key: str, value: Any, expire: int | None = None) -> None:
     client = get_client()
 
     if isinstance(value, dict):
         client.hmset(key, value)
+        if expire is not None:
+            client.expire(key, expire)
     else:
-        client.set(key, value)
+        client.set(key, value, ex=expire)
 
 
 def cache_get(key: str) -> Any:
@@ -46,3 +48,18 @@ def cache_del(key: str) -> None:
     client = get_client()
 
     client.delete(key)
+
+
+def cache_get_many(keys: list[str]) -> list[Any]:
+    client = get_client()
+
+    return client.mget(keys)
+
+
+def cache_put_many(values: dict[str, Any], expire: int | None = None) -> None:
+    client = get_client()
+
+    pipeline = client.pipeline()
+    for key, value in values.items():
+        pipeline.set(key, value, ex=expire)
+    pipeline.execute()
@@ -1,38 +1,38 @@
-import json
 from typing import Any, AsyncGenerator, Generator, List, Union
 from uuid import uuid4
 
 from cohere.types import StreamedChatResponse
 from fastapi import Depends, HTTPException, Request
-from fastapi.encoders import jsonable_encoder
 from langchain_core.agents import AgentActionMessageLog
 from langchain_core.runnables.utils import AddableDict
 from pydantic import ValidationError
 
+from backend.chat.accumulator import StreamAccumulator
 from backend.chat.collate import to_dict
 from backend.chat.enums import StreamEvent
+from backend.chat.event_encoder import encode_chat_event
 from backend.config.tools import AVAILABLE_TOOLS
 from backend.crud import agent as agent_crud
 from backend.crud import conversation as conversation_crud
 from backend.crud import file as file_crud
 from backend.crud import message as message_crud
-from backend.crud import tool_call as tool_call_crud
 from backend.database_models.citation import Citation
 from backend.database_models.conversation import Conversation
-from backend.database_models.database import DBSessionDep
+from backend.database_models.database import (
+    AsyncDBSession,
+    DBSessionDep,
+    SessionFactory,
+)
 from backend.database_models.document import Document
 from backend.database_models.message import (
     Message,
     MessageAgent,
     MessageFileAssociation,
 )
-from backend.database_models.tool_call import ToolCall as ToolCallModel
 from backend.schemas.agent import Agent
 from backend.schemas.chat import (
     BaseChatRequest,
     ChatMessage,
-    ChatResponseEvent,
-    ChatRole,
     NonStreamedChatResponse,
     StreamCitationGeneration,
     StreamEnd,
@@ -52,12 +52,14 @@ from backend.schemas.context import Context
 from backend.schemas.conversation import UpdateConversationRequest
 from backend.schemas.search_query import SearchQuery
 from backend.schemas.tool import Tool, ToolCall, ToolCallDelta
+from backend.services import chat_history as chat_history_service
 from backend.services.file import get_file_service
 from backend.services.generators import AsyncGeneratorContextManager
+from backend.services.turn_writer import ChatTurnWriter
 
 
-def process_chat(
-    session: DBSessionDep,
+async def process_chat(
+    session: AsyncDBSession,
     chat_request: BaseChatRequest,
     request: Request,
     ctx: Context,
@@ -67,9 +69,13 @@ def process_chat(
     """
     Process a chat request.
 
+    The database queries run outside of the event loop. The session's connection is
+    returned to the pool once the request is processed, the synchronous session is
+    returned for the rest of the request.
+
     Args:
         chat_request (BaseChatRequest): Chat request data.
-        session (DBSessionDep): Database session.
+        session (AsyncDBSession): Database session.
         request (Request): Request object.
         ctx (Context): Context object.
 
@@ -81,7 +87,7 @@ def process_chat(
     agent_id = ctx.get_agent_id()
 
     if agent_id is not None:
-        agent = agent_crud.get_agent_by_id(session, agent_id)
+        agent = await session.run(agent_crud.get_agent_by_id, agent_id)
         agent_schema = Agent.model_validate(agent)
         ctx.with_agent(agent_schema)
 
@@ -108,16 +114,21 @@ def process_chat(
     should_store = chat_request.chat_history is None and not is_custom_tool_call(
         chat_request
     )
-    conversation = get_or_create_conversation(
-        session, chat_request, user_id, should_store, agent_id, chat_request.message
+    conversation = await session.run(
+        get_or_create_conversation,
+        chat_request,
+        user_id,
+        should_store,
+        agent_id,
+        chat_request.message,
     )
 
     ctx.with_conversation_id(conversation.id)
 
     # Get position to put next message in
-    next_message_position = get_next_message_position(conversation)
-    user_message = create_message(
-        session,
+    next_message_position = await session.run(get_next_message_position, conversation)
+    user_message = await session.run(
+        create_message,
         chat_request,
         conversation.id,
         user_id,
@@ -127,32 +138,27 @@ def process_chat(
         should_store,
         id=str(uuid4()),
     )
-    chatbot_message = create_message(
-        session,
-        chat_request,
-        conversation.id,
-        user_id,
-        next_message_position,
-        "",
-        MessageAgent.CHATBOT,
-        False,
-        id=str(uuid4()),
-    )
 
     file_paths = None
     if isinstance(chat_request, CohereChatRequest):
-        file_paths = handle_file_retrieval(session, user_id, chat_request.file_ids)
+        file_paths = await session.run(
+            handle_file_retrieval, user_id, chat_request.file_ids
+        )
         if should_store:
-            attach_files_to_messages(
-                session,
+            await session.run(
+                attach_files_to_messages,
                 user_id,
                 user_message.id,
                 chat_request.file_ids,
             )
 
-    chat_history = create_chat_history(
-        conversation, next_message_position, chat_request
+    history_from_request = chat_request.chat_history is not None
+    chat_history = await session.run(
+        create_chat_history, conversation, next_message_position, chat_request
     )
+    # Histories sent with the request are left untouched, they may hold tool results
+    if not history_from_request:
+        chat_history = chat_history_service.compact_chat_history(chat_history, ctx)
 
     # co.chat expects either chat_history or conversation_id, not both
     chat_request.chat_history = chat_history
@@ -163,8 +169,26 @@ def process_chat(
         len([tool.name for tool in tools if tool.name in AVAILABLE_TOOLS]) > 0
     )
 
+    # End the transaction so no pooled connection is held while the response is generated
+    await session.commit()
+
+    # The response message is only built now, outside of the request session: the
+    # commit expires the session's objects, and the session is closed before the
+    # response is streamed while the message is still read
+    chatbot_message = create_message(
+        None,
+        chat_request,
+        ctx.get_conversation_id(),
+        user_id,
+        next_message_position,
+        "",
+        MessageAgent.CHATBOT,
+        False,
+        id=str(uuid4()),
+    )
+
     return (
-        session,
+        session.sync_session,
         chat_request,
         file_paths,
         chatbot_message,
@@ -236,28 +260,21 @@ def get_or_create_conversation(
     return conversation
 
 
-def get_next_message_position(conversation: Conversation) -> int:
+def get_next_message_position(session: DBSessionDep, conversation: Conversation) -> int:
     """
     Gets message position to create next messages.
 
     Args:
+        session (DBSessionDep): Database session.
         conversation (Conversation): current Conversation.
 
     Returns:
         int: Position to save new messages with
     """
-
-    # Message starts the conversation
-    if len(conversation.messages) == 0:
-        return 0
-
-    # Get current max position from existing Messages
-    current_active_position = max(
-        [message.position for message in conversation.messages if message.is_active]
+    return chat_history_service.get_next_message_position(
+        session, conversation.id, conversation.user_id
     )
 
-    return current_active_position + 1
-
 
 def create_message(
     session: DBSessionDep,
@@ -367,6 +384,7 @@ def attach_files_to_messages(
 
 
 def create_chat_history(
+    session: DBSessionDep,
     conversation: Conversation,
     user_message_position: int,
     chat_request: BaseChatRequest,
@@ -375,6 +393,7 @@ def create_chat_history(
     Create chat history from conversation messages or request.
 
     Args:
+        session (DBSessionDep): Database session.
         conversation (Conversation): Conversation object.
         user_message_position (int): User message position.
         chat_request (BaseChatRequest): Chat request data.
@@ -385,22 +404,10 @@ def create_chat_history(
     if chat_request.chat_history is not None:
         return chat_request.chat_history
 
-    if conversation.messages is None:
-        return []
-
     # Don't include the user message that was just sent
-    text_messages = [
-        message
-        for message in conversation.messages
-        if message.position < user_message_position
-    ]
-    return [
-        ChatMessage(
-            role=ChatRole(message.agent.value.upper()),
-            message=message.text,
-        )
-        for message in text_messages
-    ]
+    return chat_history_service.get_chat_history(
+        session, conversation.id, conversation.user_id, user_message_position
+    )
 
 
 def update_conversation_after_turn(
@@ -430,48 +437,8 @@ def update_conversation_after_turn(
     conversation_crud.update_conversation(session, conversation, new_conversation)
 
 
-def save_tool_calls_message(
-    session: DBSessionDep,
-    tool_calls: List[ToolCall],
-    text: str,
-    user_id: str,
-    position: int,
-    conversation_id: str,
-) -> None:
-    """
-    Save tool calls to the database.
-
-    Args:
-        session (DBSessionDep): Database session.
-        tool_calls (List[ToolCall]): List of ToolCall objects.
-        message (str): Message text.
-        position (int): Message position.
-    """
-    # Save message to the database
-    message = create_message(
-        session,
-        chat_request=None,
-        conversation_id=conversation_id,
-        user_id=user_id,
-        user_message_position=position,
-        text=text,
-        tool_plan=text,
-        agent=MessageAgent.CHATBOT,
-        should_store=True,
-    )
-
-    # Save tool calls to the database
-    for tool_call in tool_calls:
-        tool_call = ToolCallModel(
-            name=tool_call.name,
-            parameters=to_dict(tool_call.parameters),
-            message_id=message.id,
-        )
-        tool_call_crud.create_tool_call(session, tool_call)
-
-
 async def generate_chat_response(
-    session: DBSessionDep,
+    session_factory: SessionFactory,
     model_deployment_stream: Generator[StreamedChatResponse, None, None],
     response_message: Message,
     should_store: bool = True,
@@ -483,19 +450,22 @@ async def generate_chat_response(
     Use the stream to generate the response and all the intermediate steps, then
     return only the final step as a non-streamed response.
 
+    The events are handled in memory and never encoded, the response is only built
+    from the stream end event.
+
     Args:
-        session (DBSessionDep): Database session.
+        session_factory (SessionFactory): Factory of short-lived database sessions.
         model_deployment_stream (Generator[StreamResponse, None, None]): Model deployment stream.
         response_message (Message): Response message object.
         should_store (bool): Whether to store the conversation in the database.
         ctx (Context): Context object.
         **kwargs (Any): Additional keyword arguments.
 
-    Yields:
-        bytes: Byte representation of chat response event.
+    Returns:
+        NonStreamedChatResponse: Chat response.
     """
-    stream = generate_chat_stream(
-        session,
+    stream = generate_chat_events(
+        session_factory,
         model_deployment_stream,
         response_message,
         should_store,
@@ -503,34 +473,33 @@ async def generate_chat_response(
         **kwargs,
     )
 
-    non_streamed_chat_response = None
-    async for event in stream:
-        event = json.loads(event)
-        if event["event"] == StreamEvent.STREAM_END:
-            data = event["data"]
-            response_id = ctx.get_trace_id()
-            generation_id = response_message.generation_id if response_message else None
-
-            non_streamed_chat_response = NonStreamedChatResponse(
-                text=data.get("text", ""),
-                response_id=response_id,
-                generation_id=generation_id,
-                chat_history=data.get("chat_history", []),
-                finish_reason=data.get("finish_reason", ""),
-                citations=data.get("citations", []),
-                search_queries=data.get("search_queries", []),
-                documents=data.get("documents", []),
-                search_results=data.get("search_results", []),
-                event_type=StreamEvent.NON_STREAMED_CHAT_RESPONSE,
-                conversation_id=ctx.get_conversation_id(),
-                tool_calls=data.get("tool_calls", []),
-            )
-
-    return non_streamed_chat_response
+    stream_end = None
+    async for stream_event in stream:
+        if isinstance(stream_event, StreamEnd):
+            stream_end = stream_event
+
+    if stream_end is None:
+        return None
+
+    generation_id = response_message.generation_id if response_message else None
+    return NonStreamedChatResponse(
+        text=stream_end.text,
+        response_id=ctx.get_trace_id(),
+        generation_id=generation_id,
+        chat_history=stream_end.chat_history,
+        finish_reason=stream_end.finish_reason or "",
+        citations=stream_end.citations,
+        search_queries=stream_end.search_queries,
+        documents=stream_end.documents,
+        search_results=stream_end.search_results,
+        event_type=StreamEvent.NON_STREAMED_CHAT_RESPONSE,
+        conversation_id=ctx.get_conversation_id(),
+        tool_calls=stream_end.tool_calls,
+    )
 
 
 async def generate_chat_stream(
-    session: DBSessionDep,
+    session_factory: SessionFactory,
     model_deployment_stream: AsyncGenerator[Any, Any],
     response_message: Message,
     should_store: bool = True,
@@ -541,11 +510,9 @@ async def generate_chat_stream(
     Generate chat stream from model deployment stream.
 
     Args:
-        session (DBSessionDep): Database session.
+        session_factory (SessionFactory): Factory of short-lived database sessions.
         model_deployment_stream (AsyncGenerator[Any, Any]): Model deployment stream.
         response_message (Message): Response message object.
-        conversation_id (str): Conversation ID.
-        user_id (str): User ID.
         should_store (bool): Whether to store the conversation in the database.
         ctx (Context): Context object.
         **kwargs (Any): Additional keyword arguments.
@@ -553,71 +520,82 @@ async def generate_chat_stream(
     Yields:
         bytes: Byte representation of chat response event.
     """
+    async for stream_event in generate_chat_events(
+        session_factory,
+        model_deployment_stream,
+        response_message,
+        should_store,
+        ctx,
+        **kwargs,
+    ):
+        yield encode_chat_event(stream_event)
+
+
+async def generate_chat_events(
+    session_factory: SessionFactory,
+    model_deployment_stream: AsyncGenerator[Any, Any],
+    response_message: Message,
+    should_store: bool = True,
+    ctx: Context = Context(),
+    **kwargs: Any,
+) -> AsyncGenerator[StreamEventType, Any]:
+    """
+    Handle the events of a model deployment stream and store the turn once it ends.
+
+    Args:
+        session_factory (SessionFactory): Factory of short-lived database sessions.
+        model_deployment_stream (AsyncGenerator[Any, Any]): Model deployment stream.
+        response_message (Message): Response message object.
+        should_store (bool): Whether to store the conversation in the database.
+        ctx (Context): Context object.
+        **kwargs (Any): Additional keyword arguments.
+
+    Yields:
+        StreamEventType: Stream event.
+    """
     conversation_id = ctx.get_conversation_id()
     user_id = ctx.get_user_id()
 
-    stream_end_data = {
-        "conversation_id": conversation_id,
-        "response_id": ctx.get_trace_id(),
-        "text": "",
-        "citations": [],
-        "documents": [],
-        "search_results": [],
-        "search_queries": [],
-        "tool_calls": [],
-        "tool_results": [],
-    }
-
-    # Map the user facing document_ids field returned from model to storage ID for document model
-    document_ids_to_document = {}
+    stream_accumulator = StreamAccumulator(conversation_id, ctx.get_trace_id())
+    turn_writer = (
+        ChatTurnWriter(session_factory, conversation_id, user_id)
+        if should_store
+        else None
+    )
 
     stream_event = None
     async for event in model_deployment_stream:
         (
             stream_event,
-            stream_end_data,
+            stream_accumulator,
             response_message,
-            document_ids_to_document,
         ) = handle_stream_event(
             event,
             conversation_id,
-            stream_end_data,
+            stream_accumulator,
             response_message,
             ctx,
-            document_ids_to_document,
-            session=session,
-            should_store=should_store,
-            user_id=user_id,
+            turn_writer=turn_writer,
             next_message_position=kwargs.get("next_message_position", 0),
         )
 
-        yield json.dumps(
-            jsonable_encoder(
-                ChatResponseEvent(
-                    event=stream_event.event_type.value,
-                    data=stream_event,
-                )
-            )
-        )
+        yield stream_event
 
-    if should_store:
-        update_conversation_after_turn(
-            session, response_message, conversation_id, stream_end_data["text"], user_id
-        )
+    if turn_writer is not None:
+        # The whole turn is written at once, off the event loop
+        turn_writer.add_message(response_message)
+        await turn_writer.flush_in_background(stream_accumulator.text)
 
 
 def handle_stream_event(
     event: dict[str, Any],
     conversation_id: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
     ctx: Context,
-    document_ids_to_document: dict[str, Document] = {},
-    session: DBSessionDep = None,
-    should_store: bool = True,
-    user_id: str = "",
+    turn_writer: ChatTurnWriter | None = None,
     next_message_position: int = 0,
-) -> tuple[StreamEventType, dict[str, Any], Message, dict[str, Document]]:
+) -> tuple[StreamEventType, StreamAccumulator, Message]:
     logger = ctx.get_logger()
 
     handlers = {
@@ -636,17 +614,14 @@ def handle_stream_event(
         logger.warning(
             event=f"[Chat] Error handling stream event: Event type {event_type} not supported"
         )
-        return None, stream_end_data, response_message, document_ids_to_document
+        return None, stream_accumulator, response_message
 
     return handlers[event_type](
         event,
         conversation_id,
-        stream_end_data,
+        stream_accumulator,
         response_message,
-        document_ids_to_document,
-        session=session,
-        should_store=should_store,
-        user_id=user_id,
+        turn_writer=turn_writer,
         next_message_position=next_message_position,
     )
 
@@ -654,40 +629,37 @@ def handle_stream_event(
 def handle_stream_start(
     event: dict[str, Any],
     conversation_id: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
     **kwargs: Any,
-) -> tuple[StreamStart, dict[str, Any], Message, dict[str, Document]]:
+) -> tuple[StreamStart, StreamAccumulator, Message]:
     event["conversation_id"] = conversation_id
     stream_event = StreamStart.model_validate(event)
     if response_message:
         response_message.generation_id = event["generation_id"]
-    stream_end_data["generation_id"] = event["generation_id"]
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    stream_accumulator.generation_id = event["generation_id"]
+    return stream_event, stream_accumulator, response_message
 
 
 def handle_stream_text_generation(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
     **kwargs: Any,
-) -> tuple[StreamTextGeneration, dict[str, Any], Message, dict[str, Document]]:
-    stream_end_data["text"] += event["text"]
+) -> tuple[StreamTextGeneration, StreamAccumulator, Message]:
+    stream_accumulator.add_text(event["text"])
     stream_event = StreamTextGeneration.model_validate(event)
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    return stream_event, stream_accumulator, response_message
 
 
 def handle_stream_search_results(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
     **kwargs: Any,
-) -> tuple[StreamSearchResults, dict[str, Any], Message, dict[str, Document]]:
+) -> tuple[StreamSearchResults, StreamAccumulator, Message]:
     for document in event["documents"]:
         storage_document = Document(
             document_id=document.get("id", ""),
@@ -705,34 +677,29 @@ def handle_stream_search_results(
             conversation_id=response_message.conversation_id,
             message_id=response_message.id,
         )
-        document_ids_to_document[document["id"]] = storage_document
-
-    documents = list(document_ids_to_document.values())
-    response_message.documents = documents
+        stream_accumulator.add_document(document["id"], storage_document)
 
-    stream_end_data["documents"].extend(documents)
     if "search_results" not in event or event["search_results"] is None:
         event["search_results"] = []
 
     stream_event = StreamSearchResults(
         **event
         | {
-            "documents": documents,
+            "documents": stream_accumulator.documents,
             "search_results": event["search_results"],
         },
     )
-    stream_end_data["search_results"].extend(event["search_results"])
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    stream_accumulator.search_results.extend(event["search_results"])
+    return stream_event, stream_accumulator, response_message
 
 
 def handle_stream_search_queries_generation(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
     **kwargs: Any,
-) -> tuple[StreamSearchQueriesGeneration, dict[str, Any], Message, dict[str, Document]]:
+) -> tuple[StreamSearchQueriesGeneration, StreamAccumulator, Message]:
     search_queries = []
     for search_query in event["search_queries"]:
         search_queries.append(
@@ -744,21 +711,19 @@ def handle_stream_search_queries_generation(
     stream_event = StreamSearchQueriesGeneration(
         **event | {"search_queries": search_queries}
     )
-    stream_end_data["search_queries"] = search_queries
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    stream_accumulator.search_queries = search_queries
+    return stream_event, stream_accumulator, response_message
 
 
 def handle_stream_tool_calls_generation(
     event: dict[str, Any],
-    conversation_id: str,
-    stream_end_data: dict[str, Any],
+    _: str,
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
-    session: DBSessionDep,
-    should_store: bool,
-    user_id: str,
-    next_message_position: int,
-) -> tuple[StreamToolCallsGeneration, dict[str, Any], Message, dict[str, Document]]:
+    turn_writer: ChatTurnWriter | None = None,
+    next_message_position: int = 0,
+    **kwargs: Any,
+) -> tuple[StreamToolCallsGeneration, StreamAccumulator, Message]:
     tool_calls = []
     tool_calls_event = event.get("tool_calls", [])
     for tool_call in tool_calls_event:
@@ -769,29 +734,23 @@ def handle_stream_tool_calls_generation(
             )
         )
     stream_event = StreamToolCallsGeneration(**event | {"tool_calls": tool_calls})
-    stream_end_data["tool_calls"].extend(tool_calls)
+    stream_accumulator.tool_calls.extend(tool_calls)
 
-    if should_store:
-        save_tool_calls_message(
-            session,
-            tool_calls,
-            event.get("text", ""),
-            user_id,
-            next_message_position,
-            conversation_id,
+    if turn_writer is not None:
+        turn_writer.add_tool_calls_message(
+            tool_calls, event.get("text", ""), next_message_position
         )
 
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    return stream_event, stream_accumulator, response_message
 
 
 def handle_stream_citation_generation(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
     **kwargs: Any,
-) -> tuple[StreamCitationGeneration, dict[str, Any], Message, dict[str, Document]]:
+) -> tuple[StreamCitationGeneration, StreamAccumulator, Message]:
     citations = []
     for event_citation in event["citations"]:
         citation = Citation(
@@ -803,25 +762,24 @@ def handle_stream_citation_generation(
 
         document_ids = event_citation.get("document_ids")
         for document_id in document_ids:
-            document = document_ids_to_document.get(document_id, None)
+            document = stream_accumulator.get_document(document_id)
             if document is not None:
                 citation.documents.append(document)
 
         # Populates CitationDocuments table
         citations.append(citation)
     stream_event = StreamCitationGeneration(**event | {"citations": citations})
-    stream_end_data["citations"].extend(citations)
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    stream_accumulator.citations.extend(citations)
+    return stream_event, stream_accumulator, response_message
 
 
 def handle_stream_tool_calls_chunk(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
     **kwargs: Any,
-) -> tuple[StreamToolCallsChunk, dict[str, Any], Message, dict[str, Document]]:
+) -> tuple[StreamToolCallsChunk, StreamAccumulator, Message]:
     event["text"] = event.get("text", "")
     tool_call_delta = event.get("tool_call_delta", None)
     if tool_call_delta:
@@ -833,27 +791,27 @@ def handle_stream_tool_calls_chunk(
         event["tool_call_delta"] = tool_call
 
     stream_event = StreamToolCallsChunk.model_validate(event)
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    return stream_event, stream_accumulator, response_message
 
 
 def handle_stream_end(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    stream_accumulator: StreamAccumulator,
     response_message: Message,
-    document_ids_to_document: dict[str, Document],
     **kwargs: Any,
-) -> tuple[StreamEnd, dict[str, Any], Message, dict[str, Document]]:
+) -> tuple[StreamEnd, StreamAccumulator, Message]:
     if response_message:
-        response_message.citations = stream_end_data["citations"]
-        response_message.text = stream_end_data["text"]
+        response_message.citations = stream_accumulator.citations
+        response_message.documents = stream_accumulator.documents
+        response_message.text = stream_accumulator.text
 
-    stream_end_data["chat_history"] = (
+    stream_accumulator.chat_history = (
         to_dict(event).get("response", {}).get("chat_history", [])
     )
-    stream_end = StreamEnd.model_validate(event | stream_end_data)
+    stream_end = StreamEnd.model_validate(event | stream_accumulator.to_dict())
     stream_event = stream_end
-    return stream_event, stream_end_data, response_message, document_ids_to_document
+    return stream_event, stream_accumulator, response_message
 
 
 def generate_langchain_chat_stream(
@@ -868,16 +826,7 @@ def generate_langchain_chat_stream(
     final_message_text = ""
 
     # send stream start event
-    yield json.dumps(
-        jsonable_encoder(
-            ChatResponseEvent(
-                event=StreamEvent.STREAM_START,
-                data=StreamStart(
-                    conversation_id=conversation_id,
-                ),
-            )
-        )
-    )
+    yield encode_chat_event(StreamStart(conversation_id=conversation_id))
     for event in model_deployment_stream:
         stream_event = None
         if isinstance(event, AddableDict):
@@ -972,14 +921,7 @@ def generate_langchain_chat_stream(
                 )
 
             if stream_event:
-                yield json.dumps(
-                    jsonable_encoder(
-                        ChatResponseEvent(
-                            event=stream_event.event_type,
-                            data=stream_event,
-                        )
-                    )
-                )
+                yield encode_chat_event(stream_event)
     if should_store:
         update_conversation_after_turn(
             session, response_message, conversation_id, final_message_text, user_id
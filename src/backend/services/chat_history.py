@@ -0,0 +1,368 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from backend.config.settings import Settings
+from backend.crud import message as message_crud
+from backend.database_models.database import DBSessionDep
+from backend.database_models.message import Message
+from backend.schemas.chat import ChatMessage, ChatRole
+from backend.schemas.context import Context
+from backend.services.metrics import ChatHistoryMetricsHelper
+
+TokenCounter = Callable[[str], int]
+
+# Maximum number of messages sent as chat history to the model
+MAX_HISTORY_MESSAGES = 100
+# Maximum number of rendered chat histories kept in memory
+MAX_CACHED_HISTORIES = 256
+# Average number of characters per token, used to estimate token counts offline
+CHARACTERS_PER_TOKEN = 4
+# Tokens added by the model's prompt template around each message
+MESSAGE_TOKEN_OVERHEAD = 4
+# Maximum number of characters of a dropped message kept in the summary
+SUMMARY_SNIPPET_LENGTH = 200
+SUMMARY_HEADER = "Summary of earlier messages in this conversation:"
+# Share of the token budget reserved for the summary of dropped turns
+SUMMARY_BUDGET_RATIO = 0.1
+
+# Token counters registered per model, see register_token_counter
+token_counters: dict[str, TokenCounter] = {}
+
+chat_history_cache = None
+
+
+def get_chat_history_cache():
+    global chat_history_cache
+    if chat_history_cache is None:
+        chat_history_cache = ChatHistoryCache()
+    return chat_history_cache
+
+
+class ChatHistoryCache:
+    """
+    Process wide LRU cache of rendered chat histories.
+
+    Histories are keyed by the conversation, the last update time of its messages and
+    its number of active messages, so a new, edited, deactivated or deleted message
+    never hits a stale entry.
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_HISTORIES):
+        self.max_size = max_size
+        self._histories: OrderedDict[tuple, list[ChatMessage]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> list[ChatMessage] | None:
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                return None
+            self._histories.move_to_end(key)
+        # Callers extend the history, never hand out the cached list
+        return list(history)
+
+    def put(self, key: tuple, history: list[ChatMessage]) -> None:
+        with self._lock:
+            self._histories[key] = list(history)
+            self._histories.move_to_end(key)
+            while len(self._histories) > self.max_size:
+                self._histories.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histories.clear()
+
+    def __len__(self) -> int:
+        return len(self._histories)
+
+
+def get_next_message_position(
+    session: DBSessionDep, conversation_id: str, user_id: str
+) -> int:
+    """
+    Gets message position to create next messages.
+
+    Args:
+        session (DBSessionDep): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+
+    Returns:
+        int: Position to save new messages with
+    """
+    max_position = message_crud.get_max_message_position(
+        session, conversation_id, user_id
+    )
+
+    # Message starts the conversation
+    if max_position is None:
+        return 0
+
+    return max_position + 1
+
+
+def get_chat_history(
+    session: DBSessionDep,
+    conversation_id: str,
+    user_id: str,
+    user_message_position: int,
+    max_messages: int = MAX_HISTORY_MESSAGES,
+    use_cache: bool = True,
+) -> list[ChatMessage]:
+    """
+    Build the chat history of a conversation from its last active messages.
+
+    Only the last max_messages messages before the user message are loaded. When
+    use_cache is set, the rendered history is reused as long as no message of the
+    conversation changed.
+
+    Args:
+        session (DBSessionDep): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+        user_message_position (int): User message position, later messages are excluded.
+        max_messages (int): Maximum number of messages in the history.
+        use_cache (bool): Whether to use the chat history cache.
+
+    Returns:
+        list[ChatMessage]: List of chat messages.
+    """
+    if not conversation_id or max_messages <= 0:
+        return []
+
+    if not use_cache:
+        return render_chat_history(
+            message_crud.get_last_active_messages(
+                session, conversation_id, user_id, user_message_position, max_messages
+            )
+        )
+
+    last_updated_at, num_active_messages = message_crud.get_messages_version(
+        session, conversation_id, user_id, user_message_position
+    )
+    if not num_active_messages:
+        return []
+
+    key = (
+        conversation_id,
+        user_id,
+        user_message_position,
+        last_updated_at,
+        num_active_messages,
+        max_messages,
+    )
+
+    cache = get_chat_history_cache()
+    chat_history = cache.get(key)
+    if chat_history is not None:
+        return chat_history
+
+    chat_history = render_chat_history(
+        message_crud.get_last_active_messages(
+            session, conversation_id, user_id, user_message_position, max_messages
+        )
+    )
+    cache.put(key, chat_history)
+    return chat_history
+
+
+def render_chat_history(messages: list[Message]) -> list[ChatMessage]:
+    return [
+        ChatMessage(
+            role=ChatRole(message.agent.value.upper()),
+            message=message.text,
+        )
+        for message in messages
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer.
+
+    Args:
+        text (str): Text to count.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARACTERS_PER_TOKEN)
+
+
+def register_token_counter(model: str, token_counter: TokenCounter) -> None:
+    """
+    Use a model specific tokenizer to count the tokens of the chat history.
+
+    Args:
+        model (str): Model name.
+        token_counter (TokenCounter): Function returning the number of tokens of a text.
+    """
+    token_counters[model] = token_counter
+
+
+def get_token_counter(model: str | None) -> TokenCounter:
+    return token_counters.get(model, estimate_tokens)
+
+
+def get_history_token_budget(model: str | None) -> int:
+    chat_settings = Settings().chat
+    model_budgets = chat_settings.history_token_budgets_by_model or {}
+    if model in model_budgets:
+        return model_budgets[model]
+    return chat_settings.history_token_budget
+
+
+def count_message_tokens(message: ChatMessage, count_tokens: TokenCounter) -> int:
+    return (
+        count_tokens(message.message or "")
+        + count_tokens(message.tool_plan or "")
+        + MESSAGE_TOKEN_OVERHEAD
+    )
+
+
+def split_turns(chat_history: list[ChatMessage]) -> list[list[ChatMessage]]:
+    # A turn starts with a user message and holds everything up to the next one
+    turns = []
+    for message in chat_history:
+        if not turns or message.role == ChatRole.USER:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def summarize_messages(
+    messages: list[ChatMessage], token_budget: int, count_tokens: TokenCounter
+) -> ChatMessage | None:
+    """
+    Build an extractive summary of dropped messages, newest messages first, within a token budget.
+
+    Args:
+        messages (list[ChatMessage]): Dropped messages.
+        token_budget (int): Maximum number of tokens of the summary.
+        count_tokens (TokenCounter): Token counter.
+
+    Returns:
+        ChatMessage | None: System message with the summary, None if nothing fits.
+    """
+    used_tokens = count_tokens(SUMMARY_HEADER) + MESSAGE_TOKEN_OVERHEAD
+    lines = []
+    for message in reversed(messages):
+        text = " ".join((message.message or "").split())
+        if not text:
+            continue
+        if len(text) > SUMMARY_SNIPPET_LENGTH:
+            text = text[:SUMMARY_SNIPPET_LENGTH] + "..."
+        line = f"- {message.role.value}: {text}"
+        line_tokens = count_tokens(line)
+        if used_tokens + line_tokens > token_budget:
+            break
+        lines.append(line)
+        used_tokens += line_tokens
+
+    if not lines:
+        return None
+
+    lines.reverse()
+    return ChatMessage(
+        role=ChatRole.SYSTEM, message="\n".join([SUMMARY_HEADER] + lines)
+    )
+
+
+def truncate_chat_history(
+    chat_history: list[ChatMessage],
+    token_budget: int,
+    count_tokens: TokenCounter = estimate_tokens,
+    summarize: bool = False,
+) -> tuple[list[ChatMessage], int, int]:
+    """
+    Keep the newest turns of a chat history that fit in a token budget.
+
+    Turns are dropped whole, oldest first. When summarize is set, part of the budget is
+    reserved for a summary of the dropped messages.
+
+    Args:
+        chat_history (list[ChatMessage]): Chat history.
+        token_budget (int): Maximum number of tokens of the chat history.
+        count_tokens (TokenCounter): Token counter.
+        summarize (bool): Whether to summarize the dropped turns.
+
+    Returns:
+        tuple[list[ChatMessage], int, int]: Truncated chat history, token count before and after.
+    """
+    turns = split_turns(chat_history)
+    turn_tokens = [
+        sum(count_message_tokens(message, count_tokens) for message in turn)
+        for turn in turns
+    ]
+    tokens_before = sum(turn_tokens)
+    if tokens_before <= token_budget:
+        return chat_history, tokens_before, tokens_before
+
+    turns_budget = token_budget
+    if summarize:
+        turns_budget -= int(token_budget * SUMMARY_BUDGET_RATIO)
+
+    # Walk back from the newest turn until the budget is spent
+    tokens_after = 0
+    first_kept_turn = len(turns)
+    while (
+        first_kept_turn > 0
+        and tokens_after + turn_tokens[first_kept_turn - 1] <= turns_budget
+    ):
+        first_kept_turn -= 1
+        tokens_after += turn_tokens[first_kept_turn]
+
+    kept_messages = [message for turn in turns[first_kept_turn:] for message in turn]
+    if summarize:
+        dropped_messages = [
+            message for turn in turns[:first_kept_turn] for message in turn
+        ]
+        summary = summarize_messages(
+            dropped_messages, token_budget - tokens_after, count_tokens
+        )
+        if summary is not None:
+            kept_messages.insert(0, summary)
+            tokens_after += count_message_tokens(summary, count_tokens)
+
+    return kept_messages, tokens_before, tokens_after
+
+
+def compact_chat_history(
+    chat_history: list[ChatMessage], ctx: Context
+) -> list[ChatMessage]:
+    """
+    Fit a chat history in the token budget of the model and report the tokens saved.
+
+    Args:
+        chat_history (list[ChatMessage]): Chat history.
+        ctx (Context): Context object.
+
+    Returns:
+        list[ChatMessage]: Compacted chat history.
+    """
+    model = ctx.get_model()
+    compacted_history, tokens_before, tokens_after = truncate_chat_history(
+        chat_history,
+        get_history_token_budget(model),
+        get_token_counter(model),
+        Settings().chat.summarize_dropped_history,
+    )
+
+    if tokens_after < tokens_before:
+        kept_messages = {id(message) for message in compacted_history}
+        dropped_messages = sum(
+            id(message) not in kept_messages for message in chat_history
+        )
+        ctx.get_logger().info(
+            event=f"[Chat] Chat history truncated from {tokens_before} to {tokens_after} tokens",
+            dropped_messages=dropped_messages,
+        )
+        ChatHistoryMetricsHelper.report_history_truncation(
+            tokens_before, tokens_after, dropped_messages, ctx
+        )
+
+    return compacted_history
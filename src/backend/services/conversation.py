@@ -7,7 +7,7 @@ from backend.crud import conversation as conversation_crud
 from backend.database_models import File as FileModel
 from backend.database_models import Message as MessageModel
 from backend.database_models.conversation import Conversation as ConversationModel
-from backend.database_models.database import DBSessionDep
+from backend.database_models.database import DBSessionDep, get_session_factory
 from backend.schemas.chat import ChatRole
 from backend.schemas.cohere_chat import CohereChatRequest
 from backend.schemas.context import Context
@@ -242,7 +242,7 @@ async def generate_conversation_title(
         )
 
         response = await generate_chat_response(
-            session,
+            get_session_factory(session),
             CustomChat().chat(
                 chat_request,
                 stream=False,
@@ -1,13 +1,21 @@
-import io
-
+import asyncio
+import codecs
+import posixpath
+import tempfile
+import zipfile
+from typing import Any, BinaryIO
+
+import anyio
 import pandas as pd
-from docx import Document
 from fastapi import HTTPException
 from fastapi import UploadFile as FastAPIUploadFile
+from lxml import etree
 from python_calamine.pandas import pandas_monkeypatch
 
 import backend.crud.conversation as conversation_crud
 import backend.crud.file as file_crud
+from backend.chat.chunk_cache import get_chunk_cache
+from backend.chat.collate import chunk_spans
 from backend.config.tools import ToolName
 from backend.crud import agent as agent_crud
 from backend.crud import message as message_crud
@@ -16,6 +24,9 @@ from backend.database_models.database import DBSessionDep
 from backend.database_models.file import File as FileModel
 from backend.schemas.file import File, UpdateFileRequest
 from backend.services import utils
+from backend.services.chat_history import estimate_tokens
+from backend.services.file_index import build_file_index
+from backend.services.file_store import collect_file_contents, get_file_content_store
 
 MAX_FILE_SIZE = 20_000_000  # 20MB
 MAX_TOTAL_FILE_SIZE = 1_000_000_000  # 1GB
@@ -29,6 +40,39 @@ EXCEL_OLD_EXTENSION = "xls"
 JSON_EXTENSION = "json"
 DOCX_EXTENSION = "docx"
 
+# Number of words of the file preview shown to the model
+PREVIEW_WORD_COUNT = 25
+# Chunk sizes of the chunk spans stored with the files, the defaults of collate.chunk
+CHUNK_SOFT_WORD_CUT_OFF = 100
+CHUNK_HARD_WORD_CUT_OFF = 300
+
+# Uploads are copied in chunks to a temporary file, kept in memory up to this size
+SPOOL_MAX_MEMORY_SIZE = 1_000_000  # 1MB
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024
+
+DOCX_MAIN_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+DOCX_RELATIONSHIPS_NAMESPACE = (
+    "http://schemas.openxmlformats.org/package/2006/relationships"
+)
+DOCX_OFFICE_DOCUMENT_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+DOCX_DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+TEXT_EXTENSIONS = [
+    TEXT_EXTENSION,
+    MARKDOWN_EXTENSION,
+    CSV_EXTENSION,
+    JSON_EXTENSION,
+]
+EXCEL_EXTENSIONS = [EXCEL_EXTENSION, EXCEL_OLD_EXTENSION]
+SUPPORTED_EXTENSIONS = [
+    PDF_EXTENSION,
+    DOCX_EXTENSION,
+    *TEXT_EXTENSIONS,
+    *EXCEL_EXTENSIONS,
+]
+
 # Monkey patch Pandas to use Calamine for Excel reading because Calamine is faster than Pandas
 pandas_monkeypatch()
 
@@ -68,27 +112,54 @@ class FileService:
         Returns:
             list[File]: The files that were created
         """
+        conversation = conversation_crud.get_conversation(
+            session, conversation_id, user_id
+        )
+        if not conversation:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Conversation with ID: {conversation_id} not found.",
+            )
+
+        # Imported here, the file parser imports the readers of this module
+        from backend.services.file_parser import parse_upload_file
+
+        # Parse the files of the batch in parallel
+        parsed_files = await asyncio.gather(
+            *[parse_upload_file(file) for file in files]
+        )
+
+        # The contents can't be collected from the moment they are stored until the
+        # files referencing them are committed, see collect_file_contents
+        await anyio.to_thread.run_sync(
+            file_crud.lock_content_hashes,
+            session,
+            [content_hash for _, content_hash in parsed_files],
+        )
+
         files_to_upload = []
-        for file in files:
-            content = await get_file_content(file)
+        content_store = get_file_content_store()
+        for file, (content, content_hash) in zip(files, parsed_files):
             cleaned_content = content.replace("\x00", "")
             filename = file.filename.encode("ascii", "ignore").decode("utf-8")
-            conversation = conversation_crud.get_conversation(
-                session, conversation_id, user_id
-            )
-            if not conversation:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Conversation with ID: {conversation_id} not found.",
-                )
 
+            # The text is stored once per content hash, rewritten in case it was
+            # collected since it was parsed
+            await anyio.to_thread.run_sync(
+                content_store.put_text, content_hash, cleaned_content
+            )
+            # Chunking and indexing large files would stall the event loop
+            metadata = await anyio.to_thread.run_sync(
+                get_file_metadata, cleaned_content
+            )
             files_to_upload.append(
                 FileModel(
                     file_name=filename,
                     file_size=file.size,
                     file_path=filename,
-                    file_content=cleaned_content,
+                    content_hash=content_hash,
                     user_id=conversation.user_id,
+                    **metadata,
                 )
             )
 
@@ -107,7 +178,11 @@ class FileService:
         return uploaded_files
 
     def get_files_by_agent_id(
-        self, session: DBSessionDep, user_id: str, agent_id: str
+        self,
+        session: DBSessionDep,
+        user_id: str,
+        agent_id: str,
+        load_content: bool = False,
     ) -> list[File]:
         """
         Get files by agent ID
@@ -116,6 +191,7 @@ class FileService:
             session (DBSessionDep): The database session
             user_id (str): The user ID
             agent_id (str): The agent ID
+            load_content (bool): Whether to load the file contents with the files
 
         Returns:
             list[File]: The files that were created
@@ -144,12 +220,18 @@ class FileService:
                 if artifact.get("type") == "local_file"
             ]
 
-            files = file_crud.get_files_by_ids(session, file_ids, user_id)
+            files = file_crud.get_files_by_ids(
+                session, file_ids, user_id, load_content=load_content
+            )
 
         return files
 
     def get_files_by_conversation_id(
-        self, session: DBSessionDep, user_id: str, conversation_id: str
+        self,
+        session: DBSessionDep,
+        user_id: str,
+        conversation_id: str,
+        load_content: bool = False,
     ) -> list[FileModel]:
         """
         Get files by conversation ID
@@ -158,6 +240,7 @@ class FileService:
             session (DBSessionDep): The database session
             user_id (str): The user ID
             conversation_id (str): The conversation ID
+            load_content (bool): Whether to load the file contents with the files
 
         Returns:
             list[File]: The files that were created
@@ -174,7 +257,9 @@ class FileService:
 
         files = []
         if file_ids is not None:
-            files = file_crud.get_files_by_ids(session, file_ids, user_id)
+            files = file_crud.get_files_by_ids(
+                session, file_ids, user_id, load_content=load_content
+            )
 
         return files
 
@@ -193,7 +278,10 @@ class FileService:
         conversation_crud.delete_conversation_file_association(
             session, conversation_id, file_id, user_id
         )
+        file = file_crud.get_file(session, file_id, user_id)
+        content_hash = file.content_hash if file is not None else None
         file_crud.delete_file(session, file_id, user_id)
+        collect_file_contents(session, [content_hash])
         return
 
     def get_file_by_id(self, session: DBSessionDep, file_id: str, user_id: str) -> File:
@@ -256,7 +344,10 @@ class FileService:
             file_ids (list[str]): The file IDs
             user_id (str): The user ID
         """
+        files = file_crud.get_files_by_ids(session, file_ids, user_id)
+        content_hashes = [file.content_hash for file in files]
         file_crud.bulk_delete_files(session, file_ids, user_id)
+        collect_file_contents(session, content_hashes)
 
     def get_files_by_message_id(
         self, session: DBSessionDep, message_id: str, user_id: str
@@ -336,9 +427,40 @@ def get_file_extension(file_name: str) -> str:
     return file_name.split(".")[-1].lower()
 
 
+def get_file_metadata(content: str) -> dict:
+    """Computes the fields derived from the file content, stored with the file
+
+    The chunk spans also warm the chunk cache, for the file tools reading the file.
+
+    Args:
+        content (str): The file content
+
+    Returns:
+        dict: The word count, preview, token count, chunk spans and search index of the file
+    """
+    words = content.split()
+    spans = chunk_spans(content, CHUNK_SOFT_WORD_CUT_OFF, CHUNK_HARD_WORD_CUT_OFF)
+
+    chunk_cache = get_chunk_cache()
+    chunk_cache.put(
+        chunk_cache.get_key(content, CHUNK_SOFT_WORD_CUT_OFF, CHUNK_HARD_WORD_CUT_OFF),
+        spans,
+    )
+
+    return {
+        "word_count": len(words),
+        "preview": " ".join(words[:PREVIEW_WORD_COUNT]),
+        "token_count": estimate_tokens(content),
+        "chunk_spans": [list(span) for span in spans],
+        "search_index": build_file_index(content, spans),
+    }
+
+
 async def get_file_content(file: FastAPIUploadFile) -> str:
     """Reads the file contents based on the file extension
 
+    Parsing runs in the parse worker processes, see services/file_parser.py.
+
     Args:
         file (UploadFile): The file to read
 
@@ -346,49 +468,220 @@ async def get_file_content(file: FastAPIUploadFile) -> str:
         str: The file contents
 
     Raises:
-        ValueError: If the file extension is not supported
+        ValueError: If the file extension is not supported or parsing timed out
+        HTTPException: If the file size is too large
+    """
+    # Imported here, the file parser imports the readers of this module
+    from backend.services.file_parser import parse_upload_file
+
+    content, _ = await parse_upload_file(file)
+    return content
+
+
+async def spool_upload_file(
+    file: FastAPIUploadFile,
+    max_size: int = MAX_FILE_SIZE,
+    digest: Any = None,
+    stream: BinaryIO | None = None,
+) -> BinaryIO:
+    """Copies an upload in chunks to a temporary file, checking its size while reading
+
+    Args:
+        file (UploadFile): The file to copy
+        max_size (int): The maximum file size in bytes
+        digest (Any): A hashlib hash updated with the file contents
+        stream (BinaryIO | None): The file to copy to, a SpooledTemporaryFile by default
+
+    Returns:
+        BinaryIO: The copy, rewound to its start
+
+    Raises:
+        HTTPException: If the file size is too large
     """
-    file_contents = await file.read()
-    file_extension = get_file_extension(file.filename)
+    if stream is None:
+        stream = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY_SIZE)
+    try:
+        await file.seek(0)
+        size = 0
+        while chunk := await file.read(UPLOAD_READ_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{file.filename} exceeds the maximum allowed size of {max_size} bytes.",
+                )
+            stream.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
+        stream.flush()
+        stream.seek(0)
+    except BaseException:
+        stream.close()
+        raise
+
+    return stream
+
+
+def read_file_stream(stream: BinaryIO, file_extension: str) -> str:
+    """Reads the text of a file based on the file extension
 
+    Args:
+        stream (BinaryIO): The file contents, at the start of the file
+        file_extension (str): The file extension
+
+    Returns:
+        str: The file contents
+
+    Raises:
+        ValueError: If the file extension is not supported
+    """
     if file_extension == PDF_EXTENSION:
-        return utils.read_pdf(file_contents)
+        return utils.read_pdf(stream)
     elif file_extension == DOCX_EXTENSION:
-        return read_docx(file_contents)
-    elif file_extension in [
-        TEXT_EXTENSION,
-        MARKDOWN_EXTENSION,
-        CSV_EXTENSION,
-        JSON_EXTENSION,
-    ]:
-        return file_contents.decode("utf-8")
-    elif file_extension in [EXCEL_EXTENSION, EXCEL_OLD_EXTENSION]:
-        return read_excel(file_contents)
+        return read_docx(stream)
+    elif file_extension in TEXT_EXTENSIONS:
+        return read_text(stream)
+    elif file_extension in EXCEL_EXTENSIONS:
+        return read_excel(stream)
 
     raise ValueError(f"File extension {file_extension} is not supported")
 
 
-def read_excel(file_contents: bytes) -> str:
+def read_text(stream: BinaryIO) -> str:
+    """Decodes a UTF-8 file chunk by chunk
+
+    Args:
+        stream (BinaryIO): The file contents
+
+    Returns:
+        str: The decoded text
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    while chunk := stream.read(UPLOAD_READ_CHUNK_SIZE):
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def read_excel(stream: BinaryIO) -> str:
     """Reads the text from an Excel file using Pandas
 
     Args:
-        file_contents (bytes): The file contents
+        stream (BinaryIO): The file contents
 
     Returns:
         str: The text extracted from the Excel
     """
-    excel = pd.read_excel(io.BytesIO(file_contents), engine="calamine")
+    excel = pd.read_excel(stream, engine="calamine")
     return excel.to_string()
 
 
-def read_docx(file_contents: bytes) -> str:
-    document = Document(io.BytesIO(file_contents))
-    text = ""
+def read_docx(stream: BinaryIO) -> str:
+    """Reads the text of the paragraphs of a DOCX file
+
+    The document XML is parsed incrementally and each paragraph is dropped once its
+    text is read, instead of loading the whole document tree.
+
+    Args:
+        stream (BinaryIO): The file contents
+
+    Returns:
+        str: The text extracted from the DOCX, one paragraph per line
+    """
+    body_tag = f"{{{DOCX_MAIN_NAMESPACE}}}body"
+    paragraph_tag = f"{{{DOCX_MAIN_NAMESPACE}}}p"
+
+    with zipfile.ZipFile(stream) as archive:
+        document_part = get_docx_document_part(archive)
+        with archive.open(document_part) as document:
+            paragraphs = []
+            for _, element in etree.iterparse(
+                document, events=("end",), resolve_entities=False
+            ):
+                parent = element.getparent()
+                if parent is None or parent.tag != body_tag:
+                    continue
+
+                if element.tag == paragraph_tag:
+                    paragraphs.append(get_docx_paragraph_text(element) + "\n")
+
+                # Free the body elements already read
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+
+    return "".join(paragraphs)
+
+
+def get_docx_document_part(archive: zipfile.ZipFile) -> str:
+    """Finds the name of the main document part of a DOCX archive
+
+    Args:
+        archive (zipfile.ZipFile): The DOCX archive
+
+    Returns:
+        str: The name of the main document part
+    """
+    try:
+        relationships = etree.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return DOCX_DEFAULT_DOCUMENT_PART
+
+    for relationship in relationships.iter(
+        f"{{{DOCX_RELATIONSHIPS_NAMESPACE}}}Relationship"
+    ):
+        if relationship.get("Type") == DOCX_OFFICE_DOCUMENT_RELATIONSHIP:
+            return posixpath.normpath(relationship.get("Target", "").lstrip("/"))
+
+    return DOCX_DEFAULT_DOCUMENT_PART
 
-    for paragraph in document.paragraphs:
-        text += paragraph.text + "\n"
 
-    return text
+def get_docx_paragraph_text(paragraph: etree._Element) -> str:
+    """Returns the text of a DOCX paragraph, including its hyperlinks
+
+    Args:
+        paragraph (etree._Element): The w:p element
+
+    Returns:
+        str: The paragraph text
+    """
+    run_tag = f"{{{DOCX_MAIN_NAMESPACE}}}r"
+    hyperlink_tag = f"{{{DOCX_MAIN_NAMESPACE}}}hyperlink"
+
+    text = []
+    for child in paragraph:
+        if child.tag == run_tag:
+            text.append(get_docx_run_text(child))
+        elif child.tag == hyperlink_tag:
+            text.extend(get_docx_run_text(run) for run in child if run.tag == run_tag)
+    return "".join(text)
+
+
+def get_docx_run_text(run: etree._Element) -> str:
+    """Returns the text of a DOCX run, with tabs and line breaks as characters
+
+    Args:
+        run (etree._Element): The w:r element
+
+    Returns:
+        str: The run text
+    """
+    text = []
+    for child in run:
+        tag = etree.QName(child).localname if isinstance(child.tag, str) else None
+        if tag == "t":
+            text.append(child.text or "")
+        elif tag in ("tab", "ptab"):
+            text.append("\t")
+        elif tag == "cr":
+            text.append("\n")
+        elif tag == "br":
+            break_type = child.get(f"{{{DOCX_MAIN_NAMESPACE}}}type", "textWrapping")
+            text.append("\n" if break_type == "textWrapping" else "")
+        elif tag == "noBreakHyphen":
+            text.append("-")
+    return "".join(text)
 
 
 def validate_file_size(
@@ -409,8 +702,7 @@ def validate_file_size(
             detail=f"File size exceeds the maximum allowed size of {MAX_FILE_SIZE} bytes.",
         )
 
-    existing_files = file_crud.get_files_by_user_id(session, user_id)
-    total_file_size = sum([f.file_size for f in existing_files]) + file.size
+    total_file_size = file_crud.get_total_file_size(session, user_id) + file.size
 
     if total_file_size > MAX_TOTAL_FILE_SIZE:
         raise HTTPException(
@@ -440,8 +732,7 @@ def validate_batch_file_size(
             )
         total_batch_size += file.size
 
-    existing_files = file_crud.get_files_by_user_id(session, user_id)
-    total_file_size = sum([f.file_size for f in existing_files]) + total_batch_size
+    total_file_size = file_crud.get_total_file_size(session, user_id) + total_batch_size
 
     if total_file_size > MAX_TOTAL_FILE_SIZE:
         raise HTTPException(
@@ -0,0 +1,85 @@
+import heapq
+import math
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+from backend.model_deployments.lexical_rerank import BM25_B, BM25_K1, tokenize
+
+
+def build_file_index(content: str, spans: Sequence[Sequence[int]]) -> Dict[str, Any]:
+    """
+    Build the inverted index of the chunks of a file.
+
+    The postings of each term are stored flat, as chunk index and term frequency pairs,
+    to keep the index compact once serialized to JSON.
+
+    Args:
+        content (str): File content.
+        spans (Sequence[Sequence[int]]): Start and end offsets of the chunks.
+
+    Returns:
+        Dict[str, Any]: Number of terms of each chunk and postings of each term.
+    """
+    lengths = []
+    postings: Dict[str, List[int]] = {}
+    for chunk_index, (start, end) in enumerate(spans):
+        terms = tokenize(content[start:end])
+        lengths.append(len(terms))
+        for term, frequency in Counter(terms).items():
+            postings.setdefault(term, []).extend((chunk_index, frequency))
+
+    return {"lengths": lengths, "postings": postings}
+
+
+def search_file_indexes(
+    query: str, indexes: List[Dict[str, Any]], top_n: int
+) -> List[tuple[int, int, float]]:
+    """
+    Find the chunks of files best matching a query with BM25.
+
+    The chunks of all the files are scored as one collection, so the scores of the
+    chunks of different files can be compared.
+
+    Args:
+        query (str): Search query.
+        indexes (List[Dict[str, Any]]): Index of each file, see build_file_index.
+        top_n (int): Maximum number of chunks.
+
+    Returns:
+        List[tuple[int, int, float]]: File index, chunk index and score of the best
+            matching chunks, by decreasing score. Chunks without query terms are left out.
+    """
+    num_chunks = sum(len(index["lengths"]) for index in indexes)
+    if not num_chunks:
+        return []
+
+    total_length = sum(sum(index["lengths"]) for index in indexes)
+    average_length = max(total_length / num_chunks, 1.0)
+
+    scores: Dict[tuple[int, int], float] = {}
+    for term in dict.fromkeys(tokenize(query)):
+        term_postings = [index["postings"].get(term, []) for index in indexes]
+        document_frequency = sum(len(postings) // 2 for postings in term_postings)
+        if not document_frequency:
+            continue
+
+        idf = math.log1p(
+            (num_chunks - document_frequency + 0.5) / (document_frequency + 0.5)
+        )
+        for file_index, postings in enumerate(term_postings):
+            lengths = indexes[file_index]["lengths"]
+            for i in range(0, len(postings), 2):
+                chunk_index, frequency = postings[i], postings[i + 1]
+                length_norm = BM25_K1 * (
+                    1 - BM25_B + BM25_B * lengths[chunk_index] / average_length
+                )
+                key = (file_index, chunk_index)
+                scores[key] = scores.get(key, 0.0) + idf * (
+                    frequency * (BM25_K1 + 1) / (frequency + length_norm)
+                )
+
+    best_chunks = heapq.nlargest(top_n, scores.items(), key=lambda item: item[1])
+    return [
+        (file_index, chunk_index, score)
+        for (file_index, chunk_index), score in best_chunks
+    ]
@@ -0,0 +1,289 @@
+import asyncio
+import hashlib
+import multiprocessing
+import tempfile
+import threading
+from collections import OrderedDict
+from multiprocessing.connection import Connection
+
+import anyio
+from fastapi import UploadFile as FastAPIUploadFile
+
+from backend.config.settings import Settings
+from backend.services.cache import cache_get, cache_put
+from backend.services.file import (
+    SUPPORTED_EXTENSIONS,
+    get_file_extension,
+    read_file_stream,
+    spool_upload_file,
+)
+from backend.services.file_store import get_file_content_store
+from backend.services.logger.utils import LoggerFactory
+
+# Maximum number of characters of parsed content kept in memory
+MAX_CACHED_PARSED_CHARACTERS = 50_000_000
+# Lifetime of the parsed content stored in Redis, in seconds
+REDIS_PARSED_CONTENT_EXPIRE = 24 * 60 * 60
+REDIS_KEY_PREFIX = "parsed_file"
+
+logger = LoggerFactory().get_logger()
+
+parse_slots = None
+parse_processes: set[multiprocessing.Process] = set()
+parse_cache = None
+
+
+def get_parse_slots() -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding the number of parse processes running at the same time.
+    """
+    global parse_slots
+    if parse_slots is None:
+        parse_slots = asyncio.Semaphore(Settings().files.parse_workers)
+    return parse_slots
+
+
+def stop_parse_processes() -> None:
+    """
+    Kill the processes still parsing files, e.g. on shutdown.
+    """
+    for process in list(parse_processes):
+        process.kill()
+
+
+def get_parse_cache():
+    global parse_cache
+    if parse_cache is None:
+        parse_cache = ParseCache(use_redis=bool(Settings().redis.url))
+    return parse_cache
+
+
+class ParseCache:
+    """
+    Cache of the text parsed from uploaded files, keyed by the hash of the file contents.
+
+    Re-uploads of the same file skip parsing. The text is kept in a process wide LRU
+    cache bounded by its total length and, when Redis is configured, shared between
+    workers through Redis.
+    """
+
+    def __init__(
+        self,
+        max_characters: int = MAX_CACHED_PARSED_CHARACTERS,
+        use_redis: bool = False,
+    ):
+        self.max_characters = max_characters
+        self.use_redis = use_redis
+        self._contents: OrderedDict[str, str] = OrderedDict()
+        self._characters = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(content_hash: str, file_extension: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{file_extension}:{content_hash}"
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            content = self._contents.get(key)
+            if content is not None:
+                self._contents.move_to_end(key)
+                return content
+
+        if not self.use_redis:
+            return None
+
+        try:
+            content = cache_get(key)
+        except Exception as e:
+            logger.warning(
+                event=f"[Parse Cache] Error reading parsed content from Redis: {e}"
+            )
+            return None
+
+        if content is not None:
+            self._put_local(key, content)
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        self._put_local(key, content)
+
+        if not self.use_redis:
+            return
+
+        try:
+            cache_put(key, content, expire=REDIS_PARSED_CONTENT_EXPIRE)
+        except Exception as e:
+            logger.warning(
+                event=f"[Parse Cache] Error writing parsed content to Redis: {e}"
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contents.clear()
+            self._characters = 0
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def _put_local(self, key: str, content: str) -> None:
+        if len(content) > self.max_characters:
+            return
+
+        with self._lock:
+            previous = self._contents.pop(key, None)
+            if previous is not None:
+                self._characters -= len(previous)
+            self._contents[key] = content
+            self._characters += len(content)
+            while self._characters > self.max_characters:
+                _, evicted = self._contents.popitem(last=False)
+                self._characters -= len(evicted)
+
+
+def parse_file_path(path: str, file_extension: str) -> str:
+    """
+    Parse a file from its path, run in the parse processes.
+
+    Args:
+        path (str): Path of the file.
+        file_extension (str): File extension.
+
+    Returns:
+        str: Text of the file.
+    """
+    with open(path, "rb") as stream:
+        return read_file_stream(stream, file_extension)
+
+
+def run_parse_process(path: str, file_extension: str, connection: Connection) -> None:
+    """
+    Entry point of the parse processes, sends back the text or the parsing error.
+    """
+    try:
+        result = (parse_file_path(path, file_extension), None)
+    except Exception as e:
+        result = (None, f"{e.__class__.__name__}: {e}")
+    connection.send(result)
+    connection.close()
+
+
+def receive_parse_result(connection: Connection, timeout: float) -> tuple:
+    if not connection.poll(timeout):
+        raise TimeoutError
+    return connection.recv()
+
+
+async def parse_in_process(path: str, file_extension: str, timeout: float) -> str:
+    """
+    Parse a file in a process of its own, killed if parsing times out.
+
+    Parsers can hang or run away on crafted files, a process per file lets the stuck
+    one be killed without affecting the files parsed for other uploads.
+
+    Args:
+        path (str): Path of the file.
+        file_extension (str): File extension.
+        timeout (float): Maximum parsing time, in seconds.
+
+    Returns:
+        str: Text of the file.
+
+    Raises:
+        TimeoutError: If parsing timed out.
+        ValueError: If parsing failed.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=run_parse_process, args=(path, file_extension, sender), daemon=True
+    )
+    process.start()
+    parse_processes.add(process)
+    sender.close()
+    try:
+        # The result is awaited in a thread, for at most the timeout
+        content, error = await anyio.to_thread.run_sync(
+            receive_parse_result, receiver, timeout
+        )
+    except EOFError:
+        # e.g. the process ran out of memory
+        content, error = None, "Parsing process exited unexpectedly"
+    finally:
+        if process.is_alive():
+            process.kill()
+        await anyio.to_thread.run_sync(process.join)
+        parse_processes.discard(process)
+        receiver.close()
+
+    if error is not None:
+        raise ValueError(error)
+    return content
+
+
+async def parse_upload_file(file: FastAPIUploadFile) -> tuple[str, str]:
+    """
+    Parse an uploaded file outside of the event loop, with a timeout.
+
+    Files already in the parse cache or in the file content store are not parsed again.
+
+    Args:
+        file (FastAPIUploadFile): Uploaded file.
+
+    Returns:
+        tuple[str, str]: Text of the file and SHA-256 of the uploaded bytes.
+
+    Raises:
+        ValueError: If the file extension is not supported, parsing failed or timed out.
+        HTTPException: If the file size is too large.
+    """
+    file_extension = get_file_extension(file.filename)
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"File extension {file_extension} is not supported")
+
+    settings = Settings().files
+    use_processes = bool(settings.parse_workers)
+    digest = hashlib.sha256()
+    # Parse processes open the file by its name
+    with await spool_upload_file(
+        file,
+        digest=digest,
+        stream=tempfile.NamedTemporaryFile() if use_processes else None,
+    ) as stream:
+        content_hash = digest.hexdigest()
+        parse_cache = get_parse_cache()
+        key = parse_cache.get_key(content_hash, file_extension)
+        content = parse_cache.get(key)
+        if content is not None:
+            return content, content_hash
+
+        content = await anyio.to_thread.run_sync(
+            get_file_content_store().get_text, content_hash
+        )
+        if content is not None:
+            parse_cache.put(key, content)
+            return content, content_hash
+
+        timeout = settings.parse_timeout
+        try:
+            if use_processes:
+                async with get_parse_slots():
+                    content = await parse_in_process(
+                        stream.name, file_extension, timeout
+                    )
+            else:
+                # Parsing threads can't be stopped, only stop waiting for them
+                content = await asyncio.wait_for(
+                    asyncio.get_running_loop().run_in_executor(
+                        None, read_file_stream, stream, file_extension
+                    ),
+                    timeout=timeout,
+                )
+        except TimeoutError:
+            logger.error(
+                event=f"[File Parser] Parsing {file.filename} timed out after {timeout} seconds"
+            )
+            raise ValueError(
+                f"Parsing {file.filename} timed out after {timeout} seconds"
+            )
+
+    parse_cache.put(key, content)
+    return content, content_hash
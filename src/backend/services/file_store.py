@@ -0,0 +1,192 @@
+import os
+import tempfile
+import zlib
+from abc import abstractmethod
+from typing import Iterable
+
+from backend.config.settings import Settings
+from backend.crud import file as file_crud
+from backend.database_models.database import DBSessionDep
+from backend.database_models.file import File
+from backend.services.logger.utils import LoggerFactory
+
+LOCAL_CONTENT_STORE = "local"
+S3_CONTENT_STORE = "s3"
+COMPRESSION_LEVEL = 6
+
+logger = LoggerFactory().get_logger()
+
+file_content_store = None
+
+
+def get_file_content_store():
+    global file_content_store
+    if file_content_store is None:
+        settings = Settings().files
+        if settings.content_store == S3_CONTENT_STORE:
+            backend = S3BlobBackend(settings.content_store_bucket)
+        else:
+            backend = LocalBlobBackend(settings.content_store_path)
+        file_content_store = FileContentStore(backend)
+    return file_content_store
+
+
+class BlobBackend:
+    """
+    Abstract storage of binary blobs by key.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+
+class LocalBlobBackend(BlobBackend):
+    """
+    Blobs stored as files in a local directory, sharded by the first characters of the key.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            with open(self.get_path(key), "rb") as blob:
+                return blob.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial blob
+        fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as blob:
+                blob.write(data)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self.get_path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobBackend(BlobBackend):
+    """
+    Blobs stored as objects of an S3 compatible object store.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "file_contents/"):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3")
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read()
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+
+class FileContentStore:
+    """
+    Text extracted from uploaded files, stored once per SHA-256 of the uploaded bytes.
+
+    Files uploaded many times (e.g. the same PDF attached to several conversations)
+    reference the same compressed text through File.content_hash.
+    """
+
+    def __init__(self, backend: BlobBackend):
+        self.backend = backend
+
+    def get_text(self, content_hash: str) -> str | None:
+        data = self.backend.get(content_hash)
+        if data is None:
+            return None
+        return zlib.decompress(data).decode("utf-8", "surrogatepass")
+
+    def put_text(self, content_hash: str, text: str) -> None:
+        data = zlib.compress(text.encode("utf-8", "surrogatepass"), COMPRESSION_LEVEL)
+        self.backend.put(content_hash, data)
+
+    def delete(self, content_hash: str) -> None:
+        self.backend.delete(content_hash)
+
+
+def get_file_text(file: File) -> str:
+    """
+    Get the text of a file, from the content store or from the files table for the
+    files uploaded before the content store.
+
+    Args:
+        file (File): File.
+
+    Returns:
+        str: Text of the file.
+
+    Raises:
+        FileNotFoundError: If the content of the file is missing from the content store.
+    """
+    if not file.content_hash:
+        return file.file_content
+
+    text = get_file_content_store().get_text(file.content_hash)
+    if text is None:
+        logger.error(
+            event=f"[File Store] Content {file.content_hash} of file {file.id} not found"
+        )
+        raise FileNotFoundError(f"Content of file {file.file_name} not found")
+    return text
+
+
+def collect_file_contents(session: DBSessionDep, content_hashes: Iterable[str]) -> None:
+    """
+    Delete the stored contents no file references anymore, after files are deleted.
+
+    Args:
+        session (DBSessionDep): Database session.
+        content_hashes (Iterable[str]): Content hashes of the deleted files.
+    """
+    store = get_file_content_store()
+    for content_hash in set(content_hashes):
+        if not content_hash:
+            continue
+
+        # Uploads hold the same lock from storing the content until their files are
+        # committed, so no file can start referencing the content before it is deleted
+        file_crud.lock_content_hashes(session, [content_hash])
+        try:
+            if file_crud.count_files_by_content_hash(session, content_hash) > 0:
+                continue
+
+            store.delete(content_hash)
+        except Exception as e:
+            logger.warning(
+                event=f"[File Store] Error deleting content {content_hash}: {e}"
+            )
+        finally:
+            # Releases the lock
+            session.commit()
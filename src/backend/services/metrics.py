@@ -431,6 +431,34 @@ class RerankMetricsHelper:
         except Exception as e:
             logger.error(event=f"Failed to report rerank metrics: {e}")
 
+    @staticmethod
+    def report_rerank_cache_metrics(hits: int, lookups: int, ctx: Context) -> None:
+        logger = ctx.get_logger()
+
+        try:
+            (trace_id, model, user_id, agent, agent_id) = (
+                RerankMetricsHelper._get_init_data(ctx)
+            )
+            metrics_data = MetricsData(
+                id=str(uuid.uuid4()),
+                message_type=MetricsMessageType.RERANK_CACHE_LOOKUP,
+                trace_id=trace_id,
+                user_id=user_id,
+                assistant_id=agent_id,
+                assistant=agent,
+                model=model,
+                timestamp=time.time(),
+                meta={
+                    "hits": hits,
+                    "misses": lookups - hits,
+                    "hit_rate": hits / lookups if lookups else 0.0,
+                },
+            )
+            signal = MetricsSignal(signal=metrics_data)
+            asyncio.create_task(report_metrics(signal, ctx))
+        except Exception as e:
+            logger.error(event=f"[Metrics] Error reporting rerank cache metrics: {e}")
+
     @staticmethod
     def _get_init_data(ctx: Context) -> tuple:
         trace_id = ctx.get_trace_id()
@@ -439,3 +467,39 @@ class RerankMetricsHelper:
         agent = ctx.get_metrics_agent()
         agent_id = agent.id if agent else ctx.get_agent_id()
         return (trace_id, model, user_id, agent, agent_id)
+
+
+class ChatHistoryMetricsHelper:
+    # DO NOT THROW EXPCEPTIONS IN THIS FUNCTION
+    @staticmethod
+    def report_history_truncation(
+        tokens_before: int,
+        tokens_after: int,
+        dropped_messages: int,
+        ctx: Context,
+    ) -> None:
+        logger = ctx.get_logger()
+
+        try:
+            agent = ctx.get_metrics_agent()
+            metrics_data = MetricsData(
+                id=str(uuid.uuid4()),
+                message_type=MetricsMessageType.CHAT_HISTORY_TRUNCATED,
+                trace_id=ctx.get_trace_id(),
+                user_id=ctx.get_user_id(),
+                assistant_id=agent.id if agent else ctx.get_agent_id(),
+                assistant=agent,
+                model=ctx.get_model(),
+                timestamp=time.time(),
+                meta={
+                    "tokens_before": tokens_before,
+                    "tokens_after": tokens_after,
+                    "tokens_saved": tokens_before - tokens_after,
+                    "dropped_messages": dropped_messages,
+                },
+            )
+            signal = MetricsSignal(signal=metrics_data)
+            # do not await, fire and forget
+            asyncio.get_running_loop().create_task(report_metrics(signal, ctx))
+        except Exception as e:
+            logger.error(event=f"[Metrics] Error reporting chat history metrics: {e}")
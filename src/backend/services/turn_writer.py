@@ -0,0 +1,100 @@
+from typing import List
+from uuid import uuid4
+
+import anyio
+from sqlalchemy import func
+
+from backend.chat.collate import to_dict
+from backend.crud import conversation as conversation_crud
+from backend.database_models.database import SessionFactory
+from backend.database_models.message import Message, MessageAgent
+from backend.database_models.tool_call import ToolCall as ToolCallModel
+from backend.schemas.tool import ToolCall
+
+
+class ChatTurnWriter:
+    """
+    Write-behind persistence of a chat turn.
+
+    Messages, tool calls, documents and citations produced while streaming are only
+    collected in memory. They are written in a single transaction once the stream is
+    over, so token delivery never waits on database round-trips, in a short-lived
+    session so no pooled connection is held while the turn streams.
+    """
+
+    def __init__(
+        self, session_factory: SessionFactory, conversation_id: str, user_id: str
+    ):
+        self.session_factory = session_factory
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.messages: List[Message] = []
+
+    def add_tool_calls_message(
+        self, tool_calls: List[ToolCall], text: str, position: int
+    ) -> Message:
+        """
+        Queue a chatbot message holding the tool calls of a step.
+
+        Args:
+            tool_calls (List[ToolCall]): List of ToolCall objects.
+            text (str): Message text, the tool plan.
+            position (int): Message position.
+
+        Returns:
+            Message: Queued message.
+        """
+        message = Message(
+            id=str(uuid4()),
+            user_id=self.user_id,
+            conversation_id=self.conversation_id,
+            text=text,
+            tool_plan=text,
+            position=position,
+            is_active=True,
+            agent=MessageAgent.CHATBOT,
+        )
+        message.tool_calls = [
+            ToolCallModel(
+                name=tool_call.name,
+                parameters=to_dict(tool_call.parameters),
+            )
+            for tool_call in tool_calls
+        ]
+        self.add_message(message)
+        return message
+
+    def add_message(self, message: Message) -> None:
+        # All rows are inserted in the same transaction, where now() is constant,
+        # use the clock time to keep the messages ordered by created_at
+        message.created_at = func.clock_timestamp()
+        self.messages.append(message)
+
+    def flush(self, description: str | None = None) -> None:
+        """
+        Write the queued messages and update the conversation description.
+
+        Args:
+            description (str): New conversation description.
+        """
+        if not self.messages and description is None:
+            return
+
+        with self.session_factory() as session:
+            conversation_crud.save_conversation_turn(
+                session,
+                self.conversation_id,
+                self.user_id,
+                self.messages,
+                description,
+            )
+        self.messages = []
+
+    async def flush_in_background(self, description: str | None = None) -> None:
+        """
+        Run flush in a worker thread so the event loop keeps serving other streams.
+
+        Args:
+            description (str): New conversation description.
+        """
+        await anyio.to_thread.run_sync(self.flush, description)
@@ -1,4 +1,5 @@
 import io
+from typing import BinaryIO
 
 from fastapi import Request
 from pypdf import PdfReader
@@ -23,21 +24,18 @@ def get_header_value(headers: list, keys: list) -> str:
     return ""
 
 
-def read_pdf(file_contents: bytes) -> str:
+def read_pdf(file_contents: bytes | BinaryIO) -> str:
     """Reads the text from a PDF file using PyPDF2
 
     Args:
-        file_contents (bytes): The file contents
+        file_contents (bytes | BinaryIO): The file contents, or a seekable stream of them
 
     Returns:
         str: The text extracted from the PDF
     """
-    pdf_reader = PdfReader(io.BytesIO(file_contents))
-    text = ""
+    if isinstance(file_contents, bytes):
+        file_contents = io.BytesIO(file_contents)
+    pdf_reader = PdfReader(file_contents)
 
     # Extract text from each page
-    for page in pdf_reader.pages:
-        page_text = page.extract_text()
-        text += page_text
-
-    return text
+    return "".join(page.extract_text() for page in pdf_reader.pages)
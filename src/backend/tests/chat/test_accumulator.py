@@ -0,0 +1,45 @@
+from backend.chat.accumulator import StreamAccumulator
+from backend.database_models.document import Document
+
+
+def test_accumulator_text() -> None:
+    accumulator = StreamAccumulator("conversation", "response")
+
+    assert accumulator.text == ""
+
+    for chunk in ["Hello", " there", "!"]:
+        accumulator.add_text(chunk)
+
+    assert accumulator.text == "Hello there!"
+    # Reading the text again after more chunks keeps the previous ones
+    accumulator.add_text(" Bye.")
+    assert accumulator.text == "Hello there! Bye."
+
+
+def test_accumulator_documents_are_unique() -> None:
+    accumulator = StreamAccumulator("conversation", "response")
+    first = Document(document_id="1", text="first")
+    second = Document(document_id="2", text="second")
+
+    accumulator.add_document("1", first)
+    accumulator.add_document("2", second)
+    accumulator.add_document("1", first)
+
+    assert accumulator.documents == [first, second]
+    assert accumulator.get_document("2") is second
+    assert accumulator.get_document("3") is None
+
+
+def test_accumulator_to_dict() -> None:
+    accumulator = StreamAccumulator("conversation", "response")
+    accumulator.generation_id = "generation"
+    accumulator.add_text("Hello")
+
+    stream_end_data = accumulator.to_dict()
+
+    assert stream_end_data["conversation_id"] == "conversation"
+    assert stream_end_data["response_id"] == "response"
+    assert stream_end_data["generation_id"] == "generation"
+    assert stream_end_data["text"] == "Hello"
+    assert stream_end_data["documents"] == []
+    assert "chat_history" not in stream_end_data
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.documents.base import Document
+
+from backend.chat.custom import custom
+from backend.chat.custom.custom import CustomChat
+from backend.config.tools import AVAILABLE_TOOLS
+from backend.schemas.context import Context
+from backend.schemas.tool import ManagedTool
+from backend.tests.model_deployments.mock_deployments import MockCohereDeployment
+from backend.tools import LangChainWikiRetriever
+
+
+class SlowTool:
+    async def call(self, parameters: dict, ctx: Any, **kwargs: Any):
+        await asyncio.sleep(parameters["delay"])
+        return {"text": parameters["text"]}
+
+
+class FailingTool:
+    async def call(self, parameters: dict, ctx: Any, **kwargs: Any):
+        raise RuntimeError("boom")
+
+
+MOCKED_TOOLS = {
+    "slow_tool": ManagedTool(name="slow_tool", implementation=SlowTool),
+    "failing_tool": ManagedTool(name="failing_tool", implementation=FailingTool),
+    "wikipedia": ManagedTool(name="wikipedia", implementation=LangChainWikiRetriever),
+}
+
+
+def get_blocking_wiki_retriever(delay: float) -> MagicMock:
+    def get_relevant_documents(query):
+        time.sleep(delay)
+        return [Document(page_content=query, metadata={})]
+
+    wiki_retriever_mock = MagicMock()
+    wiki_retriever_mock.get_relevant_documents.side_effect = get_relevant_documents
+    return wiki_retriever_mock
+
+
+async def passthrough_rerank(tool_results, model, ctx, **kwargs):
+    return tool_results
+
+
+@pytest.mark.asyncio
+async def test_call_tools_keeps_tool_call_order() -> None:
+    tool_calls = [
+        {"name": "slow_tool", "parameters": {"delay": 0.05, "text": "first"}},
+        {"name": "slow_tool", "parameters": {"delay": 0, "text": "second"}},
+    ]
+    chat_history = [{"message": "plan", "tool_calls": tool_calls}]
+
+    with patch.dict(AVAILABLE_TOOLS, MOCKED_TOOLS), patch.object(
+        custom, "rerank_and_chunk", passthrough_rerank
+    ):
+        results = await CustomChat().call_tools(
+            chat_history, MockCohereDeployment(), Context()
+        )
+
+    assert [result["outputs"][0]["text"] for result in results] == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_call_tools_isolates_errors() -> None:
+    tool_calls = [
+        {"name": "failing_tool", "parameters": {}},
+        {"name": "slow_tool", "parameters": {"delay": 0, "text": "ok"}},
+        {"name": "unknown_tool", "parameters": {}},
+    ]
+    chat_history = [{"message": "plan", "tool_calls": tool_calls}]
+
+    with patch.dict(AVAILABLE_TOOLS, MOCKED_TOOLS), patch.object(
+        custom, "rerank_and_chunk", passthrough_rerank
+    ):
+        results = await CustomChat().call_tools(
+            chat_history, MockCohereDeployment(), Context()
+        )
+
+    assert len(results) == 2
+    assert results[0]["call"]["name"] == "failing_tool"
+    assert "boom" in results[0]["outputs"][0]["text"]
+    assert results[1]["outputs"][0]["text"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_call_tools_timeout() -> None:
+    tool_calls = [{"name": "slow_tool", "parameters": {"delay": 1, "text": "late"}}]
+    chat_history = [{"message": "plan", "tool_calls": tool_calls}]
+
+    with patch.dict(AVAILABLE_TOOLS, MOCKED_TOOLS), patch.object(
+        custom, "rerank_and_chunk", passthrough_rerank
+    ), patch.object(custom, "TOOL_CALL_TIMEOUT", 0.01):
+        results = await CustomChat().call_tools(
+            chat_history, MockCohereDeployment(), Context()
+        )
+
+    assert results[0]["outputs"][0]["text"] == "Tool slow_tool timed out."
+
+
+@pytest.mark.asyncio
+async def test_call_tools_runs_blocking_tools_concurrently() -> None:
+    tool_calls = [
+        {"name": "wikipedia", "parameters": {"query": "first"}},
+        {"name": "wikipedia", "parameters": {"query": "second"}},
+    ]
+    chat_history = [{"message": "plan", "tool_calls": tool_calls}]
+
+    with patch.dict(AVAILABLE_TOOLS, MOCKED_TOOLS), patch.object(
+        custom, "rerank_and_chunk", passthrough_rerank
+    ), patch(
+        "backend.tools.lang_chain.WikipediaRetriever",
+        return_value=get_blocking_wiki_retriever(0.3),
+    ):
+        start = time.perf_counter()
+        results = await CustomChat().call_tools(
+            chat_history, MockCohereDeployment(), Context()
+        )
+        duration = time.perf_counter() - start
+
+    assert [result["outputs"][0]["text"] for result in results] == ["first", "second"]
+    assert duration < 0.5
+
+
+@pytest.mark.asyncio
+async def test_call_tools_timeout_blocking_tool() -> None:
+    tool_calls = [{"name": "wikipedia", "parameters": {"query": "late"}}]
+    chat_history = [{"message": "plan", "tool_calls": tool_calls}]
+
+    with patch.dict(AVAILABLE_TOOLS, MOCKED_TOOLS), patch.object(
+        custom, "rerank_and_chunk", passthrough_rerank
+    ), patch.object(custom, "TOOL_CALL_TIMEOUT", 0.05), patch(
+        "backend.tools.lang_chain.WikipediaRetriever",
+        return_value=get_blocking_wiki_retriever(1),
+    ):
+        start = time.perf_counter()
+        results = await CustomChat().call_tools(
+            chat_history, MockCohereDeployment(), Context()
+        )
+        duration = time.perf_counter() - start
+
+    assert results[0]["outputs"][0]["text"] == "Tool wikipedia timed out."
+    assert duration < 0.5
@@ -0,0 +1,80 @@
+from backend.chat.dedup import NearDuplicateFilter, deduplicate_tool_results
+
+EVEREST = (
+    "Mount Everest is Earth's highest mountain above sea level, located in the "
+    "Mahalangur Himal sub-range of the Himalayas on the border of Nepal and China."
+)
+EVEREST_VARIANT = (
+    "Mount Everest is Earth's highest mountain above sea level, located in the "
+    "Mahalangur Himal sub-range of the Himalayas on the border between Nepal and China."
+)
+BLOOD = (
+    "There are four components of the blood: red blood cells, white blood cells, "
+    "plasma and platelets, which all have different functions in the body."
+)
+
+
+def test_near_duplicate_filter_exact_duplicates() -> None:
+    duplicate_filter = NearDuplicateFilter()
+
+    assert not duplicate_filter.is_duplicate("Short text")
+    assert duplicate_filter.is_duplicate("short   TEXT")
+
+
+def test_near_duplicate_filter_near_duplicates() -> None:
+    duplicate_filter = NearDuplicateFilter()
+
+    assert not duplicate_filter.is_duplicate(EVEREST)
+    assert duplicate_filter.is_duplicate(EVEREST_VARIANT)
+    assert not duplicate_filter.is_duplicate(BLOOD)
+
+
+def test_deduplicate_tool_results() -> None:
+    tool_results = [
+        {
+            "call": {"name": "web_search", "parameters": {"query": "everest"}},
+            "outputs": [{"text": EVEREST}],
+        },
+        {
+            "call": {"name": "search_file", "parameters": {"search_query": "everest"}},
+            "outputs": [{"text": EVEREST_VARIANT}],
+        },
+        {
+            "call": {"name": "wikipedia", "parameters": {"query": "blood"}},
+            "outputs": [{"text": BLOOD}, {"url": "https://example.com"}],
+        },
+    ]
+
+    deduplicated = deduplicate_tool_results(tool_results)
+
+    assert [result["call"]["name"] for result in deduplicated] == [
+        "web_search",
+        "search_file",
+        "wikipedia",
+    ]
+    # The tool call keeps a result, without outputs
+    assert deduplicated[1]["outputs"] == []
+    assert deduplicated[2]["outputs"] == tool_results[2]["outputs"]
+
+
+def test_deduplicate_tool_results_keeps_outputs_of_other_tools() -> None:
+    tool_results = [
+        {
+            "call": {"name": "calculator", "parameters": {"code": "2 + 2"}},
+            "outputs": [{"text": "4"}],
+        },
+        {
+            "call": {"name": "calculator", "parameters": {"code": "2 * 2"}},
+            "outputs": [{"text": "4"}],
+        },
+        {
+            "call": {"name": "web_search", "parameters": {"query": "everest"}},
+            "outputs": [{"text": EVEREST}],
+        },
+        {
+            "call": {"name": "toolkit_python_interpreter", "parameters": {"code": ""}},
+            "outputs": [{"text": EVEREST}],
+        },
+    ]
+
+    assert deduplicate_tool_results(tool_results) == tool_results
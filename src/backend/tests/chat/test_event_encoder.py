@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from backend.chat.event_encoder import encode_chat_event
+from backend.schemas.chat import (
+    ChatResponseEvent,
+    StreamEnd,
+    StreamStart,
+    StreamTextGeneration,
+    StreamToolCallsChunk,
+)
+from backend.schemas.tool import ToolCallDelta
+
+
+def encode_legacy(stream_event) -> str:
+    return json.dumps(
+        jsonable_encoder(
+            ChatResponseEvent(event=stream_event.event_type.value, data=stream_event)
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "stream_event",
+    [
+        StreamTextGeneration(text="Hello"),
+        StreamTextGeneration(text=' "quoted"\n über 🚀'),
+        StreamTextGeneration(text=""),
+        StreamToolCallsChunk(
+            text=None,
+            tool_call_delta=ToolCallDelta(
+                name="web_search", index=0, parameters='{"query": "'
+            ),
+        ),
+        StreamToolCallsChunk(text="plan", tool_call_delta=None),
+        StreamStart(generation_id="test", conversation_id="conversation"),
+        StreamEnd(text="Hello", finish_reason="COMPLETE"),
+    ],
+)
+def test_encode_chat_event_matches_generic_encoding(stream_event) -> None:
+    assert encode_chat_event(stream_event) == encode_legacy(stream_event)
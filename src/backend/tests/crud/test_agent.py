@@ -5,6 +5,7 @@ from backend.config.deployments import ModelDeploymentName
 from backend.config.tools import ToolName
 from backend.crud import agent as agent_crud
 from backend.database_models.agent import Agent
+from backend.database_models.database import AsyncDBSession
 from backend.schemas.agent import UpdateAgentRequest
 from backend.tests.factories import get_factory
 
@@ -126,6 +127,14 @@ def test_get_agent_by_id(session, user):
     assert agent.name == "test_agent"
 
 
+@pytest.mark.asyncio
+async def test_get_agent_by_id_async_session(session, user):
+    _ = get_factory("Agent", session).create(id="1", name="test_agent", user_id=user.id)
+    agent = await AsyncDBSession(session).run(agent_crud.get_agent_by_id, "1")
+    assert agent.id == "1"
+    assert agent.name == "test_agent"
+
+
 def test_get_agent_by_name(session, user):
     _ = get_factory("Agent", session).create(id="1", name="test_agent", user_id=user.id)
     agent = agent_crud.get_agent_by_name(session, "test_agent")
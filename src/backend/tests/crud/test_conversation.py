@@ -6,6 +6,7 @@ from backend.database_models.conversation import (
     Conversation,
     ConversationFileAssociation,
 )
+from backend.database_models.message import Message, MessageAgent
 from backend.schemas.conversation import UpdateConversationRequest
 from backend.tests.factories import get_factory
 
@@ -119,6 +120,34 @@ def test_update_conversation(session, user):
     assert conversation.description == new_conversation_data.description
 
 
+def test_save_conversation_turn(session, user):
+    conversation = get_factory("Conversation", session).create(
+        user_id=user.id, description="Old description"
+    )
+    messages = [
+        Message(
+            conversation_id=conversation.id,
+            user_id=user.id,
+            text=text,
+            position=1,
+            is_active=True,
+            agent=MessageAgent.CHATBOT,
+        )
+        for text in ["Tool plan", "Final answer"]
+    ]
+
+    conversation_crud.save_conversation_turn(
+        session, conversation.id, user.id, messages, "Final answer"
+    )
+
+    conversation = conversation_crud.get_conversation(session, conversation.id, user.id)
+    assert conversation.description == "Final answer"
+    assert {message.text for message in conversation.messages} == {
+        "Tool plan",
+        "Final answer",
+    }
+
+
 def test_delete_conversation(session, user):
     conversation = get_factory("Conversation", session).create(user_id=user.id)
 
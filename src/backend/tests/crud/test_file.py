@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import inspect
 
 from backend.crud import file as file_crud
 from backend.database_models.file import File
@@ -135,3 +136,28 @@ def test_delete_file(session, user):
 
     file_crud.delete_file(session, file.id, user.id)
     assert file_crud.get_file(session, file.id, user.id) is None
+
+
+def test_get_files_by_ids_defers_file_content(session, user):
+    file = get_factory("File", session).create(
+        file_name="test.txt", file_content="content", user_id=user.id
+    )
+    session.expire_all()
+
+    files = file_crud.get_files_by_ids(session, [file.id], user.id)
+    assert "file_content" in inspect(files[0]).unloaded
+    assert files[0].file_content == "content"
+
+    session.expire_all()
+
+    files = file_crud.get_files_by_ids(session, [file.id], user.id, load_content=True)
+    assert "file_content" not in inspect(files[0]).unloaded
+
+
+def test_get_total_file_size(session, user):
+    get_factory("File", session).create(file_size=100, user_id=user.id)
+    get_factory("File", session).create(file_size=250, user_id=user.id)
+    get_factory("File", session).create(file_size=1000, user_id="another_user")
+
+    assert file_crud.get_total_file_size(session, user.id) == 350
+    assert file_crud.get_total_file_size(session, "no_files_user") == 0
@@ -0,0 +1,69 @@
+from backend.model_deployments.lexical_rerank import bm25_scores, lexical_rerank
+
+
+def test_bm25_scores_favors_documents_matching_more_query_terms() -> None:
+    documents = [
+        "the mountain is high",
+        "the river is long",
+        "Mount Everest is the highest mountain of the world",
+    ]
+
+    scores = bm25_scores("Everest mountain", documents)
+
+    assert scores[2] > scores[0] > scores[1]
+    assert scores[1] == 0
+    assert all(0 <= score < 1 for score in scores)
+
+
+def test_bm25_scores_do_not_depend_on_other_documents() -> None:
+    documents = ["python basics for beginners", "python basics and advanced python"]
+
+    scores = bm25_scores("python basics", documents)
+
+    assert bm25_scores("python basics", documents[:1])[0] == scores[0]
+    assert bm25_scores("python basics", documents[1:])[0] == scores[1]
+
+
+
+def test_bm25_scores_ignore_query_stopwords() -> None:
+    documents = [
+        "it is one of the best of them and what they are",
+        "Paris is the capital of France",
+    ]
+
+    scores = bm25_scores("what is the capital of France", documents)
+
+    assert scores[0] == 0
+    assert scores[1] > 0.1
+
+
+def test_bm25_scores_query_of_stopwords_only() -> None:
+    scores = bm25_scores("to be or not to be", ["to be", "cats"])
+
+    assert scores[0] > 0
+    assert scores[1] == 0
+
+def test_bm25_scores_without_query_terms() -> None:
+    assert list(bm25_scores("", ["some text"])) == [0.0]
+    assert list(bm25_scores("query", [])) == []
+
+
+def test_lexical_rerank_returns_sorted_normalized_results() -> None:
+    documents = [
+        {"text": "blood has red and white cells"},
+        {"text": "Mount Everest is the highest mountain"},
+        "mountain bikes",
+    ]
+
+    response = lexical_rerank("highest mountain", documents)
+
+    results = response["results"]
+    assert [r["index"] for r in results] == [1, 2, 0]
+    assert 0 < results[1]["relevance_score"] < results[0]["relevance_score"] < 1.0
+    assert results[2]["relevance_score"] == 0.0
+
+
+def test_lexical_rerank_top_n() -> None:
+    response = lexical_rerank("apple", ["apple", "pear", "apple pie"], top_n=2)
+
+    assert [r["index"] for r in response["results"]] == [0, 2]
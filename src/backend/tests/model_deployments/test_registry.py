@@ -0,0 +1,74 @@
+from backend.model_deployments.registry import DeploymentRegistry
+from backend.schemas.context import Context
+from backend.schemas.deployment import Deployment
+from backend.tests.model_deployments.mock_deployments import (
+    MockCohereDeployment,
+    MockSageMakerDeployment,
+)
+
+
+def get_mock_deployment(id: str, deployment_class=MockCohereDeployment) -> Deployment:
+    return Deployment(
+        id=id,
+        name=id,
+        models=deployment_class.list_models(),
+        is_available=True,
+        deployment_class=deployment_class,
+        env_vars=["COHERE_API_KEY"],
+    )
+
+
+def test_registry_reuses_instances() -> None:
+    registry = DeploymentRegistry()
+    deployment = get_mock_deployment("cohere_platform")
+    ctx = Context()
+
+    first = registry.get(deployment, ctx)
+    second = registry.get(deployment, ctx)
+
+    assert first is second
+    assert len(registry) == 1
+
+
+def test_registry_keys_on_deployment_config() -> None:
+    registry = DeploymentRegistry()
+    deployment = get_mock_deployment("cohere_platform")
+    ctx = Context()
+    ctx.deployment_config = {"COHERE_API_KEY": "key-1", "UNRELATED": "value"}
+    other_ctx = Context()
+    other_ctx.deployment_config = {"COHERE_API_KEY": "key-2"}
+
+    first = registry.get(deployment, ctx)
+    second = registry.get(deployment, other_ctx)
+
+    assert first is not second
+    assert len(registry) == 2
+
+
+def test_registry_keys_on_deployment_class() -> None:
+    registry = DeploymentRegistry()
+    ctx = Context()
+
+    first = registry.get(get_mock_deployment("test"), ctx)
+    second = registry.get(get_mock_deployment("test", MockSageMakerDeployment), ctx)
+
+    assert isinstance(first, MockCohereDeployment)
+    assert isinstance(second, MockSageMakerDeployment)
+
+
+def test_registry_evicts_least_recently_used() -> None:
+    registry = DeploymentRegistry(max_size=2)
+    ctx = Context()
+    first_deployment = get_mock_deployment("first")
+    second_deployment = get_mock_deployment("second")
+    third_deployment = get_mock_deployment("third")
+
+    first = registry.get(first_deployment, ctx)
+    registry.get(second_deployment, ctx)
+    # Use the first deployment again so the second one is evicted
+    registry.get(first_deployment, ctx)
+    registry.get(third_deployment, ctx)
+
+    assert len(registry) == 2
+    assert registry.get(first_deployment, ctx) is first
+    assert len(registry) == 2
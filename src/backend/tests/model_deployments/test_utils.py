@@ -0,0 +1,27 @@
+import pytest
+
+from backend.model_deployments.utils import iterate_sdk_stream, run_sdk_call
+
+
+@pytest.mark.asyncio
+async def test_run_sdk_call() -> None:
+    result = await run_sdk_call(lambda a, b=0: a + b, 1, b=2)
+
+    assert result == 3
+
+
+@pytest.mark.asyncio
+async def test_iterate_sdk_stream() -> None:
+    def blocking_stream():
+        yield from ["a", "b", "c"]
+
+    items = [item async for item in iterate_sdk_stream(blocking_stream())]
+
+    assert items == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_iterate_sdk_stream_empty() -> None:
+    items = [item async for item in iterate_sdk_stream([])]
+
+    assert items == []
@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+import pytest
+
+from backend.chat.enums import StreamEvent
+from backend.crud import conversation as conversation_crud
+from backend.database_models.database import AsyncDBSession, get_session_factory
+from backend.schemas.cohere_chat import CohereChatRequest
+from backend.schemas.context import Context
+from backend.services.chat import generate_chat_events, process_chat
+
+
+async def stream_with_citations():
+    events = [
+        {"event_type": StreamEvent.STREAM_START, "generation_id": "generation"},
+        {
+            "event_type": StreamEvent.SEARCH_RESULTS,
+            "documents": [
+                {"id": "doc-1", "text": "Paris", "title": "France", "url": ""}
+            ],
+        },
+        {"event_type": StreamEvent.TEXT_GENERATION, "text": "Paris"},
+        {
+            "event_type": StreamEvent.CITATION_GENERATION,
+            "citations": [
+                {"text": "Paris", "start": 0, "end": 5, "document_ids": ["doc-1"]}
+            ],
+        },
+        {"event_type": StreamEvent.STREAM_END, "finish_reason": "COMPLETE"},
+    ]
+    for event in events:
+        yield event
+
+
+@pytest.mark.asyncio
+async def test_response_message_outlives_request_session(session, user):
+    user_id = user.id
+    ctx = Context()
+    ctx.with_user_id(user_id)
+    ctx.set_request(None)
+    chat_request = CohereChatRequest(message="What is the capital of France?")
+    session_factory = get_session_factory(session)
+
+    with patch("backend.schemas.context.get_deployment_config", return_value={}):
+        (
+            _,
+            chat_request,
+            _,
+            response_message,
+            should_store,
+            _,
+            next_message_position,
+            ctx,
+        ) = await process_chat(AsyncDBSession(session), chat_request, None, ctx)
+
+    # The request session is closed before the response streams
+    session.close()
+
+    events = [
+        event
+        async for event in generate_chat_events(
+            session_factory,
+            stream_with_citations(),
+            response_message,
+            should_store,
+            ctx,
+            next_message_position=next_message_position,
+        )
+    ]
+
+    assert events[-1].text == "Paris"
+    assert [document.document_id for document in events[-1].documents] == ["doc-1"]
+
+    conversation = conversation_crud.get_conversation(
+        session, ctx.get_conversation_id(), user_id
+    )
+    assert conversation.description == "Paris"
+    message = next(
+        message for message in conversation.messages if message.text == "Paris"
+    )
+    assert message.id == response_message.id
+    assert [document.message_id for document in message.documents] == [message.id]
+    assert len(message.citations) == 1
@@ -0,0 +1,263 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from backend.schemas.chat import ChatMessage, ChatRole
+from backend.schemas.context import Context
+from backend.schemas.metrics import MetricsMessageType
+from backend.services import chat_history as chat_history_service
+from backend.services.chat_history import (
+    SUMMARY_HEADER,
+    ChatHistoryCache,
+    compact_chat_history,
+    get_chat_history,
+    get_chat_history_cache,
+    get_next_message_position,
+    truncate_chat_history,
+)
+from backend.tests.factories import get_factory
+
+
+@pytest.fixture(autouse=True)
+def clear_chat_history_cache():
+    get_chat_history_cache().clear()
+    yield
+    get_chat_history_cache().clear()
+
+
+@pytest.fixture
+def conversation(session, user):
+    conversation = get_factory("Conversation", session).create(user_id=user.id)
+    for position, agent in enumerate(["USER", "CHATBOT", "USER", "CHATBOT"]):
+        get_factory("Message", session).create(
+            conversation_id=conversation.id,
+            user_id=user.id,
+            text=f"Message {position}",
+            position=position,
+            is_active=True,
+            agent=agent,
+        )
+    # Inactive messages are ignored
+    get_factory("Message", session).create(
+        conversation_id=conversation.id,
+        user_id=user.id,
+        text="Inactive message",
+        position=10,
+        is_active=False,
+        agent="USER",
+    )
+    return conversation
+
+
+def test_get_next_message_position(session, user, conversation):
+    assert get_next_message_position(session, conversation.id, user.id) == 4
+
+
+def test_get_next_message_position_empty_conversation(session, user):
+    conversation = get_factory("Conversation", session).create(user_id=user.id)
+
+    assert get_next_message_position(session, conversation.id, user.id) == 0
+
+
+def test_get_chat_history(session, user, conversation):
+    chat_history = get_chat_history(session, conversation.id, user.id, 3)
+
+    assert [message.message for message in chat_history] == [
+        "Message 0",
+        "Message 1",
+        "Message 2",
+    ]
+    assert [message.role for message in chat_history] == [
+        ChatRole.USER,
+        ChatRole.CHATBOT,
+        ChatRole.USER,
+    ]
+
+
+def test_get_chat_history_window(session, user, conversation):
+    chat_history = get_chat_history(
+        session, conversation.id, user.id, 4, max_messages=2
+    )
+
+    assert [message.message for message in chat_history] == [
+        "Message 2",
+        "Message 3",
+    ]
+
+
+def test_get_chat_history_uses_cache(session, user, conversation):
+    chat_history = get_chat_history(session, conversation.id, user.id, 4)
+    chat_history.append("Extended by the caller")
+
+    cached_chat_history = get_chat_history(session, conversation.id, user.id, 4)
+
+    assert len(get_chat_history_cache()) == 1
+    assert len(cached_chat_history) == 4
+
+
+def test_get_chat_history_new_message_invalidates_cache(session, user, conversation):
+    get_chat_history(session, conversation.id, user.id, 5)
+    get_factory("Message", session).create(
+        conversation_id=conversation.id,
+        user_id=user.id,
+        text="Message 4",
+        position=4,
+        is_active=True,
+        agent="USER",
+    )
+
+    chat_history = get_chat_history(session, conversation.id, user.id, 5)
+
+    assert chat_history[-1].message == "Message 4"
+
+
+def test_chat_history_cache_evicts_least_recently_used():
+    cache = ChatHistoryCache(max_size=2)
+    cache.put(("a",), [])
+    cache.put(("b",), [])
+    cache.get(("a",))
+    cache.put(("c",), [])
+
+    assert cache.get(("a",)) == []
+    assert cache.get(("b",)) is None
+    assert len(cache) == 2
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def make_history(turns: int) -> list[ChatMessage]:
+    chat_history = []
+    for turn in range(turns):
+        chat_history.append(
+            ChatMessage(role=ChatRole.USER, message=f"question number {turn}")
+        )
+        chat_history.append(
+            ChatMessage(role=ChatRole.CHATBOT, message=f"answer number {turn}")
+        )
+    return chat_history
+
+
+def test_truncate_chat_history_within_budget():
+    chat_history = make_history(2)
+
+    truncated, tokens_before, tokens_after = truncate_chat_history(
+        chat_history, 1000, count_words
+    )
+
+    assert truncated == chat_history
+    assert tokens_before == tokens_after
+
+
+def test_truncate_chat_history_keeps_newest_turns():
+    chat_history = make_history(5)
+    # Each message is 3 words plus the message overhead, each turn is 14 tokens
+    truncated, tokens_before, tokens_after = truncate_chat_history(
+        chat_history, 30, count_words
+    )
+
+    assert [message.message for message in truncated] == [
+        "question number 3",
+        "answer number 3",
+        "question number 4",
+        "answer number 4",
+    ]
+    assert tokens_before == 70
+    assert tokens_after == 28
+
+
+def test_truncate_chat_history_summarizes_dropped_turns():
+    chat_history = make_history(10)
+
+    truncated, _, tokens_after = truncate_chat_history(
+        chat_history, 130, count_words, summarize=True
+    )
+
+    summary = truncated[0]
+    assert summary.role == ChatRole.SYSTEM
+    assert summary.message.startswith(SUMMARY_HEADER)
+    assert "answer number 1" in summary.message
+    assert "question number 0" not in summary.message
+    assert truncated[1].message == "question number 2"
+    assert tokens_after <= 130
+
+
+@pytest.mark.asyncio
+async def test_compact_chat_history_reports_truncation(monkeypatch):
+    monkeypatch.setattr(
+        chat_history_service, "get_history_token_budget", lambda model: 30
+    )
+    monkeypatch.setitem(chat_history_service.token_counters, "test-model", count_words)
+    ctx = Context().with_model("test-model")
+    chat_history = make_history(5)
+
+    with patch(
+        "backend.services.metrics.report_metrics",
+        return_value=None,
+    ) as mock_metrics:
+        compacted_history = compact_chat_history(chat_history, ctx)
+
+    m_args = mock_metrics.call_args.args[0].signal
+    assert m_args.message_type == MetricsMessageType.CHAT_HISTORY_TRUNCATED
+    assert m_args.model == "test-model"
+    assert m_args.meta["tokens_before"] == 70
+    assert m_args.meta["tokens_saved"] == 70 - m_args.meta["tokens_after"]
+    assert m_args.meta["dropped_messages"] == 6
+    assert compacted_history[-1] == chat_history[-1]
+
+
+@pytest.mark.asyncio
+async def test_compact_chat_history_within_budget_reports_nothing(monkeypatch):
+    monkeypatch.setattr(
+        chat_history_service, "get_history_token_budget", lambda model: 1000
+    )
+    chat_history = make_history(2)
+
+    with patch(
+        "backend.services.metrics.report_metrics",
+        return_value=None,
+    ) as mock_metrics:
+        compacted_history = compact_chat_history(chat_history, Context())
+
+    assert compacted_history == chat_history
+    mock_metrics.assert_not_called()
+
+
+def get_message_at(conversation, position):
+    return next(
+        message
+        for message in conversation.text_messages
+        if message.position == position
+    )
+
+
+def test_get_chat_history_deactivated_message_invalidates_cache(
+    session, user, conversation
+):
+    get_chat_history(session, conversation.id, user.id, 4)
+    message = get_message_at(conversation, 1)
+    message.is_active = False
+    session.commit()
+
+    chat_history = get_chat_history(session, conversation.id, user.id, 4)
+
+    assert [message.message for message in chat_history] == [
+        "Message 0",
+        "Message 2",
+        "Message 3",
+    ]
+
+
+def test_get_chat_history_edited_message_invalidates_cache(session, user, conversation):
+    get_chat_history(session, conversation.id, user.id, 4)
+    message = get_message_at(conversation, 0)
+    message.text = "Edited message"
+    # now() is constant in the test transaction, an edit happens in a later one
+    message.updated_at = message.updated_at + timedelta(seconds=1)
+    session.commit()
+
+    chat_history = get_chat_history(session, conversation.id, user.id, 4)
+
+    assert chat_history[0].message == "Edited message"
@@ -0,0 +1,71 @@
+import io
+
+import pytest
+from docx import Document
+from fastapi import HTTPException
+from fastapi import UploadFile as FastAPIUploadFile
+
+from backend.chat.collate import chunk
+from backend.services.file import (
+    get_file_metadata,
+    read_docx,
+    read_text,
+    spool_upload_file,
+)
+
+
+def test_read_docx_matches_python_docx_paragraphs() -> None:
+    document = Document()
+    document.add_paragraph("Hello\tworld")
+    paragraph = document.add_paragraph("Line one")
+    paragraph.add_run().add_break()
+    paragraph.add_run("after the break")
+    document.add_table(rows=1, cols=1).cell(0, 0).text = "table text"
+    document.add_paragraph("")
+    document.add_paragraph("last paragraph")
+    docx_bytes = io.BytesIO()
+    document.save(docx_bytes)
+
+    expected = "".join(
+        p.text + "\n" for p in Document(io.BytesIO(docx_bytes.getvalue())).paragraphs
+    )
+
+    docx_bytes.seek(0)
+    assert read_docx(docx_bytes) == expected
+
+
+def test_read_text_decodes_multibyte_characters_across_chunks() -> None:
+    text = "é" * 2_000_000
+
+    assert read_text(io.BytesIO(text.encode("utf-8"))) == text
+
+
+@pytest.mark.asyncio
+async def test_spool_upload_file() -> None:
+    upload = FastAPIUploadFile(io.BytesIO(b"file contents"), filename="file.txt")
+
+    with await spool_upload_file(upload) as stream:
+        assert stream.read() == b"file contents"
+
+
+@pytest.mark.asyncio
+async def test_spool_upload_file_too_large() -> None:
+    upload = FastAPIUploadFile(io.BytesIO(b"x" * 100), filename="file.txt")
+
+    with pytest.raises(HTTPException) as e:
+        await spool_upload_file(upload, max_size=10)
+
+    assert e.value.status_code == 400
+
+
+def test_get_file_metadata() -> None:
+    content = " ".join(f"word{i}." for i in range(250))
+
+    metadata = get_file_metadata(content)
+
+    assert metadata["word_count"] == 250
+    assert metadata["preview"] == " ".join(f"word{i}." for i in range(25))
+    assert metadata["token_count"] == (len(content) + 3) // 4
+    assert [content[start:end] for start, end in metadata["chunk_spans"]] == chunk(
+        content
+    )
@@ -0,0 +1,40 @@
+from backend.chat.collate import chunk_spans
+from backend.services.file_index import build_file_index, search_file_indexes
+
+
+def test_build_file_index() -> None:
+    content = "the cat sat. the dog ran."
+    spans = [(0, 12), (13, 25)]
+
+    index = build_file_index(content, spans)
+
+    assert index["lengths"] == [3, 3]
+    assert index["postings"]["the"] == [0, 1, 1, 1]
+    assert index["postings"]["cat"] == [0, 1]
+    assert index["postings"]["dog"] == [1, 1]
+
+
+def test_search_file_indexes_ranks_chunks_across_files() -> None:
+    everest = "Mount Everest is the highest mountain. " * 30
+    trench = "The Mariana Trench is the deepest trench. " * 30
+    contents = [everest + trench, trench]
+    indexes = [
+        build_file_index(content, chunk_spans(content, 10, 20)) for content in contents
+    ]
+
+    results = search_file_indexes("deepest trench", indexes, top_n=3)
+
+    assert len(results) == 3
+    assert [score for _, _, score in results] == sorted(
+        [score for _, _, score in results], reverse=True
+    )
+    for file_index, chunk_index, _ in results:
+        start, end = chunk_spans(contents[file_index], 10, 20)[chunk_index]
+        assert "Trench" in contents[file_index][start:end]
+
+
+def test_search_file_indexes_without_matches() -> None:
+    index = build_file_index("some text", [(0, 9)])
+
+    assert search_file_indexes("unrelated", [index], top_n=5) == []
+    assert search_file_indexes("text", [], top_n=5) == []
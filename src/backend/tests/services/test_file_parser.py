@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import io
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import UploadFile as FastAPIUploadFile
+
+from backend.services import file_parser, file_store
+from backend.services.file_parser import ParseCache, get_parse_cache, parse_upload_file
+from backend.services.file_store import FileContentStore, LocalBlobBackend
+
+
+def test_parse_cache_evicts_least_recently_used_contents() -> None:
+    cache = ParseCache(max_characters=10)
+
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.get("a")
+    cache.put("c", "cccc")
+
+    assert cache.get("a") == "aaaa"
+    assert cache.get("b") is None
+    assert cache.get("c") == "cccc"
+
+
+def test_parse_cache_skips_contents_larger_than_the_cache() -> None:
+    cache = ParseCache(max_characters=10)
+
+    cache.put("a", "a" * 11)
+
+    assert len(cache) == 0
+
+
+@pytest.fixture(autouse=True)
+def file_content_store(tmp_path, monkeypatch):
+    store = FileContentStore(LocalBlobBackend(str(tmp_path)))
+    monkeypatch.setattr(file_store, "file_content_store", store)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_parse_upload_file_caches_parsed_content() -> None:
+    get_parse_cache().clear()
+    upload = FastAPIUploadFile(io.BytesIO(b"some text"), filename="file.txt")
+    content_hash = hashlib.sha256(b"some text").hexdigest()
+
+    assert await parse_upload_file(upload) == ("some text", content_hash)
+    assert len(get_parse_cache()) == 1
+
+    reupload = FastAPIUploadFile(io.BytesIO(b"some text"), filename="copy.txt")
+    assert await parse_upload_file(reupload) == ("some text", content_hash)
+    assert len(get_parse_cache()) == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_upload_file_reads_stored_content(file_content_store) -> None:
+    get_parse_cache().clear()
+    content_hash = hashlib.sha256(b"raw bytes").hexdigest()
+    file_content_store.put_text(content_hash, "stored text")
+    upload = FastAPIUploadFile(io.BytesIO(b"raw bytes"), filename="file.txt")
+
+    assert await parse_upload_file(upload) == ("stored text", content_hash)
+
+
+@pytest.mark.asyncio
+async def test_parse_upload_file_unsupported_extension() -> None:
+    upload = FastAPIUploadFile(io.BytesIO(b"data"), filename="file.exe")
+
+    with pytest.raises(ValueError):
+        await parse_upload_file(upload)
+
+
+def parse_or_hang(path: str, file_extension: str) -> str:
+    with open(path, "rb") as stream:
+        text = stream.read().decode()
+    if text == "hang":
+        time.sleep(60)
+    return text
+
+
+@pytest.mark.asyncio
+async def test_parse_upload_file_timeout_only_stops_its_parse(monkeypatch) -> None:
+    get_parse_cache().clear()
+    monkeypatch.setattr(file_parser, "parse_file_path", parse_or_hang)
+    monkeypatch.setattr(file_parser, "parse_slots", None)
+    monkeypatch.setattr(
+        file_parser,
+        "Settings",
+        lambda: SimpleNamespace(
+            files=SimpleNamespace(parse_workers=2, parse_timeout=1),
+            redis=SimpleNamespace(url=None),
+        ),
+    )
+    hanging_upload = FastAPIUploadFile(io.BytesIO(b"hang"), filename="hang.txt")
+    upload = FastAPIUploadFile(io.BytesIO(b"some text"), filename="file.txt")
+
+    started = time.monotonic()
+    results = await asyncio.gather(
+        parse_upload_file(hanging_upload),
+        parse_upload_file(upload),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], ValueError)
+    assert "timed out" in str(results[0])
+    assert results[1] == ("some text", hashlib.sha256(b"some text").hexdigest())
+    assert time.monotonic() - started < 10
+    # The hanging parse process is killed
+    assert not file_parser.parse_processes
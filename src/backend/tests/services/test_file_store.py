@@ -0,0 +1,66 @@
+import pytest
+
+from backend.database_models.file import File
+from backend.services import file_store
+from backend.services.file_store import (
+    FileContentStore,
+    LocalBlobBackend,
+    collect_file_contents,
+    get_file_text,
+)
+from backend.tests.factories import get_factory
+
+
+@pytest.fixture(autouse=True)
+def file_content_store(tmp_path, monkeypatch):
+    store = FileContentStore(LocalBlobBackend(str(tmp_path)))
+    monkeypatch.setattr(file_store, "file_content_store", store)
+    return store
+
+
+def test_local_blob_backend(tmp_path) -> None:
+    backend = LocalBlobBackend(str(tmp_path))
+
+    assert backend.get("abcdef") is None
+    backend.put("abcdef", b"data")
+    assert backend.get("abcdef") == b"data"
+    assert (tmp_path / "ab" / "abcdef").exists()
+
+    backend.delete("abcdef")
+    backend.delete("abcdef")
+    assert backend.get("abcdef") is None
+
+
+def test_file_content_store_compresses_text(file_content_store) -> None:
+    text = "Mount Everest is the highest mountain. " * 1000
+
+    file_content_store.put_text("hash", text)
+
+    assert len(file_content_store.backend.get("hash")) < len(text) / 10
+    assert file_content_store.get_text("hash") == text
+    assert file_content_store.get_text("missing") is None
+
+
+def test_get_file_text(file_content_store) -> None:
+    file_content_store.put_text("hash", "stored text")
+
+    assert get_file_text(File(content_hash="hash", file_content="")) == "stored text"
+    assert get_file_text(File(file_content="inline text")) == "inline text"
+
+
+def test_get_file_text_missing_content() -> None:
+    with pytest.raises(FileNotFoundError):
+        get_file_text(File(content_hash="missing", file_content=""))
+
+
+def test_collect_file_contents_keeps_referenced_contents(
+    session, user, file_content_store
+) -> None:
+    file_content_store.put_text("shared", "shared text")
+    file_content_store.put_text("unused", "unused text")
+    get_factory("File", session).create(content_hash="shared", user_id=user.id)
+
+    collect_file_contents(session, ["shared", "unused", None])
+
+    assert file_content_store.get_text("shared") == "shared text"
+    assert file_content_store.get_text("unused") is None
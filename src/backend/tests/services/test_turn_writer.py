@@ -0,0 +1,33 @@
+from backend.crud import conversation as conversation_crud
+from backend.database_models.database import get_session_factory
+from backend.database_models.message import Message, MessageAgent
+from backend.services.turn_writer import ChatTurnWriter
+from backend.tests.factories import get_factory
+
+
+def test_flush_writes_turn_in_short_lived_session(session, user):
+    conversation = get_factory("Conversation", session).create(
+        user_id=user.id, description="Old description"
+    )
+    session_factory = get_session_factory(session)
+    writer = ChatTurnWriter(session_factory, conversation.id, user.id)
+    message = Message(
+        conversation_id=conversation.id,
+        user_id=user.id,
+        text="Final answer",
+        position=1,
+        is_active=True,
+        agent=MessageAgent.CHATBOT,
+    )
+    writer.add_message(message)
+
+    writer.flush("Final answer")
+
+    # Attributes stay readable once the short-lived session is closed
+    assert message.text == "Final answer"
+    assert writer.messages == []
+
+    session.expire_all()
+    conversation = conversation_crud.get_conversation(session, conversation.id, user.id)
+    assert conversation.description == "Final answer"
+    assert [message.text for message in conversation.messages] == ["Final answer"]
@@ -1,9 +1,18 @@
+import json
 import os
+from datetime import datetime
+from unittest.mock import patch
 
 import pytest
+from cohere.types import StreamedChatResponse_TextGeneration
 
 from backend.chat import collate
+from backend.chat.chunk_cache import get_chunk_cache
+from backend.chat.enums import StreamEvent
+from backend.chat.rerank_cache import RerankCache, get_rerank_cache
 from backend.model_deployments import CohereDeployment
+from backend.schemas.context import Context
+from backend.schemas.metrics import MetricsMessageType
 from backend.schemas.tool import ToolCall
 
 is_cohere_env_set = (
@@ -77,6 +86,190 @@ async def test_rerank() -> None:
     assert await collate.rerank_and_chunk(tool_results, model) == expected_output
 
 
+@pytest.fixture(autouse=True)
+def clear_rerank_cache():
+    get_rerank_cache().clear()
+    yield
+    get_rerank_cache().clear()
+
+
+class KeywordRerankDeployment:
+    """Scores documents by whether they contain the query."""
+
+    rerank_enabled = True
+
+    def __init__(self, rerank_model_id: str | None = "keyword"):
+        self.rerank_model_id = rerank_model_id
+        self.calls = []
+
+    async def invoke_rerank(self, query, documents, ctx, **kwargs):
+        self.calls.append((query, len(documents)))
+        return {
+            "results": [
+                {
+                    "index": index,
+                    "relevance_score": 0.9 if query in document["text"] else 0.05,
+                }
+                for index, document in enumerate(documents)
+            ]
+        }
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_chunk_shares_rerank_between_identical_queries() -> None:
+    model = KeywordRerankDeployment()
+    tool_results = [
+        {
+            "call": {"name": "retriever", "parameters": {"query": "apple"}},
+            "outputs": [{"text": "pear"}, {"text": "apple"}],
+        },
+        {
+            "call": {"name": "web_search", "parameters": {"query": "apple"}},
+            "outputs": [{"text": "apple pie"}],
+        },
+        {
+            "call": {"name": "retriever", "parameters": {"query": "pear"}},
+            "outputs": [{"text": "apple"}, {"text": "pear"}],
+        },
+    ]
+
+    results = await collate.rerank_and_chunk(tool_results, model, Context())
+
+    assert sorted(model.calls) == [("apple", 3), ("pear", 2)]
+    assert results == [
+        {"call": tool_results[0]["call"], "outputs": [{"text": "apple"}]},
+        {"call": tool_results[1]["call"], "outputs": [{"text": "apple pie"}]},
+        {"call": tool_results[2]["call"], "outputs": [{"text": "pear"}]},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_chunk_drops_chunks_without_relevant_chunk() -> None:
+    model = KeywordRerankDeployment()
+    tool_results = [
+        {
+            "call": {"name": "retriever", "parameters": {"query": "plum"}},
+            "outputs": [{"text": "pear"}, {"text": "apple"}, {"text": "cherry"}],
+        }
+    ]
+
+    results = await collate.rerank_and_chunk(tool_results, model, Context())
+
+    assert results[0]["outputs"] == []
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_chunk_batches_large_document_sets(monkeypatch) -> None:
+    monkeypatch.setattr(collate, "MAX_RERANK_BATCH_SIZE", 2)
+    model = KeywordRerankDeployment()
+    outputs = [{"text": f"other {i}"} for i in range(4)] + [{"text": "apple"}]
+    tool_results = [
+        {
+            "call": {"name": "retriever", "parameters": {"query": "apple"}},
+            "outputs": outputs,
+        }
+    ]
+
+    results = await collate.rerank_and_chunk(tool_results, model, Context())
+
+    assert model.calls == [("apple", 2), ("apple", 2), ("apple", 1)]
+    assert results[0]["outputs"] == [{"text": "apple"}]
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_chunk_only_reranks_uncached_documents() -> None:
+    model = KeywordRerankDeployment()
+    tool_results = [
+        {
+            "call": {"name": "retriever", "parameters": {"query": "apple"}},
+            "outputs": [{"text": "pear"}, {"text": "apple"}],
+        }
+    ]
+    await collate.rerank_and_chunk(tool_results, model, Context())
+    tool_results[0]["outputs"].append({"text": "apple tart"})
+
+    results = await collate.rerank_and_chunk(tool_results, model, Context())
+
+    assert model.calls == [("apple", 2), ("apple", 1)]
+    assert results[0]["outputs"] == [{"text": "apple"}, {"text": "apple tart"}]
+    assert get_rerank_cache().hits == 2
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_chunk_caches_scores_per_rerank_model_id() -> None:
+    tool_results = [
+        {
+            "call": {"name": "retriever", "parameters": {"query": "apple"}},
+            "outputs": [{"text": "pear"}, {"text": "apple"}],
+        }
+    ]
+    model = KeywordRerankDeployment("keyword")
+    other_model = KeywordRerankDeployment("other keyword")
+    await collate.rerank_and_chunk(tool_results, model, Context())
+
+    await collate.rerank_and_chunk(tool_results, other_model, Context())
+    await collate.rerank_and_chunk(tool_results, model, Context())
+
+    assert model.calls == [("apple", 2)]
+    assert other_model.calls == [("apple", 2)]
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_chunk_without_rerank_model_id_does_not_cache() -> None:
+    tool_results = [
+        {
+            "call": {"name": "retriever", "parameters": {"query": "apple"}},
+            "outputs": [{"text": "pear"}, {"text": "apple"}],
+        }
+    ]
+    model = KeywordRerankDeployment(None)
+
+    await collate.rerank_and_chunk(tool_results, model, Context())
+    results = await collate.rerank_and_chunk(tool_results, model, Context())
+
+    assert model.calls == [("apple", 2), ("apple", 2)]
+    assert results[0]["outputs"] == [{"text": "apple"}]
+    assert get_rerank_cache().hits == 0
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_chunk_reports_rerank_cache_lookups() -> None:
+    model = KeywordRerankDeployment()
+    tool_results = [
+        {
+            "call": {"name": "retriever", "parameters": {"query": "apple"}},
+            "outputs": [{"text": "pear"}, {"text": "apple"}],
+        }
+    ]
+    await collate.rerank_and_chunk(tool_results, model, Context())
+    tool_results[0]["outputs"].append({"text": "apple tart"})
+
+    with patch(
+        "backend.services.metrics.report_metrics",
+        return_value=None,
+    ) as mock_metrics:
+        await collate.rerank_and_chunk(tool_results, model, Context())
+
+    signals = [
+        call.args[0].signal
+        for call in mock_metrics.call_args_list
+        if call.args[0].signal.message_type == MetricsMessageType.RERANK_CACHE_LOOKUP
+    ]
+    assert len(signals) == 1
+    assert signals[0].meta == {"hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+def test_rerank_cache_key_normalizes_query_whitespace() -> None:
+    document = {"text": "apple"}
+
+    assert RerankCache.get_key("model", " apple  pie", document) == RerankCache.get_key(
+        "model", "apple pie", document
+    )
+    assert RerankCache.get_key("model", "apple", document) != RerankCache.get_key(
+        "other-model", "apple", document
+    )
+
+
 def test_chunk_normal_mode() -> None:
     content = "This is a test. We are testing the chunk function."
     expected_output = ["This is a test.", "We are testing the chunk function."]
@@ -111,3 +304,62 @@ def test_chunk_empty_content() -> None:
     content = ""
     expected_output = []
     collate.chunk(content, False, 4, 10) == expected_output
+
+
+def test_chunk_spans_are_offsets_in_content() -> None:
+    content = "First sentence here.  Second one\nis longer than that. Tail"
+
+    spans = collate.chunk_spans(content, 2, 10)
+
+    assert [content[start:end] for start, end in spans] == [
+        "First sentence here.",
+        "Second one\nis longer than that.",
+        "Tail",
+    ]
+
+
+def test_chunk_keeps_whitespace_unless_compact_mode() -> None:
+    content = "One two three.\nFour five six."
+
+    assert collate.chunk(content, False, 1, 10) == ["One two three.", "Four five six."]
+    assert collate.chunk(content, True, 10, 10) == ["One two three. Four five six."]
+
+
+def test_chunk_uses_cache() -> None:
+    cache = get_chunk_cache()
+    cache.clear()
+    content = "This is a test. We are testing the chunk function."
+
+    chunks = collate.chunk(content, False, 4, 10, use_cache=True)
+
+    assert len(cache) == 1
+    assert collate.chunk(content, False, 4, 10, use_cache=True) == chunks
+    assert len(cache) == 1
+    collate.chunk(content, False, 2, 10, use_cache=True)
+    assert len(cache) == 2
+    cache.clear()
+
+
+def to_dict_json_round_trip(obj):
+    return json.loads(
+        json.dumps(
+            obj, default=lambda o: o.__dict__ if hasattr(o, "__dict__") else str(o)
+        )
+    )
+
+
+def test_to_dict_matches_json_round_trip() -> None:
+    obj = {
+        "event_type": StreamEvent.STREAM_END,
+        "tool_calls": (ToolCall(name="web_search", parameters={"query": "q"}),),
+        "meta": {1: "int key", True: "bool key", None: "none key", 1.5: 2.0},
+        "created_at": datetime(2024, 1, 1),
+    }
+
+    assert to_dict_json_round_trip(obj) == collate.to_dict(obj)
+
+
+def test_to_dict_cohere_stream_event() -> None:
+    event = StreamedChatResponse_TextGeneration(text="Hello")
+
+    assert collate.to_dict(event) == {"event_type": "text-generation", "text": "Hello"}
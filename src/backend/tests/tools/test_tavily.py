@@ -0,0 +1,46 @@
+import pytest
+
+from backend.tools.tavily import TavilyInternetSearch
+
+
+class LengthRerankDeployment:
+    """Scores each document by its length, in batches."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    async def invoke_rerank(self, query, documents, ctx, **kwargs):
+        self.batch_sizes.append(len(documents))
+        return {
+            "results": [
+                {"index": index, "relevance_score": len(document)}
+                for index, document in enumerate(documents)
+            ]
+        }
+
+
+@pytest.mark.asyncio
+async def test_rerank_page_snippets_keeps_best_snippet_per_url() -> None:
+    tool = TavilyInternetSearch.__new__(TavilyInternetSearch)
+    tool.num_results = 2
+    tool.RERANK_BATCH_SIZE = 2
+    model = LengthRerankDeployment()
+    snippets = [
+        {"url": "a", "title": "", "content": "x"},
+        {"url": "b", "title": "", "content": "xxxx"},
+        {"url": "a", "title": "", "content": "xxxxx"},
+        {"url": "c", "title": "", "content": "xx"},
+        {"url": "b", "title": "", "content": "xxx"},
+    ]
+
+    reranked = await tool.rerank_page_snippets("query", snippets, model, ctx=None)
+
+    assert model.batch_sizes == [2, 2, 1]
+    assert reranked == [snippets[2], snippets[1]]
+
+
+@pytest.mark.asyncio
+async def test_rerank_page_snippets_without_snippets() -> None:
+    tool = TavilyInternetSearch.__new__(TavilyInternetSearch)
+
+    assert await tool.rerank_page_snippets("query", [], None, ctx=None) == []
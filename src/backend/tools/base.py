@@ -15,6 +15,10 @@ class BaseTool:
 
     Attributes:
         NAME (str): The name of the tool.
+
+    The call method runs on the event loop, concurrently with the other tool calls of
+    the step, so implementations must use an async client or run blocking calls with
+    anyio.to_thread.run_sync(..., abandon_on_cancel=True) to be timed out.
     """
 
     NAME = None
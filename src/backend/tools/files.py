@@ -1,6 +1,12 @@
+import asyncio
 from typing import Any, Dict, List
 
+import anyio
+
 import backend.crud.file as file_crud
+from backend.chat.collate import chunk_spans
+from backend.services.file_index import build_file_index, search_file_indexes
+from backend.services.file_store import get_file_text
 from backend.tools.base import BaseTool
 
 
@@ -29,7 +35,9 @@ class ReadFileTool(BaseTool):
         if not file_name:
             return []
 
-        files = file_crud.get_files_by_file_names(session, [file_name], user_id)
+        files = file_crud.get_files_by_file_names(
+            session, [file_name], user_id, load_content=True
+        )
 
         if not files:
             return []
@@ -37,7 +45,7 @@ class ReadFileTool(BaseTool):
         file = files[0]
         return [
             {
-                "text": file.file_content,
+                "text": await anyio.to_thread.run_sync(get_file_text, file),
                 "title": file.file_name,
                 "url": file.file_path,
             }
@@ -46,7 +54,7 @@ class ReadFileTool(BaseTool):
 
 class SearchFileTool(BaseTool):
     """
-    This class searches for a query in a file.
+    This class searches for a query in a file, returning the best matching passages.
     """
 
     NAME = "search_file"
@@ -75,16 +83,43 @@ class SearchFileTool(BaseTool):
             for file_name in file_names
         ]
 
-        files = file_crud.get_files_by_file_names(session, file_names, user_id)
+        files = file_crud.get_files_by_file_names(
+            session, file_names, user_id, load_content=True
+        )
 
         if not files:
             return []
 
+        # The texts are read from the content store concurrently, off the event loop
+        contents = await asyncio.gather(
+            *[anyio.to_thread.run_sync(get_file_text, file) for file in files]
+        )
+
+        # Files uploaded before the search index was stored are indexed on the fly
+        spans = []
+        indexes = []
+        for file, content in zip(files, contents):
+            file_spans = file.chunk_spans or chunk_spans(content)
+            spans.append(file_spans)
+            indexes.append(file.search_index or build_file_index(content, file_spans))
+
+        best_chunks = search_file_indexes(query, indexes, self.MAX_NUM_CHUNKS)
+
+        # Without any matching terms, return the first chunks of the files
+        if not best_chunks:
+            best_chunks = [
+                (file_index, chunk_index, 0.0)
+                for file_index, file_spans in enumerate(spans)
+                for chunk_index in range(len(file_spans))
+            ][: self.MAX_NUM_CHUNKS]
+
         results = []
-        for file in files:
+        for file_index, chunk_index, _ in best_chunks:
+            file = files[file_index]
+            start, end = spans[file_index][chunk_index]
             results.append(
                 {
-                    "text": file.file_content,
+                    "text": contents[file_index][start:end],
                     "title": file.file_name,
                     "url": file.file_path,
                 }
@@ -1,5 +1,6 @@
 from typing import Any, Dict, List
 
+import anyio
 from langchain.text_splitter import CharacterTextSplitter
 from langchain_cohere import CohereEmbeddings
 from langchain_community.document_loaders import PyPDFLoader
@@ -37,13 +38,11 @@ class LangChainWikiRetriever(BaseTool):
     async def call(
         self, parameters: dict, ctx: Any, **kwargs: Any
     ) -> List[Dict[str, Any]]:
-        wiki_retriever = WikipediaRetriever()
         query = parameters.get("query", "")
-        docs = wiki_retriever.get_relevant_documents(query)
-        text_splitter = CharacterTextSplitter(
-            chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
+        # The retriever and the splitter block, the tool call timeout abandons them
+        documents = await anyio.to_thread.run_sync(
+            self.retrieve_documents, query, abandon_on_cancel=True
         )
-        documents = text_splitter.split_documents(docs)
 
         return [
             {
@@ -54,6 +53,14 @@ class LangChainWikiRetriever(BaseTool):
             for doc in documents
         ]
 
+    def retrieve_documents(self, query: str) -> List[Any]:
+        wiki_retriever = WikipediaRetriever()
+        docs = wiki_retriever.get_relevant_documents(query)
+        text_splitter = CharacterTextSplitter(
+            chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
+        )
+        return text_splitter.split_documents(docs)
+
 
 class LangChainVectorDBRetriever(BaseTool):
     """
@@ -73,6 +80,15 @@ class LangChainVectorDBRetriever(BaseTool):
     async def call(
         self, parameters: dict, ctx: Any, **kwargs: Any
     ) -> List[Dict[str, Any]]:
+        query = parameters.get("query", "")
+        # Loading, embedding and searching block, the tool call timeout abandons them
+        input_docs = await anyio.to_thread.run_sync(
+            self.retrieve_documents, query, abandon_on_cancel=True
+        )
+
+        return [dict({"text": doc.page_content}) for doc in input_docs]
+
+    def retrieve_documents(self, query: str) -> List[Any]:
         cohere_embeddings = CohereEmbeddings(cohere_api_key=self.COHERE_API_KEY)
 
         # Load text files and split into chunks
@@ -82,7 +98,4 @@ class LangChainVectorDBRetriever(BaseTool):
 
         # Create a vector store from the documents
         db = Chroma.from_documents(documents=pages, embedding=cohere_embeddings)
-        query = parameters.get("query", "")
-        input_docs = db.as_retriever().get_relevant_documents(query)
-
-        return [dict({"text": doc.page_content}) for doc in input_docs]
+        return db.as_retriever().get_relevant_documents(query)
@@ -1,6 +1,8 @@
 import json
+from functools import partial
 from typing import Any, Dict, Mapping
 
+import anyio
 import requests
 from dotenv import load_dotenv
 from langchain_core.tools import Tool as LangchainTool
@@ -34,7 +36,11 @@ class PythonInterpreter(BaseTool):
             raise Exception("Python Interpreter tool called while URL not set")
 
         code = parameters.get("code", "")
-        res = requests.post(self.INTERPRETER_URL, json={"code": code})
+        # Run the blocking request in a thread, the tool call timeout abandons it
+        res = await anyio.to_thread.run_sync(
+            partial(requests.post, self.INTERPRETER_URL, json={"code": code}),
+            abandon_on_cancel=True,
+        )
         clean_res = self._clean_response(res.json())
 
         return clean_res
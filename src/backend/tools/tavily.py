@@ -1,7 +1,9 @@
+import asyncio
+import heapq
 from typing import Any, Dict, List
 
 from langchain_community.tools.tavily_search import TavilySearchResults
-from tavily import TavilyClient
+from tavily import AsyncTavilyClient
 
 from backend.config.settings import Settings
 from backend.model_deployments.base import BaseDeployment
@@ -11,9 +13,10 @@ from backend.tools.base import BaseTool
 class TavilyInternetSearch(BaseTool):
     NAME = "web_search"
     TAVILY_API_KEY = Settings().tools.web_search.api_key
+    RERANK_BATCH_SIZE = 500
 
     def __init__(self):
-        self.client = TavilyClient(api_key=self.TAVILY_API_KEY)
+        self.client = AsyncTavilyClient(api_key=self.TAVILY_API_KEY)
         self.num_results = 6
 
     @classmethod
@@ -24,7 +27,7 @@ class TavilyInternetSearch(BaseTool):
         self, parameters: dict, ctx: Any, **kwargs: Any
     ) -> List[Dict[str, Any]]:
         query = parameters.get("query", "")
-        result = self.client.search(
+        result = await self.client.search(
             query=query, search_depth="advanced", include_raw_content=True
         )
 
@@ -37,7 +40,7 @@ class TavilyInternetSearch(BaseTool):
             expanded.append(result)
 
             # Get other snippets
-            snippets = result["raw_content"].split("\n")
+            snippets = (result.get("raw_content") or "").split("\n")
             for snippet in snippets:
                 if result["content"] != snippet:
                     if len(snippet.split()) <= 10:
@@ -70,10 +73,8 @@ class TavilyInternetSearch(BaseTool):
         if len(snippets) == 0:
             return []
 
-        rerank_batch_size = 500
-        relevance_scores = [None for _ in range(len(snippets))]
-        for batch_start in range(0, len(snippets), rerank_batch_size):
-            snippet_batch = snippets[batch_start : batch_start + rerank_batch_size]
+        async def rerank_batch(batch_start: int) -> List[Dict[str, Any]]:
+            snippet_batch = snippets[batch_start : batch_start + self.RERANK_BATCH_SIZE]
             batch_output = await model.invoke_rerank(
                 query=query,
                 documents=[
@@ -82,21 +83,35 @@ class TavilyInternetSearch(BaseTool):
                 ],
                 ctx=ctx,
             )
-            for b in batch_output.get("results", []):
+            return (batch_output or {}).get("results", [])
+
+        # Rerank the batches concurrently
+        batch_starts = range(0, len(snippets), self.RERANK_BATCH_SIZE)
+        batch_outputs = await asyncio.gather(
+            *[rerank_batch(batch_start) for batch_start in batch_starts]
+        )
+
+        relevance_scores = [float("-inf")] * len(snippets)
+        for batch_start, batch_output in zip(batch_starts, batch_outputs):
+            for b in batch_output:
                 index = b.get("index", None)
                 relevance_score = b.get("relevance_score", None)
-                if index is not None:
+                if index is not None and relevance_score is not None:
                     relevance_scores[batch_start + index] = relevance_score
 
-        reranked, seen_urls = [], []
-        for _, result in sorted(
-            zip(relevance_scores, snippets), key=lambda x: x[0], reverse=True
+        # Keep the best snippet of each URL, the first one on ties
+        best_by_url = {}
+        for index, (relevance_score, snippet) in enumerate(
+            zip(relevance_scores, snippets)
         ):
-            if result["url"] not in seen_urls:
-                seen_urls.append(result["url"])
-                reranked.append(result)
+            best = best_by_url.get(snippet["url"])
+            if best is None or relevance_score > best[0]:
+                best_by_url[snippet["url"]] = (relevance_score, index)
 
-        return reranked[: self.num_results]
+        top_results = heapq.nlargest(
+            self.num_results, best_by_url.values(), key=lambda x: (x[0], -x[1])
+        )
+        return [snippets[index] for _, index in top_results]
 
     def to_langchain_tool(self) -> TavilySearchResults:
         internet_search = TavilySearchResults()
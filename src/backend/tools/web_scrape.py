@@ -1,5 +1,6 @@
 from typing import Any, Dict, List
 
+import anyio
 from bs4 import BeautifulSoup
 from pypdf import PdfReader
 from requests import get
@@ -20,7 +21,8 @@ class WebScrapeTool(BaseTool):
     ) -> List[Dict[str, Any]]:
         url = parameters.get("url")
 
-        response = get(url)
+        # Run the blocking request in a thread, the tool call timeout abandons it
+        response = await anyio.to_thread.run_sync(get, url, abandon_on_cancel=True)
         if not response.ok:
             error_message = f"HTTP {response.status_code} {response.reason}"
             return [
@@ -2,6 +2,12 @@ from typing import Any, Dict, List
 
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
+from backend.model_deployments.lexical_rerank import (
+    LEXICAL_RERANK_MODEL_ID,
+    LEXICAL_RERANK_TOP_N,
+    is_lexical_rerank_enabled,
+    lexical_rerank,
+)
 from backend.schemas.cohere_chat import CohereChatRequest
 from backend.schemas.context import Context
 from community.model_deployments import BaseDeployment
@@ -25,7 +31,11 @@ class HuggingFaceDeployment(BaseDeployment):
 
     @property
     def rerank_enabled(self) -> bool:
-        return False
+        return is_lexical_rerank_enabled()
+
+    @property
+    def rerank_model_id(self) -> str:
+        return LEXICAL_RERANK_MODEL_ID
 
     @classmethod
     def list_models(cls) -> List[str]:
@@ -91,7 +101,7 @@ class HuggingFaceDeployment(BaseDeployment):
     async def invoke_rerank(
         self, query: str, documents: List[Dict[str, Any]], ctx: Context, **kwargs: Any
     ) -> Any:
-        return None
+        return lexical_rerank(query, documents, top_n=LEXICAL_RERANK_TOP_N)
 
     def _build_chat_history(
         self, chat_history: List[Dict[str, Any]], message: str
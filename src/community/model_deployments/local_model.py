@@ -3,6 +3,12 @@ from typing import Any, Dict, List
 
 from llama_cpp import Llama
 
+from backend.model_deployments.lexical_rerank import (
+    LEXICAL_RERANK_MODEL_ID,
+    LEXICAL_RERANK_TOP_N,
+    is_lexical_rerank_enabled,
+    lexical_rerank,
+)
 from backend.schemas.cohere_chat import CohereChatRequest
 
 # To use local models install poetry with: poetry install --with setup,community,local-model --verbose
@@ -18,7 +24,11 @@ class LocalModelDeployment(BaseDeployment):
 
     @property
     def rerank_enabled(self) -> bool:
-        return False
+        return is_lexical_rerank_enabled()
+
+    @property
+    def rerank_model_id(self) -> str:
+        return LEXICAL_RERANK_MODEL_ID
 
     @classmethod
     def list_models(cls) -> List[str]:
@@ -96,7 +106,7 @@ class LocalModelDeployment(BaseDeployment):
     async def invoke_rerank(
         self, query: str, documents: List[Dict[str, Any]], ctx: Context, **kwargs: Any
     ) -> Any:
-        return None
+        return lexical_rerank(query, documents, top_n=LEXICAL_RERANK_TOP_N)
 
 
 class PromptTemplate: